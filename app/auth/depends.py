@@ -6,19 +6,24 @@ from fastapi import Cookie, Depends, HTTPException, status
 from loguru import logger
 
 from app.auth.service import AuthService, UserService
+from app.unit_of_work import UnitOfWork, get_unit_of_work
 from app.user.schemas import UserSchema
 
 
-async def get_user_service() -> UserService:
+async def get_user_service(
+    uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
+) -> UserService:
     """Get user service."""
     logger.debug("Get user service")
-    return UserService()
+    return UserService(uow)
 
 
-async def get_auth_service() -> AuthService:
+async def get_auth_service(
+    uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
+) -> AuthService:
     """Get auth service."""
     logger.debug("Get auth service")
-    return AuthService()
+    return AuthService(uow)
 
 
 async def get_current_user(
@@ -29,7 +29,7 @@ async def login(
 ) -> UserSchema:
     """Login user, set session cookie, and return user info."""
     authenticated_user = await auth_service.authenticate_user(user.email, user.password)
-    session_id = auth_service.create_session(authenticated_user)
+    session_id = await auth_service.create_session(authenticated_user)
     response.set_cookie(
         key="session_id",
         value=session_id,
@@ -54,7 +54,7 @@ async def logout(
             detail="Not authenticated",
         )
 
-    auth_service.destroy_session(session_id)
+    await auth_service.destroy_session(session_id)
     response.delete_cookie(
         key="session_id",
         httponly=True,
@@ -7,6 +7,7 @@ from loguru import logger
 from passlib.context import CryptContext
 
 from app.config import settings
+from app.unit_of_work import UnitOfWork
 from app.user.schemas import UserSchema
 from app.user.service import UserService
 from app.utils.redis_config import redis_client
@@ -17,8 +18,8 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 class AuthService:
     """Auth service."""
 
-    def __init__(self) -> None:
-        self.user_service = UserService()
+    def __init__(self, uow: UnitOfWork | None = None) -> None:
+        self.user_service = UserService(uow)
         self.session_ttl = settings.session_cookie_max_age
 
     async def authenticate_user(self, email: str, password: str) -> UserSchema:
@@ -46,7 +47,7 @@ class AuthService:
 
         return user.to_read_model()
 
-    def create_session(self, user: UserSchema) -> str:
+    async def create_session(self, user: UserSchema) -> str:
         """Create server-side session and return session id."""
         session_id = uuid.uuid4().hex
         redis_payload = {
@@ -54,19 +55,21 @@ class AuthService:
             "is_superuser": str(user.is_superuser),
         }
         # Store session in Redis with TTL
-        redis_client.hset(session_id, mapping=redis_payload)
-        redis_client.expire(session_id, self.session_ttl)
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(session_id, mapping=redis_payload)
+            pipe.expire(session_id, self.session_ttl)
+            await pipe.execute()
         logger.debug("Created session {} for user {}", session_id, user.email)
         return session_id
 
-    def destroy_session(self, session_id: str) -> None:
+    async def destroy_session(self, session_id: str) -> None:
         """Invalidate session."""
-        redis_client.delete(session_id)
+        await redis_client.delete(session_id)
         logger.debug("Destroyed session {}", session_id)
 
     async def get_user_by_session(self, session_id: str) -> UserSchema:
         """Validate session and return user schema."""
-        payload = redis_client.hgetall(session_id)
+        payload = await redis_client.hgetall(session_id)
         if not payload:
             logger.warning("Session not found or expired: {}", session_id)
             raise HTTPException(
@@ -74,12 +77,17 @@ class AuthService:
                 detail="Not authenticated",
             )
 
-        email = payload.get("email")  # type: ignore
-        is_superuser = payload.get("is_superuser", "False") == "True"  # type: ignore
-        user = await self.user_service.get_user_by_email(email=email)  # type: ignore
+        email = payload.get("email")
+        is_superuser = payload.get("is_superuser", "False") == "True"
+        # Сессия без строкового email считается недействительной
+        user = (
+            await self.user_service.get_user_by_email(email=email)
+            if isinstance(email, str)
+            else None
+        )
         if not user:
             logger.warning("User from session not found: {}", email)
-            self.destroy_session(session_id)
+            await self.destroy_session(session_id)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Not authenticated",
@@ -1,8 +1,15 @@
 """File with booking dependencies."""
 
+from typing import Annotated
+
+from fastapi import Depends
+
 from app.booking.service import BookingService
+from app.unit_of_work import UnitOfWork, get_unit_of_work
 
 
-def get_booking_service() -> BookingService:
+def get_booking_service(
+    uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
+) -> BookingService:
     """Get booking service."""
-    return BookingService()
+    return BookingService(uow)
@@ -24,3 +24,10 @@ class BookingAlreadyCancelledError(ServiceError):
 
     status_code: int = status.HTTP_400_BAD_REQUEST
     message: str = "Booking already cancelled"
+
+
+class BookingStatusChangedError(ServiceError):
+    """Booking status was changed by another request error."""
+
+    status_code: int = status.HTTP_409_CONFLICT
+    message: str = "Booking status was changed by another request"
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import Enum, ForeignKey
+from sqlalchemy import Enum, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.booking.schemas import BookingSchema, BookingStatus
@@ -26,6 +26,10 @@ class BookingModel(Base):
     """
 
     __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_excursion_id_created_at", "excursion_id", "created_at", "id"),
+        Index("ix_bookings_phone_number_created_at", "phone_number", "created_at", "id"),
+    )
 
     excursion_id: Mapped[int] = mapped_column(
         ForeignKey("excursions.id", ondelete="CASCADE"),
@@ -2,7 +2,7 @@
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 
 from app.auth.depends import get_current_user, require_superuser
 from app.booking.depends import get_booking_service
@@ -10,9 +10,16 @@ from app.booking.exceptions import (
     BookingAlreadyCancelledError,
     BookingAlreadyConfirmedError,
     BookingNotFoundError,
+    BookingStatusChangedError,
 )
 from app.booking.schemas import BookingCreate, BookingSchema
-from app.booking.service import BookingService
+from app.booking.service import BOOKING_CURSOR_FIELDS, BookingService
+from app.excursions.exceptions import (
+    ExcursionAddPeopleOverflowError,
+    ExcursionNotFoundError,
+    ExcursionSeatInventoryUnavailableError,
+)
+from app.pagination import CursorParams, InvalidCursorError, set_next_cursor
 from app.user.schemas import UserSchema
 
 booking_router = APIRouter(tags=["Booking"])
@@ -39,11 +46,26 @@ async def create_booking(
 )
 async def get_all_bookings_for_excursions(
     excursion_id: int,
+    response: Response,
     service: Annotated[BookingService, Depends(get_booking_service)],
     _: Annotated[UserSchema, Depends(require_superuser)],
+    page: Annotated[CursorParams, Depends()],
 ) -> list[BookingSchema]:
-    """Get all bookings with status CONFIRMED for one excursion."""
-    bookings = await service.get_all_bookings_for_excursion(excursion_id)
+    """Get bookings for one excursion by cursor and limit.
+
+    Cursor of the next page is returned in `X-Next-Cursor` header.
+    """
+    try:
+        bookings = await service.get_all_bookings_for_excursion(
+            excursion_id, limit=page.limit, cursor=page.cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.message,
+        ) from e
+
+    set_next_cursor(response, bookings, page.limit, BOOKING_CURSOR_FIELDS)
     return bookings
 
 
@@ -62,6 +84,9 @@ async def confirm_booking(
     except (
         BookingNotFoundError,
         BookingAlreadyConfirmedError,
+        ExcursionNotFoundError,
+        ExcursionAddPeopleOverflowError,
+        ExcursionSeatInventoryUnavailableError,
     ) as e:
         raise HTTPException(
             status_code=e.status_code,
@@ -84,6 +109,9 @@ async def cancel_booking(
     except (
         BookingNotFoundError,
         BookingAlreadyCancelledError,
+        BookingStatusChangedError,
+        ExcursionNotFoundError,
+        ExcursionSeatInventoryUnavailableError,
     ) as e:
         raise HTTPException(
             status_code=e.status_code,
@@ -1,33 +1,42 @@
 """File with booking service."""
 
 import asyncio
+from datetime import datetime
 
 from loguru import logger
+from sqlalchemy import ColumnElement
 
 from app.booking.exceptions import (
     BookingAlreadyCancelledError,
     BookingAlreadyConfirmedError,
     BookingNotFoundError,
+    BookingStatusChangedError,
 )
 from app.booking.models import BookingModel
 from app.booking.schemas import BookingCreate, BookingSchema, BookingStatus
-from app.database import async_session_maker
-from app.excursions.schemas import ExcursionScheme
 from app.excursions.service import ExcursionService
 from app.notifications.service import NotificationService
+from app.pagination import KeysetPage
 from app.repository import SQLAlchemyRepository
+from app.unit_of_work import UnitOfWork
 from app.user.schemas import UserSchema
 
+BOOKING_CURSOR_FIELDS = ("created_at", "id")
+BOOKING_CURSOR_TYPES = (datetime, int)
+
 
 class BookingService:
     """Service for booking models."""
 
-    def __init__(self) -> None:
+    def __init__(self, uow: UnitOfWork | None = None) -> None:
         """Create `booking` and `excursion` service."""
+        self.uow = uow or UnitOfWork()
         self.booking_repository: SQLAlchemyRepository[BookingModel] = (
-            SQLAlchemyRepository(async_session_maker, BookingModel)
+            SQLAlchemyRepository(self.uow, BookingModel)
         )
-        self.excursion_service: ExcursionService = ExcursionService()
+        self.excursion_service: ExcursionService = ExcursionService(self.uow)
+        # Notifications are sent from a background task, which must not share
+        # the session of the request.
         self.notification_service: NotificationService = NotificationService()
 
     async def get_booking(self, booking_id: int) -> BookingSchema:
@@ -57,10 +66,11 @@ class BookingService:
         Return:
         `BookingSchema`
         """
-        excursion = await self.excursion_service.get_excursion(booking.excursion_id)
+        async with self.uow:
+            excursion = await self.excursion_service.get_excursion(booking.excursion_id)
 
-        new_booking = await self.booking_repository.add_one(booking.model_dump())
-        formated_booking = new_booking.to_read_model()
+            new_booking = await self.booking_repository.add_one(booking.model_dump())
+            formated_booking = new_booking.to_read_model()
 
         asyncio.create_task(
             self.notification_service.notify_admins_about_booking(
@@ -70,25 +80,49 @@ class BookingService:
         return formated_booking
 
     async def get_all_bookings_for_excursion(
-        self, excursion_id: int
+        self, excursion_id: int, limit: int = 100, cursor: str | None = None
     ) -> list[BookingSchema]:
-        """Get all bookings for one excursion.
+        """Get page of bookings for one excursion ordered by creation time.
 
         Args:
             excursion_id: `int`
+            limit: `int`
+            cursor: `str | None` cursor of the previous page
 
         Return: `list[BookingSchema]`
+
+        Raise: `InvalidCursorError` if cursor is invalid
         """
-        bookings = await self.booking_repository.find_all(
-            filter_by=BookingModel.excursion_id == excursion_id,
-            order_by=BookingModel.created_at,
+        return await self._get_bookings_page(
+            BookingModel.excursion_id == excursion_id, limit, cursor
+        )
+
+    async def get_user_bookings(
+        self, user: UserSchema, limit: int = 100, cursor: str | None = None
+    ) -> list[BookingSchema]:
+        """Get page of user bookings ordered by creation time.
+
+        Args:
+            user: `UserSchema`
+            limit: `int`
+            cursor: `str | None` cursor of the previous page
+
+        Return: `list[BookingSchema]`
+
+        Raise: `InvalidCursorError` if cursor is invalid
+        """
+        return await self._get_bookings_page(
+            BookingModel.phone_number == user.phone_number, limit, cursor
         )
-        return [booking.to_read_model() for booking in bookings]
 
-    async def get_user_bookings(self, user: UserSchema) -> list[BookingSchema]:
-        bookings = await self.booking_repository.find_all(
-            filter_by=BookingModel.phone_number == user.phone_number,
-            order_by=BookingModel.created_at,
+    async def _get_bookings_page(
+        self, filter_by: ColumnElement[bool], limit: int, cursor: str | None
+    ) -> list[BookingSchema]:
+        """Get bookings page ordered by `BOOKING_CURSOR_FIELDS`."""
+        bookings = await self.booking_repository.find_page(
+            order_by=[BookingModel.created_at, BookingModel.id],
+            page=KeysetPage.from_cursor(cursor, BOOKING_CURSOR_TYPES, limit),
+            filter_by=filter_by,
         )
         return [booking.to_read_model() for booking in bookings]
 
@@ -103,27 +137,26 @@ class BookingService:
         Raise:
         `BookingAlreadyConfirmedError` if booking is already confirmed
         `BookingNotFoundError` if booking does not exist
+        `ExcursionAddPeopleOverflowError` if excursion has not enough seats
         """
+        async with self.uow:
+            # Status is changed only if booking is not confirmed yet, so of
+            # concurrent confirmations only one takes the seats.
+            confirmed_booking = await self.booking_repository.update(
+                where=(BookingModel.id == booking_id)
+                & (BookingModel.status != BookingStatus.CONFIRMED),
+                data={"status": BookingStatus.CONFIRMED},
+            )
 
-        booking = await self.get_booking(booking_id)
-
-        if booking.status == BookingStatus.CONFIRMED:
-            raise BookingAlreadyConfirmedError()
-
-        confirmed_booking = await self.booking_repository.update(
-            where=BookingModel.id == booking_id,
-            data={"status": BookingStatus.CONFIRMED},
-        )
+            if confirmed_booking is None:
+                await self.get_booking(booking_id)
+                raise BookingAlreadyConfirmedError()
 
-        if confirmed_booking is None:
-            raise BookingNotFoundError()
+            parsed_booking = confirmed_booking.to_read_model()
 
-        parsed_booking = confirmed_booking.to_read_model()
-
-        excursion = await self.excursion_service.get_excursion(
-            parsed_booking.excursion_id
-        )
-        await self._change_people_left_by_booking_status(parsed_booking, excursion)
+            await self.excursion_service.change_people_left_count(
+                parsed_booking.excursion_id, parsed_booking.total_people
+            )
         return parsed_booking
 
     async def cancel_booking(self, booking_id: int) -> BookingSchema:
@@ -134,27 +167,35 @@ class BookingService:
 
         Return: `BookingSchema`
 
-        Raise: `BookingNotFoundError` if booking does not exist
+        Seats are returned to excursion only if booking was confirmed.
+
+        Raise:
+        `BookingNotFoundError` if booking does not exist
+        `BookingAlreadyCancelledError` if booking is already cancelled
+        `BookingStatusChangedError` if booking was changed by another request
         """
-        booking = await self.get_booking(booking_id)
+        async with self.uow:
+            booking = await self.get_booking(booking_id)
 
-        if booking.status == BookingStatus.CANCELLED:
-            raise BookingAlreadyCancelledError()
+            if booking.status == BookingStatus.CANCELLED:
+                raise BookingAlreadyCancelledError()
 
-        cancelled_booking = await self.booking_repository.update(
-            where=BookingModel.id == booking_id,
-            data={"status": BookingStatus.CANCELLED},
-        )
+            # Status is changed only if nobody changed it after it was read
+            cancelled_booking = await self.booking_repository.update(
+                where=(BookingModel.id == booking_id)
+                & (BookingModel.status == booking.status),
+                data={"status": BookingStatus.CANCELLED},
+            )
 
-        if cancelled_booking is None:
-            raise BookingNotFoundError()
+            if cancelled_booking is None:
+                raise BookingStatusChangedError()
 
-        parsed_booking = cancelled_booking.to_read_model()
+            parsed_booking = cancelled_booking.to_read_model()
 
-        excursion = await self.excursion_service.get_excursion(
-            parsed_booking.excursion_id
-        )
-        await self._change_people_left_by_booking_status(parsed_booking, excursion)
+            if booking.status == BookingStatus.CONFIRMED:
+                await self.excursion_service.change_people_left_count(
+                    parsed_booking.excursion_id, -parsed_booking.total_people
+                )
 
         return parsed_booking
 
@@ -169,33 +210,12 @@ class BookingService:
         excursions = await self.excursion_service.get_excursions_with_expired_date()
         logger.debug("Found {} excursions to update.", len(excursions))
 
-        for excursion in excursions:
-            where = (BookingModel.excursion_id == excursion.id) & (
-                BookingModel.status != BookingStatus.EXPIRED
-            )
-            bookings = await self.booking_repository.update_all(
-                where=where, data={"status": BookingStatus.EXPIRED}
-            )
-            logger.debug("Booking expired={}", len(bookings))
-
-    async def _change_people_left_by_booking_status(
-        self,
-        booking: BookingSchema,
-        excursion: ExcursionScheme,
-    ) -> None:
-        """Change people left by booking status.
-
-        Args:
-            booking: `BookingSchema`
-            excursion: `ExcursionScheme`
-
-        Return: `None`
-        """
-        if booking.status == BookingStatus.CONFIRMED:
-            excursion = await self.excursion_service.change_people_left_count(
-                excursion.id, booking.total_people
-            )
-        else:
-            excursion = await self.excursion_service.change_people_left_count(
-                excursion.id, -booking.total_people
-            )
+        async with self.uow:
+            for excursion in excursions:
+                where = (BookingModel.excursion_id == excursion.id) & (
+                    BookingModel.status != BookingStatus.EXPIRED
+                )
+                bookings = await self.booking_repository.update_all(
+                    where=where, data={"status": BookingStatus.EXPIRED}
+                )
+                logger.debug("Booking expired={}", len(bookings))
@@ -20,12 +20,63 @@ class Settings(BaseSettings):
     db_user: str = ""
     db_pass: str = ""
 
+    workers: int = Field(default=4)
+
+    db_pool_size: int | None = Field(default=None)
+    db_max_overflow: int = Field(default=5)
+    db_pool_timeout: float = Field(default=30)
+    db_pool_recycle: int = Field(default=1800)
+    db_pool_pre_ping: bool = Field(default=True)
+    db_max_connections: int = Field(default=100)
+    db_reserved_connections: int = Field(default=10)
+
+    redis_host: str = Field(default="localhost")
+    redis_port: int = Field(default=6379)
+    redis_db: int = Field(default=0)
+    redis_password: str | None = Field(default=None)
+    redis_max_connections: int = Field(default=50)
+    redis_pool_timeout: float = Field(default=5)
+    redis_socket_timeout: float = Field(default=5)
+    redis_socket_connect_timeout: float = Field(default=5)
+
     secret_key: str = Field(default="")
     session_cookie_max_age: int = Field(default=315360000)
 
     upload_dir: Path = Field(default=Path("static/"))
 
     ttl: int = Field(default=300)
+    stale_ttl: int = Field(default=600)
+    http_cache_max_age: int = Field(default=30)
+    cache_warm_paths: list[str] = Field(
+        default=[
+            "/excursions/active?excursion_type=excursion",
+            "/excursions/active?excursion_type=tour",
+            "/review/",
+            "/review/stats",
+        ]
+    )
+    cache_warm_concurrency: int = Field(default=2)
+    negative_cache_ttl: int = Field(default=30)
+    excursion_id_index_capacity: int = Field(default=100_000)
+    excursion_id_index_error_rate: float = Field(default=0.01)
+    cache_warm_top_paths: int = Field(default=20)
+    cache_serializer: Literal["json", "orjson", "msgpack"] = Field(default="orjson")
+    cache_compress_min_bytes: int = Field(default=4096)
+    local_cache_ttl: int = Field(default=5)
+    local_cache_max_items: int = Field(default=1024)
+    local_cache_max_bytes: int = Field(default=16 * 1024 * 1024)
+    hot_inventory_reconcile_interval: float = Field(default=5)
+    hot_inventory_ttl: int = Field(default=86400)
+    image_workers: int = Field(default=2)
+    image_max_pending: int = Field(default=8)
+    image_variant_widths: list[int] = Field(default=[320, 640, 1280, 1920])
+    image_variant_formats: list[str] = Field(default=["avif", "webp", "original"])
+    image_resize_sizes: list[str] = Field(
+        default=["160x160", "320x240", "640x480", "1280x720"]
+    )
+    image_cache_dir: Path = Field(default=Path("cache/img/"))
+    image_cache_max_bytes: int = Field(default=512 * 1024 * 1024)
+    image_resize_max_age: int = Field(default=31536000)
 
     class Config:
         env_file = ".env"
@@ -39,6 +90,20 @@ class Settings(BaseSettings):
             f"{self.db_host}:{self.db_port}/{self.db_name}"
         )
 
+    @property
+    def db_pool_size_per_worker(self) -> int:
+        """Pool size of one worker.
+
+        If `db_pool_size` is not set, the Postgres connection budget
+        (`db_max_connections` without `db_reserved_connections`) is split
+        between workers, leaving room for each worker's overflow.
+        """
+        if self.db_pool_size is not None:
+            return self.db_pool_size
+
+        budget = self.db_max_connections - self.db_reserved_connections
+        return max(1, budget // max(1, self.workers) - self.db_max_overflow)
+
     @property
     def is_production(self) -> bool:
         return self.mode == "production"
@@ -1,20 +1,58 @@
-from typing import AsyncGenerator
+import time
+from typing import AsyncGenerator, cast
 
 from loguru import logger
-from sqlalchemy import NullPool
+from sqlalchemy import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import ConnectionPoolEntry
 
 from app.config import Settings
+from app.utils.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_IDLE,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_POOL_WAIT_SECONDS,
+)
 
 settings = Settings()
 
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Async queue pool which reports connection wait time to Prometheus."""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+
 logger.debug("Setup database with uri %s", settings.database_uri)
 async_engine = create_async_engine(
     settings.database_uri,
-    poolclass=NullPool,
+    poolclass=InstrumentedAsyncPool,
+    pool_size=settings.db_pool_size_per_worker,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
     echo=False,
     future=True,
 )
+logger.debug(
+    "Database pool: size={}, max_overflow={}, workers={}",
+    settings.db_pool_size_per_worker,
+    settings.db_max_overflow,
+    settings.workers,
+)
+
+_pool = cast(InstrumentedAsyncPool, async_engine.sync_engine.pool)
+DB_POOL_SIZE.set_function(_pool.size)
+DB_POOL_CHECKED_OUT.set_function(_pool.checkedout)
+DB_POOL_IDLE.set_function(_pool.checkedin)
+DB_POOL_OVERFLOW.set_function(lambda: max(_pool.overflow(), 0))
 
 async_session_maker = async_sessionmaker(async_engine, expire_on_commit=False)
 
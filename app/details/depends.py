@@ -1,6 +1,13 @@
+from typing import Annotated
+
+from fastapi import Depends
+
 from app.details.service import DetailsService
+from app.unit_of_work import UnitOfWork, get_unit_of_work
 
 
-async def get_details_service() -> DetailsService:
+async def get_details_service(
+    uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
+) -> DetailsService:
     """Get excursions service."""
-    return DetailsService()
+    return DetailsService(uow)
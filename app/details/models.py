@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import JSON, ForeignKey, Text
+from sqlalchemy import JSON, Computed, ForeignKey, Index, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.details.schemas import DetailsScheme, ItineraryItem
@@ -9,6 +10,14 @@ from app.models import Base
 if TYPE_CHECKING:
     from app.excursions.models import ExcursionModel
 
+DETAILS_SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', "
+    "coalesce(description, '') || ' ' || "
+    "coalesce(meeting_point, '') || ' ' || "
+    "coalesce(inclusions::text, '') || ' ' || "
+    "coalesce(itinerary::text, '')), 'D')"
+)
+
 
 class DetailsModel(Base):
     """Excursion details model.
@@ -21,9 +30,17 @@ class DetailsModel(Base):
         meeting_point: `str`
         requirements: `list[str]`
         recommendations: `list[str]`
+        search_vector: `str` generated full text search document
     """
 
     __tablename__ = "excursion_details"
+    __table_args__ = (
+        Index(
+            "ix_excursion_details_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+    )
 
     excursion_id: Mapped[int] = mapped_column(
         ForeignKey("excursions.id", ondelete="CASCADE"),
@@ -37,6 +54,10 @@ class DetailsModel(Base):
     requirements: Mapped[list[str]] = mapped_column(JSON, nullable=True)
     recommendations: Mapped[list[str]] = mapped_column(JSON, nullable=True)
 
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(DETAILS_SEARCH_VECTOR, persisted=True), deferred=True
+    )
+
     excursion: Mapped["ExcursionModel"] = relationship(
         "ExcursionModel", back_populates="details"
     )
@@ -17,13 +17,12 @@ from app.details.schemas import (
 from app.details.service import DetailsService
 from app.excursions.exceptions import ExcursionNotFoundError
 from app.user.schemas import UserSchema
-from app.utils.cache import cached
+from app.utils.response_cache import CachedRoute, cache_response
 
-details_router = APIRouter(tags=["Details"])
+details_router = APIRouter(tags=["Details"], route_class=CachedRoute)
 
 
 # ===== Public ручки для работы с ExcursionDetailsModel =====
-@cached(ttl=settings.ttl, key_prefix="excursion_details")
 @details_router.get(
     "/details/{excursion_id}",
     response_model=DetailsScheme,
@@ -31,6 +30,11 @@ details_router = APIRouter(tags=["Details"])
         404: {"description": "Excursion details not found"},
     },
 )
+@cache_response(
+    ttl=settings.ttl,
+    key_prefix="excursion_details",
+    max_age=settings.http_cache_max_age,
+)
 async def get_excursion_details(
     excursion_id: int,
     service: Annotated[DetailsService, Depends(get_details_service)],
@@ -1,6 +1,5 @@
 from loguru import logger
 
-from app.database import async_session_maker
 from app.details.exceptions import (
     ExcursionDetailsAlreadyExistError,
     ExcursionDetailsNotFoundError,
@@ -11,20 +10,23 @@ from app.details.schemas import (
     DetailsScheme,
     DetailsUpdateScheme,
 )
+from app.excursions.id_index import excursion_id_index
 from app.excursions.service import ExcursionService
 from app.repository import SQLAlchemyRepository
+from app.unit_of_work import UnitOfWork
 from app.utils.cache import invalidate_cache
 
 
 class DetailsService:
     """Service for excursion details."""
 
-    def __init__(self) -> None:
+    def __init__(self, uow: UnitOfWork | None = None) -> None:
         """Create excursion service and details repository."""
-        self.excursion_service = ExcursionService()
+        self.uow = uow or UnitOfWork()
+        self.excursion_service = ExcursionService(self.uow)
 
         self.details_repository: SQLAlchemyRepository[DetailsModel] = (
-            SQLAlchemyRepository(async_session_maker, DetailsModel)
+            SQLAlchemyRepository(self.uow, DetailsModel)
         )
 
     async def get_excursion_details(self, excursion_id: int) -> DetailsScheme:
@@ -42,6 +44,9 @@ class DetailsService:
             excursion_id,
         )
 
+        if not await excursion_id_index.may_exist(excursion_id):
+            raise ExcursionDetailsNotFoundError()
+
         details = await self.details_repository.find_one(
             filter=(DetailsModel.excursion_id == excursion_id)
         )
@@ -51,8 +56,8 @@ class DetailsService:
         return details.to_read_model()
 
     @invalidate_cache(
-        "excursion_details*",
-        "excursion_full*",
+        "excursion_details",
+        "excursion_full",
     )
     async def create_excursion_details(
         self, excursion_id: int, details: DetailsCreateScheme
@@ -76,22 +81,23 @@ class DetailsService:
             details=details,
         )
 
-        await self.excursion_service.get_excursion(excursion_id)
-        old_details = await self.details_repository.find_one(
-            filter=(DetailsModel.excursion_id == excursion_id)
-        )
-        if old_details:
-            raise ExcursionDetailsAlreadyExistError()
+        async with self.uow:
+            await self.excursion_service.get_excursion(excursion_id)
+            old_details = await self.details_repository.find_one(
+                filter=(DetailsModel.excursion_id == excursion_id)
+            )
+            if old_details:
+                raise ExcursionDetailsAlreadyExistError()
 
-        creation_data = {**details.model_dump()}
-        creation_data["excursion_id"] = excursion_id
+            creation_data = {**details.model_dump()}
+            creation_data["excursion_id"] = excursion_id
 
-        new_details = await self.details_repository.add_one(data=creation_data)
+            new_details = await self.details_repository.add_one(data=creation_data)
         return new_details.to_read_model()
 
     @invalidate_cache(
-        "excursion_details*",
-        "excursion_full*",
+        "excursion_details",
+        "excursion_full",
     )
     async def update_excursion_details(
         self, excursion_id: int, details_update: DetailsUpdateScheme
@@ -115,19 +121,20 @@ class DetailsService:
             details=details_update,
         )
 
-        await self.excursion_service.get_excursion(excursion_id)
-        details = await self.get_excursion_details(excursion_id=excursion_id)
+        async with self.uow:
+            await self.excursion_service.get_excursion(excursion_id)
+            details = await self.get_excursion_details(excursion_id=excursion_id)
 
-        updated_details = await self.details_repository.update(
-            where=DetailsModel.id == details.id,
-            data=details_update.model_dump(),
-        )
-        if updated_details is None:
-            raise ExcursionDetailsNotFoundError()
+            updated_details = await self.details_repository.update(
+                where=DetailsModel.id == details.id,
+                data=details_update.model_dump(),
+            )
+            if updated_details is None:
+                raise ExcursionDetailsNotFoundError()
 
         return updated_details.to_read_model()
 
-    @invalidate_cache("excursion_details*", "excursion_full*", "excursion_with_details*")
+    @invalidate_cache("excursion_details", "excursion_full", "excursion_with_details")
     async def delete_excursion_details(self, excursion_id: int) -> bool:
         """Delete excursion details by excursion id.
 
@@ -142,9 +149,10 @@ class DetailsService:
             "Delete excursion details for excursion with id: {!r}", excursion_id
         )
 
-        details = await self.get_excursion_details(excursion_id=excursion_id)
-        details_id = await self.details_repository.delete_one(id=details.id)
-        if details_id is None:
-            raise ExcursionDetailsNotFoundError()
+        async with self.uow:
+            details = await self.get_excursion_details(excursion_id=excursion_id)
+            details_id = await self.details_repository.delete_one(id=details.id)
+            if details_id is None:
+                raise ExcursionDetailsNotFoundError()
 
         return True
@@ -0,0 +1,65 @@
+"""File with entity cache of single excursions.
+
+Excursions are cached by id as `excursion:{id}`. Every key is tagged with
+itself and with `ENTITY_TAG`, so one excursion or all of them can be
+dropped from Redis and from local caches of all workers.
+"""
+
+from app.config import settings
+from app.excursions.schemas import ExcursionScheme
+from app.utils.cache import redis_cache
+
+ENTITY_TAG = "excursion"
+
+
+def excursion_key(excursion_id: int) -> str:
+    """Cache key (and tag) of excursion."""
+    return f"{ENTITY_TAG}:{excursion_id}"
+
+
+async def get_cached_excursion(excursion_id: int) -> ExcursionScheme | None:
+    """Get excursion from cache.
+
+    Args:
+        excursion_id: `int`
+
+    Return: `ExcursionScheme | None`
+    """
+    key = excursion_key(excursion_id)
+    value = await redis_cache.get(key, tags=(ENTITY_TAG, key))
+    if value is None:
+        return None
+    return ExcursionScheme.model_validate(value)
+
+
+async def cache_excursion(excursion: ExcursionScheme, changed: bool = True) -> None:
+    """Write excursion to cache.
+
+    Excursion read from the database (`changed=False`) is written only if
+    it is not cached yet: it may have been read before a concurrent change,
+    which is written through and must not be overwritten.
+
+    Args:
+        excursion: `ExcursionScheme`
+        changed: `bool` excursion was changed, drop old copies of other workers
+    """
+    key = excursion_key(excursion.id)
+    await redis_cache.set(
+        key,
+        excursion.model_dump(mode="json"),
+        settings.ttl,
+        tags=(ENTITY_TAG, key),
+        nx=not changed,
+    )
+    if changed:
+        await redis_cache.publish_invalidation(key)
+
+
+async def invalidate_excursion(excursion_id: int | None = None) -> None:
+    """Drop one excursion or all excursions from cache.
+
+    Args:
+        excursion_id: `int | None` `None` to drop all excursions
+    """
+    tag = ENTITY_TAG if excursion_id is None else excursion_key(excursion_id)
+    await redis_cache.invalidate_tags(tag)
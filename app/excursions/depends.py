@@ -1,8 +1,15 @@
 """Depends for excursions module."""
 
+from typing import Annotated
+
+from fastapi import Depends
+
 from app.excursions.service import ExcursionService
+from app.unit_of_work import UnitOfWork, get_unit_of_work
 
 
-async def get_excursion_service() -> ExcursionService:
+async def get_excursion_service(
+    uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
+) -> ExcursionService:
     """Get excursions service."""
-    return ExcursionService()
+    return ExcursionService(uow)
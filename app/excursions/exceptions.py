@@ -24,3 +24,10 @@ class ExcursionBusNumberNegativeError(ServiceError):
 
     status_code = status.HTTP_400_BAD_REQUEST
     message = "Bus number can not be under zero"
+
+
+class ExcursionSeatInventoryUnavailableError(ServiceError):
+    """Seat inventory of hot excursion is unavailable."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    message = "Seat inventory is unavailable, try again later"
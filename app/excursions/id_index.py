@@ -0,0 +1,123 @@
+"""File with index of existing excursion ids.
+
+Index answers whether an excursion may exist without a database query:
+Bloom filter of ids loaded by the last rebuild plus short-lived "missing"
+marks in the cache for ids which were looked up and not found. Ids above
+the largest loaded one may be created by any worker, so they are never
+rejected. Only `rebuild` moves this watermark: ids added by one worker
+are unknown to the others.
+
+An id below the watermark may still be committed after the rebuild read
+the ids (it was allocated before). So ids of created excursions are also
+kept in a Redis set, which is checked before an id is rejected.
+"""
+
+from loguru import logger
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.excursions.models import ExcursionModel
+from app.repository import SQLAlchemyRepository
+from app.unit_of_work import UnitOfWork
+from app.utils.bloom import BloomFilter
+from app.utils.cache import redis_cache
+from app.utils.redis_config import redis_client
+
+MISSING_KEY_PREFIX = "excursion_missing"
+CREATED_KEY = "excursion_ids_created"
+# Дольше суток между перестройками, чтобы id дожил до следующей
+CREATED_TTL = 2 * 24 * 60 * 60
+
+
+class ExcursionIdIndex:
+    """Index of existing excursion ids of the worker."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter: BloomFilter | None = None
+        self._max_id = 0
+
+    async def rebuild(self) -> None:
+        """Load all excursion ids from database."""
+        repository: SQLAlchemyRepository[ExcursionModel] = SQLAlchemyRepository(
+            UnitOfWork(), ExcursionModel
+        )
+        ids = await repository.find_ids()
+
+        bloom = BloomFilter(max(self.capacity, len(ids) * 2), self.error_rate)
+        for excursion_id in ids:
+            bloom.add(excursion_id)
+
+        self._filter = bloom
+        self._max_id = max(ids, default=0)
+        logger.info("Excursion id index rebuilt with {} ids", len(ids))
+
+    def add(self, excursion_id: int) -> None:
+        """Add id of created (or found) excursion.
+
+        Watermark is not moved: other workers do not know this id, so ids
+        below it which they created must not be rejected.
+        """
+        if self._filter is not None:
+            self._filter.add(excursion_id)
+
+    async def add_created(self, excursion_id: int) -> None:
+        """Add id of a committed excursion for all workers.
+
+        Must be called after the commit, so a rebuild which misses the id
+        runs before the id is put to the Redis set.
+        """
+        self.add(excursion_id)
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.sadd(CREATED_KEY, excursion_id)
+                pipe.expire(CREATED_KEY, CREATED_TTL)
+                await pipe.execute()
+        except RedisError as e:
+            logger.error("Failed to add created excursion id {}: {}", excursion_id, e)
+
+    async def may_exist(self, excursion_id: int) -> bool:
+        """Check if excursion may exist.
+
+        Args:
+            excursion_id: `int`
+
+        Return: `bool` `False` only if excursion surely does not exist
+        """
+        if (
+            self._filter is not None
+            and excursion_id <= self._max_id
+            and excursion_id not in self._filter
+            and not await self._is_created(excursion_id)
+        ):
+            return False
+        return await redis_cache.get(self._missing_key(excursion_id)) is None
+
+    async def mark_missing(self, excursion_id: int) -> None:
+        """Remember for a short time that excursion does not exist."""
+        await redis_cache.set(
+            self._missing_key(excursion_id),
+            True,
+            settings.negative_cache_ttl,
+            tags=(MISSING_KEY_PREFIX,),
+        )
+
+    @staticmethod
+    async def _is_created(excursion_id: int) -> bool:
+        """Check if excursion was created after the rebuild of some worker."""
+        try:
+            return bool(await redis_client.sismember(CREATED_KEY, str(excursion_id)))
+        except RedisError as e:
+            logger.error("Failed to check created excursion id {}: {}", excursion_id, e)
+            return True
+
+    @staticmethod
+    def _missing_key(excursion_id: int) -> str:
+        return f"{MISSING_KEY_PREFIX}:{excursion_id}"
+
+
+excursion_id_index = ExcursionIdIndex(
+    capacity=settings.excursion_id_index_capacity,
+    error_rate=settings.excursion_id_index_error_rate,
+)
@@ -0,0 +1,210 @@
+"""File with Redis seat inventory of hot excursions.
+
+Seats of excursions with `hot_inventory` are kept in a Redis counter
+`excursion_seats:{id}`, which is changed by one Lua script, so concurrent
+confirmations take seats without waiting for the row lock of the excursion.
+Confirmed bookings stay the source of truth: counters are seeded with seats
+left by committed bookings and `people_left` of the excursion is reconciled
+in background, see `ExcursionService.reconcile_hot_inventory`.
+"""
+
+import asyncio
+import secrets
+from typing import Awaitable, Callable
+
+import redis.asyncio as redis
+from loguru import logger
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.excursions.exceptions import (
+    ExcursionAddPeopleOverflowError,
+    ExcursionSeatInventoryUnavailableError,
+)
+from app.utils.metrics import SEAT_INVENTORY_RESEEDS
+from app.utils.redis_config import redis_client
+
+SEATS_PREFIX = "excursion_seats"
+RECONCILER_LOCK_KEY = "excursion_seats_reconciler"
+# Лидер продлевает блокировку каждый проход, при его остановке её через
+# несколько интервалов берёт другой воркер
+RECONCILER_LOCK_INTERVALS = 3
+
+# -1 - счётчика нет (не засеян), -2 - не хватает мест, иначе остаток мест
+CHANGE_SEATS_SCRIPT = """
+local seats = redis.call('GET', KEYS[1])
+if not seats then
+    return -1
+end
+local count = tonumber(ARGV[1])
+if count > 0 and tonumber(seats) < count then
+    return -2
+end
+return redis.call('DECRBY', KEYS[1], count)
+"""
+NO_COUNTER = -1
+NOT_ENOUGH_SEATS = -2
+
+# Пересев счётчика, только если он не изменился с момента чтения:
+# иначе затёрлись бы места, взятые между чтением и пересевом
+RESEED_SEATS_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# Блокировка сверки: продлевается владельцем или берётся, если свободна
+ACQUIRE_RECONCILER_SCRIPT = """
+local owner = redis.call('GET', KEYS[1])
+if owner == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+if not owner then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+class SeatInventory:
+    """Redis counters of free seats of hot excursions."""
+
+    def __init__(self, redis_client: redis.Redis, ttl: int) -> None:
+        self.redis = redis_client
+        self.ttl = ttl
+        self._change_seats = self.redis.register_script(CHANGE_SEATS_SCRIPT)
+        self._reseed_seats = self.redis.register_script(RESEED_SEATS_SCRIPT)
+        self._acquire_reconciler = self.redis.register_script(ACQUIRE_RECONCILER_SCRIPT)
+        # Расхождение счётчика с БД на прошлой сверке: id -> (счётчик, БД)
+        self._drift: dict[int, tuple[int, int]] = {}
+
+    async def change(self, excursion_id: int, count: int) -> int | None:
+        """Take seats, or release them with negative count.
+
+        Args:
+            excursion_id: `int`
+            count: `int` seats to take, negative to release
+
+        Return: `int | None` seats left, `None` if counter is not seeded
+
+        Raise:
+            `ExcursionAddPeopleOverflowError` if there are not enough seats
+            `ExcursionSeatInventoryUnavailableError` if Redis is unavailable
+        """
+        try:
+            seats = await self._change_seats(
+                keys=[self._key(excursion_id)], args=[count]
+            )
+        except RedisError as e:
+            logger.error("Seat inventory error for excursion {}: {}", excursion_id, e)
+            raise ExcursionSeatInventoryUnavailableError() from e
+
+        if seats == NO_COUNTER:
+            return None
+        if seats == NOT_ENOUGH_SEATS:
+            raise ExcursionAddPeopleOverflowError()
+        return int(seats)
+
+    async def seed(self, excursion_id: int, seats: int) -> None:
+        """Create counter if it does not exist.
+
+        Raise: `ExcursionSeatInventoryUnavailableError` if Redis is unavailable
+        """
+        try:
+            created = await self.redis.set(
+                self._key(excursion_id), seats, nx=True, ex=self.ttl
+            )
+        except RedisError as e:
+            logger.error("Seat inventory error for excursion {}: {}", excursion_id, e)
+            raise ExcursionSeatInventoryUnavailableError() from e
+
+        if created:
+            SEAT_INVENTORY_RESEEDS.labels(reason="missing").inc()
+            logger.info("Seat counter of excursion {} seeded: {}", excursion_id, seats)
+
+    async def reconcile(self, excursion_id: int, seats: int) -> int:
+        """Check counter against seats left by committed bookings.
+
+        Counter may differ from the database for a moment while bookings
+        are being confirmed, so it is re-seeded only if the same difference
+        is found by two reconciliations in a row, and only if the counter
+        was not changed since it was read.
+
+        Args:
+            excursion_id: `int`
+            seats: `int` seats left by committed bookings
+
+        Return: `int` seats in counter after reconciliation
+        """
+        key = self._key(excursion_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.expire(key, self.ttl)
+            counter, _ = await pipe.execute()
+
+        if counter is None:
+            self._drift.pop(excursion_id, None)
+            await self.seed(excursion_id, seats)
+            return seats
+
+        counter = int(counter)
+        if counter == seats:
+            self._drift.pop(excursion_id, None)
+            return counter
+
+        if self._drift.get(excursion_id) != (counter, seats):
+            self._drift[excursion_id] = (counter, seats)
+            return counter
+
+        del self._drift[excursion_id]
+        if not await self._reseed_seats(keys=[key], args=[counter, seats, self.ttl]):
+            logger.debug("Seat counter of excursion {} changed", excursion_id)
+            return counter
+
+        SEAT_INVENTORY_RESEEDS.labels(reason="drift").inc()
+        logger.warning(
+            "Seat counter of excursion {} drifted: {} in Redis, {} in database",
+            excursion_id,
+            counter,
+            seats,
+        )
+        return seats
+
+    async def drop(self, excursion_id: int) -> None:
+        """Delete counter, it is seeded again from the database when needed."""
+        self._drift.pop(excursion_id, None)
+        await self.redis.delete(self._key(excursion_id))
+
+    async def run_reconciler(
+        self, reconcile: Callable[[], Awaitable[None]], interval: float
+    ) -> None:
+        """Run reconciliation every `interval` seconds until cancelled.
+
+        Reconciler runs in every worker, but only the one holding the Redis
+        lock `RECONCILER_LOCK_KEY` reconciles, so the database is read once
+        per interval and drift is checked by the same worker every time.
+        """
+        token = secrets.token_hex(8)
+        lock_ttl_ms = int(interval * RECONCILER_LOCK_INTERVALS * 1000)
+        while True:
+            try:
+                if await self._acquire_reconciler(
+                    keys=[RECONCILER_LOCK_KEY], args=[token, lock_ttl_ms]
+                ):
+                    await reconcile()
+                else:
+                    self._drift.clear()
+            except Exception as e:  # noqa: BLE001
+                logger.error("Seat inventory reconciliation failed: {}", e)
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def _key(excursion_id: int) -> str:
+        return f"{SEATS_PREFIX}:{excursion_id}"
+
+
+seat_inventory = SeatInventory(redis_client, ttl=settings.hot_inventory_ttl)
@@ -3,7 +3,8 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import JSON, TIMESTAMP, Enum
+from sqlalchemy import JSON, TIMESTAMP, Computed, Enum, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.excursions.schemas import (
@@ -16,6 +17,14 @@ if TYPE_CHECKING:
     from app.details.models import DetailsModel
     from app.images.models import ImageModel
 
+# Search document of excursion, weighted by field. Details of excursion have
+# their own document, see `DetailsModel.search_vector`.
+EXCURSION_SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(cities::text, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'C')"
+)
+
 
 class ExcursionModel(Base):
     """Excursion model.
@@ -31,11 +40,17 @@ class ExcursionModel(Base):
         is_active: `bool`
         bus_number: `int`
         cities: `list[str]`
+        hot_inventory: `bool` seats are kept in Redis, see `app.excursions.inventory`
+        search_vector: `str` generated full text search document
         images: `list[ExcursionImageModel]`
         details: `ExcursionDetailsModel`
     """
 
     __tablename__ = "excursions"
+    __table_args__ = (
+        Index("ix_excursions_is_active_type_date", "is_active", "type", "date", "id"),
+        Index("ix_excursions_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     type: Mapped[ExcursionType] = mapped_column(
         Enum(ExcursionType), nullable=False, default=ExcursionType.EXCURSION
@@ -51,6 +66,11 @@ class ExcursionModel(Base):
     bus_number: Mapped[int] = mapped_column(nullable=True, default=0)
 
     cities: Mapped[list[str]] = mapped_column(JSON, nullable=False, default=[])
+    hot_inventory: Mapped[bool] = mapped_column(nullable=False, default=False)
+
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(EXCURSION_SEARCH_VECTOR, persisted=True), deferred=True
+    )
 
     images: Mapped[list["ImageModel"]] = relationship(
         "ImageModel",
@@ -81,6 +101,7 @@ class ExcursionModel(Base):
             id=self.id,
             cities=list(self.cities),
             type=self.type,
+            hot_inventory=self.hot_inventory,
         )
 
     def __repr__(self) -> str:
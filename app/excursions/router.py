@@ -2,7 +2,7 @@
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
 from app.auth.depends import require_superuser
 from app.config import settings
@@ -11,6 +11,7 @@ from app.excursions.exceptions import (
     ExcursionAddPeopleOverflowError,
     ExcursionBusNumberNegativeError,
     ExcursionNotFoundError,
+    ExcursionSeatInventoryUnavailableError,
 )
 from app.excursions.schemas import (
     ExcursionCreateScheme,
@@ -18,50 +19,81 @@ from app.excursions.schemas import (
     ExcursionType,
     ExcursionUpdateScheme,
 )
-from app.excursions.service import ExcursionService
+from app.excursions.service import EXCURSION_CURSOR_FIELDS, ExcursionService
+from app.pagination import InvalidCursorError, OffsetCursorParams, set_next_cursor
 from app.user.schemas import UserSchema
-from app.utils.cache import cached
+from app.utils.response_cache import CachedRoute, cache_response
 
-excursion_router = APIRouter(tags=["Excursion"])
+excursion_router = APIRouter(tags=["Excursion"], route_class=CachedRoute)
 
 
-@cached(ttl=settings.ttl, key_prefix="active_excursions")
 @excursion_router.get(
     "/excursions/active",
     response_model=list[ExcursionScheme],
 )
+# Service layer caches it stale-while-revalidate, route only sets headers
+@cache_response(
+    ttl=0,
+    key_prefix="active_excursions",
+    max_age=settings.http_cache_max_age,
+)
 async def get_active_excursions(
+    response: Response,
     service: Annotated[ExcursionService, Depends(get_excursion_service)],
-    skip: int = 0,
-    limit: int = 100,
+    page: Annotated[OffsetCursorParams, Depends()],
     excursion_type: ExcursionType = ExcursionType.EXCURSION,
 ) -> list[ExcursionScheme]:
-    """Get active excursions by offset, limit and excursion type."""
-    return await service.get_active_excursions(
-        offset=skip,
-        limit=limit,
-        excursion_type=excursion_type,
-    )
+    """Get active excursions by cursor (or offset), limit and excursion type.
+
+    Cursor of the next page is returned in `X-Next-Cursor` header.
+    """
+    try:
+        excursions = await service.get_active_excursions(
+            offset=page.skip,
+            limit=page.limit,
+            excursion_type=excursion_type,
+            cursor=page.cursor,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.message,
+        ) from e
+
+    set_next_cursor(response, excursions, page.limit, EXCURSION_CURSOR_FIELDS)
+    return excursions
 
 
-@cached(ttl=settings.ttl, key_prefix="not_active_excursions")
 @excursion_router.get(
     "/excursions/not_active",
     response_model=list[ExcursionScheme],
 )
 async def get_not_active_excursions(
+    response: Response,
     service: Annotated[ExcursionService, Depends(get_excursion_service)],
     _: Annotated[UserSchema, Depends(require_superuser)],
-    skip: int = 0,
-    limit: int = 100,
+    page: Annotated[OffsetCursorParams, Depends()],
     excursion_type: ExcursionType = ExcursionType.EXCURSION,
 ) -> list[ExcursionScheme]:
-    """Get not active excursions by offset, limit and excursion type."""
-    return await service.get_not_active_excursions(
-        offset=skip,
-        limit=limit,
-        excursion_type=excursion_type,
-    )
+    """Get not active excursions by cursor (or offset), limit and excursion type.
+
+    Cursor of the next page is returned in `X-Next-Cursor` header.
+    """
+    try:
+        excursions = await service.get_not_active_excursions(
+            offset=page.skip,
+            limit=page.limit,
+            excursion_type=excursion_type,
+            cursor=page.cursor,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.message,
+        ) from e
+
+    set_next_cursor(response, excursions, page.limit, EXCURSION_CURSOR_FIELDS)
+    return excursions
 
 
 @excursion_router.get(
@@ -71,6 +103,11 @@ async def get_not_active_excursions(
         404: {"description": "Excursion not found"},
     },
 )
+@cache_response(
+    ttl=settings.ttl,
+    key_prefix="excursion_full",
+    max_age=settings.http_cache_max_age,
+)
 async def read_excursion(
     service: Annotated[ExcursionService, Depends(get_excursion_service)],
     excursion_id: int,
@@ -85,17 +122,23 @@ async def read_excursion(
         ) from e
 
 
-@cached(ttl=settings.ttl, key_prefix="excursions_search")
 @excursion_router.get(
     "/excursions/search/",
     response_model=list[ExcursionScheme],
 )
+@cache_response(
+    ttl=settings.ttl,
+    key_prefix="excursions_search",
+    max_age=settings.http_cache_max_age,
+)
 async def search_excursions_by_term(
     service: Annotated[ExcursionService, Depends(get_excursion_service)],
     q: str = Query(...),
+    skip: int = 0,
+    limit: int = 20,
 ) -> list[ExcursionScheme]:
-    """Search excursions by term."""
-    return await service.search_excursions(search_term=q)
+    """Search active excursions by term, most relevant first."""
+    return await service.search_excursions(search_term=q, offset=skip, limit=limit)
 
 
 @excursion_router.post("/excursions", response_model=ExcursionScheme)
@@ -180,6 +223,7 @@ async def toggle_excursion_active(
     responses={
         400: {"description": "Add people overflow"},
         404: {"description": "Excursion not found"},
+        503: {"description": "Seat inventory is unavailable"},
     },
 )
 async def add_people(
@@ -196,6 +240,7 @@ async def add_people(
     except (
         ExcursionNotFoundError,
         ExcursionAddPeopleOverflowError,
+        ExcursionSeatInventoryUnavailableError,
     ) as e:
         raise HTTPException(
             status_code=e.status_code,
@@ -27,6 +27,7 @@ class ExcursionBaseScheme(BaseModel):
     people_left: int
     bus_number: int = 0
     is_active: bool
+    hot_inventory: bool = False
 
     cities: list[str]
 
@@ -49,6 +50,7 @@ class ExcursionUpdateScheme(BaseModel):
     people_left: int | None
     is_active: bool | None
     bus_number: int | None
+    hot_inventory: bool | None = None
 
     cities: list[str]
 
@@ -3,13 +3,26 @@
 from datetime import datetime
 
 from loguru import logger
-
-from app.database import async_session_maker
+from sqlalchemy import ColumnElement, cast, func, literal, or_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from app.booking.models import BookingModel
+from app.booking.schemas import BookingStatus
+from app.config import settings
+from app.details.models import DetailsModel
+from app.excursions.cache import (
+    cache_excursion,
+    get_cached_excursion,
+    invalidate_excursion,
+)
 from app.excursions.exceptions import (
     ExcursionAddPeopleOverflowError,
     ExcursionBusNumberNegativeError,
     ExcursionNotFoundError,
+    ExcursionSeatInventoryUnavailableError,
 )
+from app.excursions.id_index import excursion_id_index
+from app.excursions.inventory import seat_inventory
 from app.excursions.models import (
     ExcursionModel,
 )
@@ -19,22 +32,32 @@ from app.excursions.schemas import (
     ExcursionType,
     ExcursionUpdateScheme,
 )
-from app.repository import SQLAlchemyRepository
-from app.utils.cache import invalidate_cache
+from app.images.service import ImageService
+from app.pagination import KeysetPage
+from app.repository import QueryOptions, SQLAlchemyRepository
+from app.unit_of_work import UnitOfWork
+from app.utils.cache import cached, invalidate_cache
+
+EXCURSION_CURSOR_FIELDS = ("date", "id")
+EXCURSION_CURSOR_TYPES = (datetime, int)
+SEARCH_CONFIG = "russian"
 
 
 class ExcursionService:
     """Service for excursion models."""
 
-    def __init__(self) -> None:
-        """Create excursion repository and details service."""
+    def __init__(self, uow: UnitOfWork | None = None) -> None:
+        """Create excursion repository."""
+        self.uow = uow or UnitOfWork()
         self.excursion_repository: SQLAlchemyRepository[ExcursionModel] = (
-            SQLAlchemyRepository(async_session_maker, ExcursionModel)
+            SQLAlchemyRepository(self.uow, ExcursionModel)
         )
 
     async def get_excursion(self, excursion_id: int) -> ExcursionScheme:
         """Get excursion by id.
 
+        Outside of a transaction excursion is read from the entity cache.
+
         Args:
             excursion_id: `int`
 
@@ -44,84 +67,123 @@ class ExcursionService:
         """
         logger.debug("Get excursion with id: {id!r}", id=excursion_id)
 
+        if not await excursion_id_index.may_exist(excursion_id):
+            raise ExcursionNotFoundError()
+
+        use_cache = not self.uow.in_transaction
+        if use_cache:
+            cached_excursion = await get_cached_excursion(excursion_id)
+            if cached_excursion is not None:
+                return cached_excursion
+
         excursion = await self.excursion_repository.find_one(
             filter=ExcursionModel.id == excursion_id,
         )
         if excursion is None:
+            await excursion_id_index.mark_missing(excursion_id)
             raise ExcursionNotFoundError()
 
-        return excursion.to_read_model()
+        excursion_id_index.add(excursion_id)
+        parsed = excursion.to_read_model()
+        if use_cache:
+            await cache_excursion(parsed, changed=False)
+        return parsed
 
+    @cached(
+        ttl=settings.ttl, key_prefix="active_excursions", stale_ttl=settings.stale_ttl
+    )
     async def get_active_excursions(
         self,
         offset: int = 0,
         limit: int = 100,
         excursion_type: ExcursionType = ExcursionType.EXCURSION,
+        cursor: str | None = None,
     ) -> list[ExcursionScheme]:
-        """Get active excursions by offset, limit and excursion type.
+        """Get active excursions page ordered by date and id.
 
         Args:
-            offset: `int`
+            offset: `int` used only without cursor
             limit: `int`
             excursion_type: `ExcursionType`
+            cursor: `str | None` cursor of the previous page
 
         Return: `list[ExcursionScheme]`
+
+        Raise: `InvalidCursorError` if cursor is invalid
         """
         logger.debug(
-            "Get active excursions with offset={!r}, limit={!r} and excursion_type={!r}",
+            (
+                "Get active excursions with offset={!r}, limit={!r},"
+                " excursion_type={!r} and cursor={!r}"
+            ),
             offset,
             limit,
             excursion_type,
+            cursor,
         )
         filter_by = (ExcursionModel.is_active == True) & (  # noqa: E712
             ExcursionModel.type == excursion_type
         )
-        excursions = await self.excursion_repository.find_all(
-            offset=offset,
-            limit=limit,
-            filter_by=filter_by,
-            order_by=ExcursionModel.date,
-        )
-        return [excursion.to_read_model() for excursion in excursions]
+        return await self._get_excursions_page(filter_by, offset, limit, cursor)
 
     async def get_not_active_excursions(
         self,
         offset: int = 0,
         limit: int = 100,
         excursion_type: ExcursionType = ExcursionType.EXCURSION,
+        cursor: str | None = None,
     ) -> list[ExcursionScheme]:
-        """Get not active excursions by offset, limit and excursion type.
+        """Get not active excursions page ordered by date and id.
 
         Args:
-            offset: `int`
+            offset: `int` used only without cursor
             limit: `int`
             excursion_type: `ExcursionType`
+            cursor: `str | None` cursor of the previous page
 
         Return: `list[ExcursionScheme]`
+
+        Raise: `InvalidCursorError` if cursor is invalid
         """
         logger.debug(
-            "Get not active excursions with offset={!r},"
-            " limit={!r} and excursion_type={!r}",
+            (
+                "Get not active excursions with offset={!r}, limit={!r},"
+                " excursion_type={!r} and cursor={!r}"
+            ),
             offset,
             limit,
             excursion_type,
+            cursor,
         )
 
         filter_by = (ExcursionModel.is_active == False) & (  # noqa: E712
             ExcursionModel.type == excursion_type
         )
-        excursions = await self.excursion_repository.find_all(
-            offset=offset, limit=limit, order_by=ExcursionModel.date, filter_by=filter_by
+        return await self._get_excursions_page(filter_by, offset, limit, cursor)
+
+    async def _get_excursions_page(
+        self,
+        filter_by: ColumnElement[bool],
+        offset: int,
+        limit: int,
+        cursor: str | None,
+    ) -> list[ExcursionScheme]:
+        """Get excursions page ordered by `EXCURSION_CURSOR_FIELDS`."""
+        excursions = await self.excursion_repository.find_page(
+            order_by=[ExcursionModel.date, ExcursionModel.id],
+            page=KeysetPage.from_cursor(cursor, EXCURSION_CURSOR_TYPES, limit, offset),
+            filter_by=filter_by,
         )
         return [excursion.to_read_model() for excursion in excursions]
 
     @invalidate_cache(
-        "not_active_excursions*",
-        "active_excursions*",
-        "excurion_excursion_images*",
-        "excursions_search*",
-        "excursion_details*",
-        "excursion_full*",
+        "not_active_excursions",
+        "active_excursions",
+        "excurion_excursion_images",
+        "excursions_search",
+        "excursion_details",
+        "excursion_full",
+        "excursion_missing",
     )
     async def create_excursion(
         self, excursion: ExcursionCreateScheme
@@ -138,15 +200,22 @@ class ExcursionService:
         created_excursion = await self.excursion_repository.add_one(
             excursion.model_dump()
         )
-        return created_excursion.to_read_model()
+        created_id = created_excursion.id
+
+        async def add_to_index() -> None:
+            # Перестройка индекса могла прочитать id до коммита
+            await excursion_id_index.add_created(created_id)
+
+        await self.uow.on_commit(add_to_index)
+        return await self._write_through(created_excursion.to_read_model())
 
     @invalidate_cache(
-        "not_active_excursions*",
-        "active_excursions*",
-        "excurion_excursion_images*",
-        "excursions_search*",
-        "excursion_details*",
-        "excursion_full*",
+        "not_active_excursions",
+        "active_excursions",
+        "excurion_excursion_images",
+        "excursions_search",
+        "excursion_details",
+        "excursion_full",
     )
     async def update_excursion(
         self, excursion_id: int, excursion_update: ExcursionUpdateScheme
@@ -167,41 +236,76 @@ class ExcursionService:
             data=excursion_update,
         )
 
-        await self.get_excursion(excursion_id)
+        async with self.uow:
+            await self.get_excursion(excursion_id)
 
-        new_excursion = await self.excursion_repository.update(
-            where=ExcursionModel.id == excursion_id,
-            data=excursion_update.model_dump(),
-        )
-        if new_excursion is None:
-            raise ExcursionNotFoundError()
+            data = excursion_update.model_dump()
+            if data["hot_inventory"] is None:
+                # Hot mode is changed only if it is sent
+                del data["hot_inventory"]
+
+            new_excursion = await self.excursion_repository.update(
+                where=ExcursionModel.id == excursion_id,
+                data=data,
+            )
+            if new_excursion is None:
+                raise ExcursionNotFoundError()
 
-        return new_excursion.to_read_model()
+        async def drop_seats() -> None:
+            # Seats or hot mode may be changed, counter is seeded again if needed
+            await seat_inventory.drop(excursion_id)
 
-    async def search_excursions(self, search_term: str) -> list[ExcursionScheme]:
-        """Search excursion by search term.
+        await self.uow.on_commit(drop_seats)
+        return await self._write_through(new_excursion.to_read_model())
+
+    async def search_excursions(
+        self, search_term: str, offset: int = 0, limit: int = 20
+    ) -> list[ExcursionScheme]:
+        """Full text search of active excursions, most relevant first.
+
+        Search term uses web search syntax (`"phrase"`, `or`, `-word`) and
+        matches excursion title, cities, description and excursion details.
 
         Args:
             search_term: `str`
+            offset: `int`
+            limit: `int`
 
         Return: `list[ExcursionScheme]`
         """
-        logger.debug("Search excursion by serch term: {!r}", search_term)
+        logger.debug(
+            "Search excursion by serch term: {!r}, offset={!r}, limit={!r}",
+            search_term,
+            offset,
+            limit,
+        )
 
-        filter = ExcursionModel.title.ilike(
-            f"%{search_term}%"
-        ) | ExcursionModel.description.ilike(f"%{search_term}%")
-        excursions = await self.excursion_repository.find_all(filter_by=filter)
+        query = func.websearch_to_tsquery(SEARCH_CONFIG, search_term)
+        details_vector = func.coalesce(
+            DetailsModel.search_vector, cast(literal(""), TSVECTOR)
+        )
+        filter = (ExcursionModel.is_active == True) & or_(  # noqa: E712
+            ExcursionModel.search_vector.op("@@")(query),
+            DetailsModel.search_vector.op("@@")(query),
+        )
+        rank = func.ts_rank(ExcursionModel.search_vector.op("||")(details_vector), query)
+        excursions = await self.excursion_repository.find_all(
+            filter_by=filter,
+            order_by=[rank.desc(), ExcursionModel.date, ExcursionModel.id],
+            offset=offset,
+            limit=limit,
+            options=QueryOptions(join_by=DetailsModel, outer_join=True),
+        )
 
         return [excursion.to_read_model() for excursion in excursions]
 
     @invalidate_cache(
-        "not_active_excursions*",
-        "active_excursions*",
-        "excurion_excursion_images*",
-        "excursions_search*",
-        "excursion_details*",
-        "excursion_full*",
+        "not_active_excursions",
+        "active_excursions",
+        "excurion_excursion_images",
+        "excursions_search",
+        "excursion_details",
+        "excursion_full",
     )
     async def delete_excursion(self, excursion_id: int) -> bool:
         """Delete excursion by excursion id.
@@ -215,18 +319,28 @@ class ExcursionService:
         """
         logger.debug("Delete excursion with id: {!r}", excursion_id)
 
-        excursion = await self.excursion_repository.delete_one(id=excursion_id)
-        if excursion is None:
-            raise ExcursionNotFoundError()
+        async with self.uow:
+            # Images are deleted by cascade, their files are released here
+            await ImageService(self.uow).release_excursion_images(excursion_id)
+            excursion = await self.excursion_repository.delete_one(id=excursion_id)
+            if excursion is None:
+                raise ExcursionNotFoundError()
+
+        async def mark_missing() -> None:
+            await invalidate_excursion(excursion_id)
+            await excursion_id_index.mark_missing(excursion_id)
+            await seat_inventory.drop(excursion_id)
+
+        await self.uow.on_commit(mark_missing)
         return True
 
     @invalidate_cache(
-        "not_active_excursions*",
-        "active_excursions*",
-        "excurion_excursion_images*",
-        "excursions_search*",
-        "excursion_details*",
-        "excursion_full*",
+        "not_active_excursions",
+        "active_excursions",
+        "excurion_excursion_images",
+        "excursions_search",
+        "excursion_details",
+        "excursion_full",
     )
     async def toggle_excursion_activity(self, excursion_id: int) -> ExcursionScheme:
         """Toggle excursion activity by excursion id.
@@ -240,38 +354,45 @@ class ExcursionService:
         """
         logger.debug("Toggle excursion activity with id: {!r}", excursion_id)
 
-        excursion = await self.get_excursion(excursion_id)
-        updated_excursion = await self.excursion_repository.update(
-            where=ExcursionModel.id == excursion_id,
-            data={"is_active": not excursion.is_active},
-        )
-        if updated_excursion is None:
-            raise ExcursionNotFoundError()
+        async with self.uow:
+            excursion = await self.get_excursion(excursion_id)
+            updated_excursion = await self.excursion_repository.update(
+                where=ExcursionModel.id == excursion_id,
+                data={"is_active": not excursion.is_active},
+            )
+            if updated_excursion is None:
+                raise ExcursionNotFoundError()
 
-        return updated_excursion.to_read_model()
+        return await self._write_through(updated_excursion.to_read_model())
 
     @invalidate_cache(
-        "not_active_excursions*",
-        "active_excursions*",
-        "excurion_excursion_images*",
-        "excursions_search*",
-        "excursion_details*",
-        "excursion_full*",
+        "not_active_excursions",
+        "active_excursions",
+        "excurion_excursion_images",
+        "excursions_search",
+        "excursion_details",
+        "excursion_full",
     )
     async def change_people_left_count(
         self, excursion_id: int, count_people: int
     ) -> ExcursionScheme:
         """Change people left count by excursion id.
 
+        Seats are taken with one conditional update, so concurrent changes
+        can neither oversell seats nor lose each other. Seats of hot
+        excursions are taken in the Redis counter instead and returned to it
+        if the transaction is rolled back.
+
         Args:
             excursion_id: `int`
-            count_people: `int`
+            count_people: `int` seats to take, negative to release
 
         Return: `ExcursionScheme`
 
         Raise:
             `ExcursionNotFoundError` if excursion not found
             `ExcursionAddPeopleOverflowError` if people left overflow
+            `ExcursionSeatInventoryUnavailableError` if Redis is unavailable
         """
         logger.debug(
             (
@@ -282,27 +403,100 @@ class ExcursionService:
             count_people=count_people,
         )
 
-        excursion = await self.get_excursion(excursion_id)
+        async with self.uow:
+            excursion = await self.get_excursion(excursion_id)
+            if excursion.hot_inventory:
+                return await self._change_hot_seats(excursion, count_people)
+
+            updated_excursion = await self.excursion_repository.update(
+                where=(ExcursionModel.id == excursion_id)
+                & (ExcursionModel.people_left >= count_people),
+                data={"people_left": ExcursionModel.people_left - count_people},
+            )
+            if updated_excursion is None:
+                raise ExcursionAddPeopleOverflowError()
 
-        left = excursion.people_left - count_people
-        if left < 0:
-            raise ExcursionAddPeopleOverflowError()
+        return await self._write_through(updated_excursion.to_read_model())
 
-        updated_excursion = await self.excursion_repository.update(
-            where=ExcursionModel.id == excursion_id,
-            data={"people_left": left},
+    async def _change_hot_seats(
+        self, excursion: ExcursionScheme, count_people: int
+    ) -> ExcursionScheme:
+        """Change seats of hot excursion in the Redis counter."""
+        seats_left = await seat_inventory.change(excursion.id, count_people)
+        if seats_left is None:
+            if count_people < 0:
+                # Counter is seeded from committed bookings, released seats
+                # are counted there after commit
+                return excursion
+            free_seats = await self._count_free_seats([excursion])
+            await seat_inventory.seed(excursion.id, free_seats[excursion.id])
+            seats_left = await seat_inventory.change(excursion.id, count_people)
+            if seats_left is None:
+                raise ExcursionSeatInventoryUnavailableError()
+
+        async def restore_seats() -> None:
+            await seat_inventory.change(excursion.id, -count_people)
+
+        await self.uow.on_rollback(restore_seats)
+        return excursion.model_copy(update={"people_left": seats_left})
+
+    async def _count_free_seats(
+        self, excursions: list[ExcursionScheme]
+    ) -> dict[int, int]:
+        """Count seats left by committed confirmed bookings of excursions."""
+        # Own unit of work: seats taken by the open transaction are not counted
+        booking_repository: SQLAlchemyRepository[BookingModel] = SQLAlchemyRepository(
+            UnitOfWork(), BookingModel
         )
-        if updated_excursion is None:
-            raise ExcursionNotFoundError()
-        return updated_excursion.to_read_model()
+        taken_seats = await booking_repository.sum_by(
+            BookingModel.total_people,
+            group_by=BookingModel.excursion_id,
+            filter_by=BookingModel.excursion_id.in_([e.id for e in excursions])
+            & (BookingModel.status == BookingStatus.CONFIRMED),
+        )
+        return {e.id: e.people_amount - taken_seats.get(e.id, 0) for e in excursions}
+
+    async def reconcile_hot_inventory(self) -> None:
+        """Reconcile seat counters of hot excursions with database.
+
+        Missing (or drifted) counters are seeded and `people_left` is set to
+        seats left by committed bookings.
+        """
+        filter_by = (
+            (ExcursionModel.hot_inventory == True)  # noqa: E712
+            & (ExcursionModel.is_active == True)  # noqa: E712
+            & (ExcursionModel.date >= datetime.now())
+        )
+        excursions = [
+            excursion.to_read_model()
+            for excursion in await self.excursion_repository.find_all(
+                filter_by=filter_by
+            )
+        ]
+        if not excursions:
+            return
+
+        free_seats = await self._count_free_seats(excursions)
+        for excursion in excursions:
+            seats = free_seats[excursion.id]
+            await seat_inventory.reconcile(excursion.id, seats)
+            if excursion.people_left == seats:
+                continue
+
+            updated_excursion = await self.excursion_repository.update(
+                where=ExcursionModel.id == excursion.id,
+                data={"people_left": seats},
+            )
+            if updated_excursion is not None:
+                await cache_excursion(updated_excursion.to_read_model())
 
     @invalidate_cache(
-        "not_active_excursions*",
-        "active_excursions*",
-        "excurion_excursion_images*",
-        "excursions_search*",
-        "excursion_details*",
-        "excursion_full*",
+        "not_active_excursions",
+        "active_excursions",
+        "excurion_excursion_images",
+        "excursions_search",
+        "excursion_details",
+        "excursion_full",
     )
     async def change_bus_number(
         self, excursion_id: int, bus_number: int
@@ -328,19 +522,20 @@ class ExcursionService:
             bus_number=bus_number,
         )
 
-        await self.get_excursion(excursion_id)
+        async with self.uow:
+            await self.get_excursion(excursion_id)
 
-        if bus_number < 0:
-            raise ExcursionBusNumberNegativeError()
+            if bus_number < 0:
+                raise ExcursionBusNumberNegativeError()
 
-        updated_excursion = await self.excursion_repository.update(
-            where=ExcursionModel.id == excursion_id,
-            data={"bus_number": bus_number},
-        )
-        if updated_excursion is None:
-            raise ExcursionNotFoundError()
+            updated_excursion = await self.excursion_repository.update(
+                where=ExcursionModel.id == excursion_id,
+                data={"bus_number": bus_number},
+            )
+            if updated_excursion is None:
+                raise ExcursionNotFoundError()
 
-        return updated_excursion.to_read_model()
+        return await self._write_through(updated_excursion.to_read_model())
 
     async def get_excursions_with_expired_date(self) -> list[ExcursionScheme]:
         """Get excursions with expired date.
@@ -365,5 +560,15 @@ class ExcursionService:
             where=where,
             data={"is_active": False},
         )
+        await invalidate_excursion()
 
         return True if updated_excursions else False
+
+    async def _write_through(self, excursion: ExcursionScheme) -> ExcursionScheme:
+        """Write changed excursion to the entity cache after commit."""
+
+        async def write() -> None:
+            await cache_excursion(excursion)
+
+        await self.uow.on_commit(write)
+        return excursion
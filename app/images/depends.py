@@ -1,5 +1,12 @@
+from typing import Annotated
+
+from fastapi import Depends
+
 from app.images.service import ImageService
+from app.unit_of_work import UnitOfWork, get_unit_of_work
 
 
-async def get_image_service() -> ImageService:
-    return ImageService()
+async def get_image_service(
+    uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
+) -> ImageService:
+    return ImageService(uow)
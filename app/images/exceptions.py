@@ -8,3 +8,17 @@ class ImageNotFoundError(ServiceError):
 
     status_code = status.HTTP_404_NOT_FOUND
     message = "Excursion image not found"
+
+
+class ImageProcessingBusyError(ServiceError):
+    """Too many images are being processed."""
+
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    message = "Too many images are being processed, try again later"
+
+
+class ImageSizeNotAllowedError(ServiceError):
+    """Image size is not allowed."""
+
+    status_code = status.HTTP_400_BAD_REQUEST
+    message = "Image size is not allowed"
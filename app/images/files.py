@@ -1,7 +1,9 @@
 """File with functions for working with files."""
 
+import hashlib
+import os
 import uuid
-from datetime import datetime
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
 
@@ -11,9 +13,24 @@ from PIL import Image
 
 from app.config import settings
 
+try:
+    # Регистрирует AVIF в Pillow, собранном без libavif
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
 # Настройки для загрузки файлов
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+UPLOAD_CHUNK_SIZE = 64 * 1024
+TEMP_SUFFIX = ".tmp"
+HASH_DIGEST_SIZE = 16
+
+# Сигнатуры форматов: расширение файла клиента не проверяется
+MAGIC_BYTES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+)
 
 # Настройки сжатия
 COMPRESSION_SETTINGS: dict[str, dict[str, int | bool]] = {
@@ -27,77 +44,199 @@ COMPRESSION_SETTINGS: dict[str, dict[str, int | bool]] = {
 MAX_WIDTH = 1920
 MAX_HEIGHT = 1080
 
+# Настройки сжатия уменьшенных копий
+VARIANT_SETTINGS: dict[str, dict[str, int | bool]] = {
+    "jpeg": {"quality": 80, "optimize": True, "progressive": True},
+    "png": {"optimize": True},
+    "webp": {"quality": 80, "method": 4},
+    "avif": {"quality": 60},
+}
+VARIANT_EXTENSIONS = {"jpeg": ".jpg", "png": ".png", "webp": ".webp", "avif": ".avif"}
+
+
+@dataclass(frozen=True)
+class RenderedImage:
+    """Resized copy of image saved to upload directory."""
+
+    filename: str
+    content_hash: str
+    format: str
+    width: int
+    height: int
+    size: int
+
+
+@dataclass(frozen=True)
+class UploadedFile:
+    """Uploaded file received to a temporary file."""
+
+    path: Path
+    extension: str
+    size: int
+    source_hash: str
 
-def compress_image(image_content: bytes, file_extension: str) -> bytes:
-    """Compress image.
+
+def compress_image(source: Path, file_extension: str) -> tuple[int, int]:
+    """Compress image file in place.
+
+    Compressed image replaces the file atomically and only if it is smaller.
 
     Args:
-        image_content: `bytes`
+        source: `Path`
         file_extension: `str`
 
     Returns:
-        `bytes`
+        `tuple[int, int]` size of file before and after compression
     """
     logger.debug("Compress image with file extension: {}", file_extension)
 
-    try:
-        # Открываем изображение из bytes
-        image = Image.open(BytesIO(image_content))
+    original_size = source.stat().st_size
+    format_name = file_extension.lower().lstrip(".")
+    if format_name == "jpg":
+        format_name = "jpeg"
+    if format_name not in ("jpeg", "png", "webp"):
+        # Для неизвестных форматов сохраняем как есть
+        return original_size, original_size
 
-        # Конвертируем в RGB если нужно (для JPEG)
-        if image.mode in ("RGBA", "P"):
-            image = image.convert("RGB")  # type: ignore
+    target = source.with_name(f"{source.name}.compressed{TEMP_SUFFIX}")
+    try:
+        with Image.open(source) as original:
+            image = original
 
-        # Получаем оригинальные размеры
-        original_width, original_height = image.size
+            # Конвертируем в RGB если нужно (для JPEG)
+            if image.mode in ("RGBA", "P"):
+                image = image.convert("RGB")  # type: ignore
 
-        # Вычисляем новые размеры с сохранением пропорций
-        if original_width > MAX_WIDTH or original_height > MAX_HEIGHT:
-            image.thumbnail((MAX_WIDTH, MAX_HEIGHT), Image.Resampling.LANCZOS)
+            # Вычисляем новые размеры с сохранением пропорций
+            if image.width > MAX_WIDTH or image.height > MAX_HEIGHT:
+                image.thumbnail((MAX_WIDTH, MAX_HEIGHT), Image.Resampling.LANCZOS)
 
-        # Сохраняем в буфер с настройками сжатия
-        output_buffer = BytesIO()
-        format_name = file_extension.lower().lstrip(".")
-        if format_name == "jpg":
-            format_name = "jpeg"
+            # Сохраняем сразу в файл с настройками сжатия формата
+            compression_args = COMPRESSION_SETTINGS.get(
+                format_name, {"quality": 85, "optimize": True}
+            )
+            image.save(target, format=format_name.upper(), **compression_args)
 
-        # Применяем настройки сжатия для формата
-        compression_args = COMPRESSION_SETTINGS.get(
-            format_name, {"quality": 85, "optimize": True}
-        )
+        compressed_size = target.stat().st_size
 
-        if format_name in ["jpeg", "jpg"]:
-            image.save(output_buffer, format=format_name.upper(), **compression_args)
-        elif format_name == "png":
-            # Для PNG используем оптимизацию
-            image.save(output_buffer, format="PNG", **compression_args)
-        elif format_name == "webp":
-            image.save(output_buffer, format="WEBP", **compression_args)
-        else:
-            # Для неизвестных форматов сохраняем как есть
-            return image_content
-
-        # Возвращаем сжатые данные
-        compressed_data = output_buffer.getvalue()
-
-        # Логируем степень сжатия
-        original_size = len(image_content)
-        compressed_size = len(compressed_data)
-
-        # Если сжатие увеличило размер (маловероятно), возвращаем оригинал
+        # Если сжатие увеличило размер (маловероятно), оставляем оригинал
         if compressed_size > original_size:
-            return image_content
+            target.unlink()
+            return original_size, original_size
 
+        os.replace(target, source)
         logger.debug(
             "File compressed form {original_size} to {compressed_size}",
             original_size=original_size,
             compressed_size=compressed_size,
         )
-        return compressed_data
+        return original_size, compressed_size
 
     except Exception as e:
         logger.exception("Can not compress file: {}", e)
-        return image_content
+        target.unlink(missing_ok=True)
+        return original_size, original_size
+
+
+def render_variants(
+    source: Path,
+    file_extension: str,
+    widths: list[int],
+    formats: list[str],
+) -> list[RenderedImage]:
+    """Render resized copies of image.
+
+    Images are never upscaled, widths above the image width are skipped.
+    Formats which Pillow can not write (e.g. AVIF without libavif) are
+    skipped too.
+
+    Args:
+        source: `Path` original image
+        file_extension: `str` extension of original image
+        widths: `list[int]`
+        formats: `list[str]` e.g. `["avif", "webp", "original"]`
+
+    Returns:
+        `list[RenderedImage]`
+    """
+    logger.debug("Render image variants: widths={}, formats={}", widths, formats)
+
+    original_format = file_extension.lower().lstrip(".")
+    if original_format == "jpg":
+        original_format = "jpeg"
+    format_names = list(
+        dict.fromkeys(
+            original_format if name == "original" else name for name in formats
+        )
+    )
+    Image.init()
+    format_names = [
+        name
+        for name in format_names
+        if name in VARIANT_EXTENSIONS and name.upper() in Image.SAVE
+    ]
+
+    with Image.open(source) as original:
+        original.load()
+    image = original.convert("RGBA") if original.mode == "P" else original
+
+    variants = []
+    for width in sorted(set(widths)):
+        if width > image.width:
+            continue
+        height = max(1, round(image.height * width / image.width))
+        resized = (
+            image
+            if width == image.width
+            else image.resize((width, height), Image.Resampling.LANCZOS)
+        )
+        for format_name in format_names:
+            frame = resized
+            if format_name == "jpeg" and frame.mode not in ("RGB", "L"):
+                frame = frame.convert("RGB")
+            tmp_path = new_temp_path()
+            frame.save(
+                tmp_path, format=format_name.upper(), **VARIANT_SETTINGS[format_name]
+            )
+            size = tmp_path.stat().st_size
+            path, content_hash = store_file(tmp_path, VARIANT_EXTENSIONS[format_name])
+            variants.append(
+                RenderedImage(
+                    path.name, content_hash, format_name, width, resized.height, size
+                )
+            )
+    return variants
+
+
+def resize_image_file(source: Path, width: int, height: int) -> bytes:
+    """Resize image file to fit into `width` x `height` box.
+
+    JPEG is decoded at reduced scale (`Image.draft`), so small copies of
+    large photos do not need full decoding.
+
+    Args:
+        source: `Path`
+        width: `int`
+        height: `int`
+
+    Returns:
+        `bytes` image in the format of source
+    """
+    logger.debug("Resize image {} to {}x{}", source, width, height)
+
+    with Image.open(source) as original:
+        original.draft(original.mode, (width, height))
+        format_name = (original.format or "jpeg").lower()
+        image = original.convert("RGBA") if original.mode == "P" else original
+        image.thumbnail((width, height), Image.Resampling.LANCZOS)
+        if format_name == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        buffer = BytesIO()
+        image.save(
+            buffer, format=format_name.upper(), **VARIANT_SETTINGS.get(format_name, {})
+        )
+    return buffer.getvalue()
 
 
 def should_compress_file(file_extension: str, file_size: int) -> bool:
@@ -121,73 +260,149 @@ def should_compress_file(file_extension: str, file_size: int) -> bool:
     return file_extension.lower() in supported_formats
 
 
-def save_uploaded_file(file: UploadFile) -> str:
-    """Save uploaded file.
+def sniff_image_extension(header: bytes) -> str | None:
+    """Detect image format by its first bytes.
 
     Args:
-        file: `UploadFile`
+        header: `bytes` at least 12 first bytes of file
+
+    Returns:
+        `str | None` extension of format, `None` if format is not allowed
+    """
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return ".webp"
+    for magic, extension in MAGIC_BYTES:
+        if header.startswith(magic):
+            return extension
+    return None
+
+
+def new_temp_path() -> Path:
+    """Unique path of temporary file in upload directory.
+
+    Returns:
+        `Path`
+    """
+    return settings.upload_dir / f".upload_{uuid.uuid4().hex}{TEMP_SUFFIX}"
+
+
+def hash_file(path: Path) -> str:
+    """Hash of file content, read by chunks.
+
+    Args:
+        path: `Path`
 
     Returns:
         `str`
     """
-    logger.debug("Save uploaded file: {}", file)
+    hasher = hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+    with open(path, "rb") as file:
+        while chunk := file.read(UPLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
 
-    try:
-        # Проверка расширения файла
-        if file.filename is None:
-            raise HTTPException(
-                status_code=400, detail="Can not upload file. No filename"
-            )
-        file_extension = Path(file.filename).suffix.lower()
-        if file_extension not in ALLOWED_EXTENSIONS:
-            logger.warning("File format {} not allowed", file_extension)
-            raise HTTPException(
-                status_code=400,
-                detail=f"""
-                Неподдерживаемый формат файла. Разрешены: {", ".join(ALLOWED_EXTENSIONS)}
-                """,
-            )
 
-        # Проверка размера файла
-        file.file.seek(0, 2)  # Перемещаемся в конец файла
-        file_size = file.file.tell()
-        file.file.seek(0)  # Возвращаемся в начало
-
-        if file_size > MAX_FILE_SIZE:
-            logger.warning("File size too large: {}", file_size)
-            raise HTTPException(
-                status_code=400,
-                detail=f"""
-                Файл слишком большой.
-                Максимальный размер: {MAX_FILE_SIZE // 1024 // 1024}MB
-                """,
-            )
+def store_file(tmp_path: Path, file_extension: str) -> tuple[Path, str]:
+    """Move file to upload directory under the hash of its content.
+
+    Files with the same content get the same name, so the file is stored
+    once. Move is atomic, file with the same name is replaced with the
+    same content.
+
+    Args:
+        tmp_path: `Path`
+        file_extension: `str`
+
+    Returns:
+        `tuple[Path, str]` path of stored file and hash of its content
+    """
+    content_hash = hash_file(tmp_path)
+    path = settings.upload_dir / f"{content_hash}{file_extension}"
+    os.replace(tmp_path, path)
+    return path, content_hash
+
+
+def get_file_url(filename: str) -> str:
+    """Absolute url of file in upload directory.
+
+    Args:
+        filename: `str`
+
+    Returns:
+        `str`
+    """
+    return f"{settings.api_base_url}/{settings.upload_dir}/{filename}"
+
 
-        # Читаем содержимое файла для проверки хеша и возможного сжатия
-        file_content = file.file.read()
+async def receive_uploaded_file(file: UploadFile) -> UploadedFile:
+    """Copy uploaded file to a temporary file in upload directory by chunks.
 
-        # Сжимаем изображение если нужно
-        if should_compress_file(file_extension, file_size):
-            compressed_content = compress_image(file_content, file_extension)
+    Only one chunk is kept in memory. Upload is rejected as soon as it
+    exceeds `MAX_FILE_SIZE` or if its first bytes are not an allowed image
+    format.
 
-            # Используем сжатое содержимое для дальнейшей обработки
-            processed_content = compressed_content
-        else:
-            processed_content = file_content
+    Args:
+        file: `UploadFile`
+
+    Returns:
+        `UploadedFile`
+    """
+    logger.debug("Receive uploaded file: {}", file)
 
-        # Генерируем уникальное имя файла
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_filename = f"{timestamp}_{uuid.uuid4().hex}{file_extension}"
-        file_path = settings.upload_dir / unique_filename
+    path = new_temp_path()
+    hasher = hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+    size = 0
+    extension = None
+    try:
+        with open(path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                if extension is None:
+                    extension = sniff_image_extension(chunk)
+                    if extension is None:
+                        logger.warning("File format of {} not allowed", file.filename)
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"""
+                            Неподдерживаемый формат файла.
+                            Разрешены: {", ".join(sorted(ALLOWED_EXTENSIONS))}
+                            """,
+                        )
+
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    logger.warning("File size too large: {}", size)
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"""
+                        Файл слишком большой.
+                        Максимальный размер: {MAX_FILE_SIZE // 1024 // 1024}MB
+                        """,
+                    )
+                hasher.update(chunk)
+                buffer.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+    if extension is None:
+        path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail="Can not upload file. File is empty")
+    return UploadedFile(path, extension, size, hasher.hexdigest())
+
+
+def publish_uploaded_file(uploaded_file: UploadedFile) -> tuple[Path, str]:
+    """Store processed upload under the hash of its content.
 
-        # Сохраняем обработанный файл
-        with open(file_path, "wb") as buffer:
-            buffer.write(processed_content)
+    Args:
+        uploaded_file: `UploadedFile`
 
-        # Возвращаем абсолютный URL для доступа к файлу
-        url = f"{settings.api_base_url}/{settings.upload_dir}/{unique_filename}"
-        logger.debug("Return image url: {}", url)
-        return url
+    Returns:
+        `tuple[Path, str]` path of stored file and hash of its content
+    """
+    try:
+        path, content_hash = store_file(uploaded_file.path, uploaded_file.extension)
+        logger.debug("Uploaded file saved as: {}", path)
+        return path, content_hash
 
     except Exception as e:
         logger.exception("Can not save file: {}", e)
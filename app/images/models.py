@@ -1,9 +1,9 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import BigInteger, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.images.schemas import ImageSchema
+from app.images.schemas import ImageSchema, ImageVariantSchema
 from app.models import Base
 
 if TYPE_CHECKING:
@@ -16,6 +16,7 @@ class ImageModel(Base):
     Arttributes:
         excursion_id: `int`
         url: `str`
+        variants: `list[ImageVariantModel]`
     """
 
     __tablename__ = "excursion_images"
@@ -23,9 +24,15 @@ class ImageModel(Base):
     excursion_id: Mapped[int] = mapped_column(
         ForeignKey("excursions.id", ondelete="CASCADE"), nullable=False
     )
-    url: Mapped[str] = mapped_column(nullable=False)
+    url: Mapped[str] = mapped_column(nullable=False, index=True)
 
     excursion: Mapped["ExcursionModel"] = relationship(back_populates="images")
+    variants: Mapped[list["ImageVariantModel"]] = relationship(
+        back_populates="image",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+        order_by="ImageVariantModel.width",
+    )
 
     def to_read_model(self) -> ImageSchema:
         """Convert from excursion image model to pydantic schema."""
@@ -33,8 +40,69 @@ class ImageModel(Base):
             id=self.id,
             excursion_id=self.excursion_id,
             url=self.url,
+            variants=[variant.to_read_model() for variant in self.variants],
         )
 
     def __repr__(self) -> str:
         """Excursion image model representation."""
         return self.to_read_model().__repr__()
+
+
+class ImageVariantModel(Base):
+    """Resized rendition of excursion image.
+
+    Attributes:
+        image_id: `int`
+        url: `str`
+        format: `str`
+        width: `int`
+        height: `int`
+        size: `int` size of file in bytes
+    """
+
+    __tablename__ = "excursion_image_variants"
+
+    image_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("excursion_images.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    url: Mapped[str] = mapped_column(nullable=False)
+    format: Mapped[str] = mapped_column(nullable=False)
+    width: Mapped[int] = mapped_column(nullable=False)
+    height: Mapped[int] = mapped_column(nullable=False)
+    size: Mapped[int] = mapped_column(nullable=False)
+
+    image: Mapped["ImageModel"] = relationship(back_populates="variants")
+
+    def to_read_model(self) -> ImageVariantSchema:
+        """Convert from image variant model to pydantic schema."""
+        return ImageVariantSchema(
+            url=self.url,
+            format=self.format,
+            width=self.width,
+            height=self.height,
+            size=self.size,
+        )
+
+
+class StoredFileModel(Base):
+    """File of upload directory shared by images and their copies.
+
+    Files are named by the hash of their content and removed when the last
+    reference goes away.
+
+    Attributes:
+        filename: `str`
+        content_hash: `str` hash of stored file
+        source_hash: `str | None` hash of uploaded file, `None` for copies
+        ref_count: `int` number of images and copies using the file
+    """
+
+    __tablename__ = "stored_files"
+
+    filename: Mapped[str] = mapped_column(nullable=False, unique=True)
+    content_hash: Mapped[str] = mapped_column(nullable=False)
+    source_hash: Mapped[str | None] = mapped_column(nullable=True, index=True)
+    ref_count: Mapped[int] = mapped_column(nullable=False, default=1)
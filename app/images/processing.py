@@ -0,0 +1,167 @@
+"""Image processing off the event loop.
+
+Pillow decodes and encodes images for hundreds of milliseconds holding the
+GIL, so images are processed in a process pool started by the application
+lifespan. Number of images waiting or being processed by the worker is
+limited, new images are rejected with `ImageProcessingBusyError` instead
+of queueing without bound.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from loguru import logger
+
+from app.config import settings
+from app.images.exceptions import ImageProcessingBusyError
+from app.images.files import (
+    RenderedImage,
+    compress_image,
+    render_variants,
+    resize_image_file,
+)
+from app.utils.metrics import (
+    IMAGE_PROCESSING_BYTES,
+    IMAGE_PROCESSING_QUEUE,
+    IMAGE_PROCESSING_REJECTED,
+    IMAGE_PROCESSING_SECONDS,
+)
+
+R = TypeVar("R")
+
+
+class ImageProcessor:
+    """Bounded process pool for image processing.
+
+    Args:
+        workers: `int` number of processes
+        max_pending: `int` max number of images waiting or being processed
+        variant_widths: `list[int]` widths of resized copies
+        variant_formats: `list[str]` formats of resized copies
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_pending: int,
+        variant_widths: list[int],
+        variant_formats: list[str],
+    ) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.variant_widths = variant_widths
+        self.variant_formats = variant_formats
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+
+    def start(self) -> None:
+        """Start worker processes."""
+        if self._executor is not None:
+            return
+        # spawn: форк процесса с запущенным event loop и потоками небезопасен
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info("Image processor started with {} processes", self.workers)
+
+    async def stop(self) -> None:
+        """Stop worker processes, images in the queue are not processed."""
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+        logger.info("Image processor stopped")
+
+    async def compress(self, source: Path, file_extension: str) -> int:
+        """Compress image file in place in worker process.
+
+        Without started pool (e.g. in scripts) image is compressed in a thread.
+
+        Args:
+            source: `Path`
+            file_extension: `str`
+
+        Return: `int` size of file after compression
+
+        Raise: `ImageProcessingBusyError` if too many images are processed
+        """
+        original_size, size = await self._run(compress_image, source, file_extension)
+        IMAGE_PROCESSING_BYTES.labels(stage="original").inc(original_size)
+        IMAGE_PROCESSING_BYTES.labels(stage="processed").inc(size)
+        return size
+
+    async def render_variants(
+        self, source: Path, file_extension: str
+    ) -> list[RenderedImage]:
+        """Render resized copies of image file in worker process.
+
+        Args:
+            source: `Path`
+            file_extension: `str`
+
+        Return: `list[RenderedImage]`
+
+        Raise: `ImageProcessingBusyError` if too many images are processed
+        """
+        variants = await self._run(
+            render_variants,
+            source,
+            file_extension,
+            self.variant_widths,
+            self.variant_formats,
+        )
+        IMAGE_PROCESSING_BYTES.labels(stage="variants").inc(
+            sum(variant.size for variant in variants)
+        )
+        return variants
+
+    async def resize(self, source: Path, width: int, height: int) -> bytes:
+        """Resize image file in worker process.
+
+        Args:
+            source: `Path`
+            width: `int`
+            height: `int`
+
+        Return: `bytes`
+
+        Raise: `ImageProcessingBusyError` if too many images are processed
+        """
+        return await self._run(resize_image_file, source, width, height)
+
+    async def _run(self, func: Callable[..., R], *args: Any) -> R:
+        if self._pending >= self.max_pending:
+            IMAGE_PROCESSING_REJECTED.inc()
+            logger.warning("Image processing queue is full: {}", self._pending)
+            raise ImageProcessingBusyError()
+
+        self._pending += 1
+        IMAGE_PROCESSING_QUEUE.inc()
+        start = time.perf_counter()
+        try:
+            if self._executor is None:
+                result = await asyncio.to_thread(func, *args)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+            IMAGE_PROCESSING_QUEUE.dec()
+
+        IMAGE_PROCESSING_SECONDS.labels(task=func.__name__).observe(
+            time.perf_counter() - start
+        )
+        return result
+
+
+image_processor = ImageProcessor(
+    workers=settings.image_workers,
+    max_pending=settings.image_max_pending,
+    variant_widths=settings.image_variant_widths,
+    variant_formats=settings.image_variant_formats,
+)
@@ -0,0 +1,222 @@
+"""On-demand resized copies of uploaded images.
+
+Copies are computed on the first request and kept in a disk cache shared
+by all workers, bounded by size with least recently used copies evicted
+first. Concurrent requests of the same copy in a worker wait for one
+computation.
+"""
+
+import asyncio
+import fcntl
+import os
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from app.config import settings
+from app.images.exceptions import ImageNotFoundError, ImageSizeNotAllowedError
+from app.images.files import ALLOWED_EXTENSIONS
+from app.images.processing import image_processor
+from app.utils.metrics import IMAGE_RESIZE_CACHE
+
+LOCK_FILENAME = ".lock"
+SCAN_INTERVAL = 60
+
+
+class DiskCache:
+    """Files in a directory bounded by total size, evicted in LRU order.
+
+    Directory is shared by all workers, so its size is not counted in
+    memory: every worker adds its own writes to the size found by the last
+    scan and scans the directory again when the size is above `max_bytes`
+    or the scan is older than `scan_interval`. Scan and eviction hold an
+    exclusive file lock, so workers do not evict at the same time. Files
+    written by other workers since the last scan may exceed `max_bytes`
+    until the next scan.
+
+    Args:
+        directory: `Path`
+        max_bytes: `int`
+        scan_interval: `float` seconds between scans of the directory
+    """
+
+    def __init__(
+        self, directory: Path, max_bytes: int, scan_interval: float = SCAN_INTERVAL
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.scan_interval = scan_interval
+        self._size: int | None = None
+        self._scanned_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self, relative_path: str) -> Path | None:
+        """Get path of cached file and mark it as recently used."""
+        path = self.directory / relative_path
+        if not await asyncio.to_thread(self._touch, path):
+            return None
+        return path
+
+    async def put(self, relative_path: str, content: bytes) -> Path:
+        """Write file atomically and evict old files above `max_bytes`."""
+        path = self.directory / relative_path
+        await asyncio.to_thread(self._write, path, content)
+
+        if self._size is not None:
+            self._size += len(content)
+        if (
+            self._size is None
+            or self._size > self.max_bytes
+            or time.monotonic() - self._scanned_at > self.scan_interval
+        ):
+            async with self._lock:
+                self._size = await asyncio.to_thread(self._evict, path)
+                self._scanned_at = time.monotonic()
+        return path
+
+    async def delete(self, relative_paths: list[str]) -> None:
+        """Delete cached files."""
+        paths = [self.directory / relative_path for relative_path in relative_paths]
+        await asyncio.to_thread(self._unlink, paths)
+
+    def _evict(self, keep: Path) -> int:
+        """Scan directory and evict least recently used files of all workers.
+
+        Return: `int` size of directory after eviction
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / LOCK_FILENAME, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            entries = self._scan()
+            size = sum(stat.st_size for _, stat in entries)
+            evicted = []
+            for path, stat in entries:
+                if size <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                path.unlink(missing_ok=True)
+                size -= stat.st_size
+                evicted.append(path)
+
+        if evicted:
+            logger.debug("Evicted {} files from {}", len(evicted), self.directory)
+        return size
+
+    def _scan(self) -> list[tuple[Path, os.stat_result]]:
+        """Files of directory, least recently used first."""
+        entries = []
+        for path in self.directory.rglob("*"):
+            # Служебный файл блокировки и недописанные копии не считаются
+            if path.name.startswith(".") or path.name.endswith(".tmp"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.is_file():
+                entries.append((path, stat))
+        entries.sort(key=lambda entry: entry[1].st_mtime)
+        return entries
+
+    @staticmethod
+    def _touch(path: Path) -> bool:
+        # Время изменения хранит порядок LRU для всех воркеров
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _write(path: Path, content: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _unlink(paths: list[Path]) -> None:
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+
+class ImageResizer:
+    """Resize uploaded images to whitelisted sizes on demand.
+
+    Args:
+        source_dir: `Path` directory of uploaded images
+        cache: `DiskCache`
+        sizes: `list[str]` allowed sizes as `"{width}x{height}"`
+    """
+
+    def __init__(self, source_dir: Path, cache: DiskCache, sizes: list[str]) -> None:
+        self.source_dir = source_dir
+        self.cache = cache
+        self.sizes = set(sizes)
+        self._inflight: dict[str, asyncio.Task[Path]] = {}
+
+    async def get(self, filename: str, width: int, height: int) -> Path:
+        """Get path of resized copy of uploaded image.
+
+        Args:
+            filename: `str` name of file in upload directory
+            width: `int`
+            height: `int`
+
+        Return: `Path`
+
+        Raise:
+            `ImageSizeNotAllowedError` if size is not whitelisted
+            `ImageNotFoundError` if image does not exist
+            `ImageProcessingBusyError` if too many images are processed
+        """
+        size = f"{width}x{height}"
+        if size not in self.sizes:
+            raise ImageSizeNotAllowedError()
+        if (
+            Path(filename).name != filename
+            or Path(filename).suffix.lower() not in ALLOWED_EXTENSIONS
+        ):
+            raise ImageNotFoundError()
+
+        relative_path = f"{size}/{filename}"
+        path = await self.cache.get(relative_path)
+        if path is not None:
+            IMAGE_RESIZE_CACHE.labels(result="hit").inc()
+            return path
+
+        task = self._inflight.get(relative_path)
+        if task is None:
+            IMAGE_RESIZE_CACHE.labels(result="miss").inc()
+            task = asyncio.create_task(self._resize(filename, width, height))
+            self._inflight[relative_path] = task
+            task.add_done_callback(lambda _: self._inflight.pop(relative_path, None))
+        else:
+            IMAGE_RESIZE_CACHE.labels(result="wait").inc()
+        # shield: отмена одного запроса не отменяет расчёт для остальных
+        return await asyncio.shield(task)
+
+    async def purge(self, filename: str) -> None:
+        """Delete cached copies of uploaded image of all allowed sizes.
+
+        Args:
+            filename: `str` name of file in upload directory
+        """
+        await self.cache.delete([f"{size}/{filename}" for size in self.sizes])
+
+    async def _resize(self, filename: str, width: int, height: int) -> Path:
+        source = self.source_dir / filename
+        if not await asyncio.to_thread(source.is_file):
+            raise ImageNotFoundError()
+
+        content = await image_processor.resize(source, width, height)
+        return await self.cache.put(f"{width}x{height}/{filename}", content)
+
+
+image_resizer = ImageResizer(
+    source_dir=settings.upload_dir,
+    cache=DiskCache(settings.image_cache_dir, settings.image_cache_max_bytes),
+    sizes=settings.image_resize_sizes,
+)
@@ -1,23 +1,33 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.responses import FileResponse
 
 from app.auth.depends import require_superuser
 from app.config import settings
 from app.images.depends import get_image_service
+from app.images.exceptions import (
+    ImageNotFoundError,
+    ImageProcessingBusyError,
+    ImageSizeNotAllowedError,
+)
 from app.images.schemas import ImageSchema
 from app.images.service import ImageService
 from app.user.schemas import UserSchema
-from app.utils.cache import cached
+from app.utils.response_cache import CachedRoute, cache_response
 
-image_router = APIRouter(tags=["Image"])
+image_router = APIRouter(tags=["Image"], route_class=CachedRoute)
 
 
-@cached(ttl=settings.ttl, key_prefix="excurion_excursion_images")
 @image_router.get(
     "/images/{excursion_id}",
     response_model=list[ImageSchema],
 )
+@cache_response(
+    ttl=settings.ttl,
+    key_prefix="excurion_excursion_images",
+    max_age=settings.http_cache_max_age,
+)
 async def get_excursion_images(
     excursion_id: int,
     service: Annotated[ImageService, Depends(get_image_service)],
@@ -29,6 +39,7 @@ async def get_excursion_images(
 @image_router.post(
     "/images/{excursion_id}",
     response_model=ImageSchema,
+    responses={429: {"description": "Too many images are being processed"}},
 )
 async def save_image(
     excursion_id: int,
@@ -37,7 +48,16 @@ async def save_image(
     _: Annotated[UserSchema, Depends(require_superuser)],
 ) -> ImageSchema:
     """Save excursion image."""
-    return await service.save_excurion_image(image=image_file, excursion_id=excursion_id)
+    try:
+        return await service.save_excurion_image(
+            image=image_file, excursion_id=excursion_id
+        )
+    except ImageProcessingBusyError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.message,
+            headers={"Retry-After": "1"},
+        ) from e
 
 
 @image_router.delete("/images/{image_id}")
@@ -48,3 +68,35 @@ async def delete_excursion_image(
 ) -> bool:
     """Delete excursion image by image id."""
     return await service.delete_excursion_image(image_id=image_id)
+
+
+@image_router.get(
+    "/img/{width:int}x{height:int}/{filename}",
+    response_class=FileResponse,
+    responses={
+        400: {"description": "Image size is not allowed"},
+        404: {"description": "Image not found"},
+        429: {"description": "Too many images are being processed"},
+    },
+)
+async def get_resized_image(
+    width: int,
+    height: int,
+    filename: str,
+    service: Annotated[ImageService, Depends(get_image_service)],
+) -> FileResponse:
+    """Get uploaded image resized to fit into `width` x `height`."""
+    try:
+        path = await service.get_resized_image(filename, width, height)
+    except (ImageSizeNotAllowedError, ImageNotFoundError) as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message) from e
+    except ImageProcessingBusyError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.message,
+            headers={"Retry-After": "1"},
+        ) from e
+
+    # Имена загруженных файлов уникальны, копия никогда не меняется
+    cache_control = f"public, max-age={settings.image_resize_max_age}, immutable"
+    return FileResponse(path, headers={"Cache-Control": cache_control})
@@ -1,12 +1,36 @@
 from pydantic import BaseModel
 
 
+class ImageVariantSchema(BaseModel):
+    """Resized rendition of excursion image.
+
+    Attributes:
+        url: `str`
+        format: `str` e.g. `webp`, `avif`, `jpeg`
+        width: `int`
+        height: `int`
+        size: `int` size of file in bytes
+    """
+
+    url: str
+    format: str
+    width: int
+    height: int
+    size: int
+
+    class Config:
+        """Pydantic config."""
+
+        from_attributes = True
+
+
 class ImageSchema(BaseModel):
     """Excursion image schema."""
 
     id: int
     excursion_id: int
     url: str
+    variants: list[ImageVariantSchema] = []
 
     class Config:
         """Pydantic config."""
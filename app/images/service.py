@@ -1,19 +1,42 @@
+import asyncio
+from collections import Counter
+from pathlib import Path
+
 from fastapi import UploadFile
 from loguru import logger
 
-from app.database import async_session_maker
+from app.excursions.cache import invalidate_excursion
+from app.excursions.id_index import excursion_id_index
 from app.images.exceptions import ImageNotFoundError
-from app.images.files import delete_uploaded_file_by_url, save_uploaded_file
-from app.images.models import ImageModel
-from app.images.schemas import ImageSchema
-from app.repository import SQLAlchemyRepository
+from app.images.files import (
+    UploadedFile,
+    delete_uploaded_file_by_url,
+    extract_filename_from_url,
+    get_file_url,
+    publish_uploaded_file,
+    receive_uploaded_file,
+    should_compress_file,
+)
+from app.images.models import ImageModel, ImageVariantModel, StoredFileModel
+from app.images.processing import image_processor
+from app.images.resizer import image_resizer
+from app.images.schemas import ImageSchema, ImageVariantSchema
+from app.repository import QueryOptions, SQLAlchemyRepository
+from app.unit_of_work import UnitOfWork
 from app.utils.cache import invalidate_cache
 
 
 class ImageService:
-    def __init__(self) -> None:
+    def __init__(self, uow: UnitOfWork | None = None) -> None:
+        self.uow = uow or UnitOfWork()
         self.images_repository: SQLAlchemyRepository[ImageModel] = SQLAlchemyRepository(
-            async_session_maker, ImageModel
+            self.uow, ImageModel
+        )
+        self.variants_repository: SQLAlchemyRepository[ImageVariantModel] = (
+            SQLAlchemyRepository(self.uow, ImageVariantModel)
+        )
+        self.files_repository: SQLAlchemyRepository[StoredFileModel] = (
+            SQLAlchemyRepository(self.uow, StoredFileModel)
         )
 
     async def get_excursion_images(self, excursion_id: int) -> list[ImageSchema]:
@@ -26,21 +49,38 @@ class ImageService:
         """
         logger.debug("Get excursion images for id={!r}", excursion_id)
 
+        if not await excursion_id_index.may_exist(excursion_id):
+            return []
+
         images = await self.images_repository.find_all(
             filter_by=(ImageModel.excursion_id == excursion_id)
         )
         return [image.to_read_model() for image in images]
 
+    @invalidate_cache(
+        "not_active_excursions",
+        "active_excursions",
+        "excurion_excursion_images",
+        "excursions_search",
+        "excursion_full",
+    )
     async def save_excurion_image(
         self, image: UploadFile, excursion_id: int
     ) -> ImageSchema:
         """Save image for excursion by excursion id.
 
+        Resized copies of image (see `settings.image_variant_widths`) are
+        saved with it for `srcset` of the frontend. Files are stored under
+        the hash of their content, a file uploaded before is not processed
+        again and its stored copies are reused.
+
         Args:
             image: `UploadFile`
             excursion_id: `int`
 
         Return: `ExcursionImageSchema`
+
+        Raise: `ImageProcessingBusyError` if too many images are processed
         """
         logger.debug(
             "Add image {image!r} for excursion with id={id!r}",
@@ -48,21 +88,30 @@ class ImageService:
             id=excursion_id,
         )
 
-        url = save_uploaded_file(file=image)
-        data = {
-            "excursion_id": excursion_id,
-            "url": url,
-        }
-        new_image = await self.images_repository.add_one(data)
-        return new_image.to_read_model()
+        uploaded_file = await receive_uploaded_file(image)
+        try:
+            async with self.uow:
+                new_image = await self._reuse_stored_image(
+                    excursion_id, uploaded_file.source_hash
+                )
+            if new_image is None:
+                url, variants = await self._process_uploaded_file(uploaded_file)
+                async with self.uow:
+                    new_image = await self._add_image(
+                        excursion_id, url, uploaded_file.source_hash, variants
+                    )
+        finally:
+            await asyncio.to_thread(uploaded_file.path.unlink, missing_ok=True)
+
+        return new_image
 
     @invalidate_cache(
-        "not_active_excursions*",
-        "active_excursions*",
-        "excurion_excursion_images*",
-        "excursions_search*",
-        "excursion_details*",
-        "excursion_full*",
+        "not_active_excursions",
+        "active_excursions",
+        "excurion_excursion_images",
+        "excursions_search",
+        "excursion_details",
+        "excursion_full",
     )
     async def delete_excursion_image(self, image_id: int) -> bool:
         """Delete excursion image by image id.
@@ -78,14 +127,236 @@ class ImageService:
             "Delete image with id={id!r}",
             id=image_id,
         )
-        image = await self.images_repository.find_one(filter=(ImageModel.id == image_id))
-        if image is None:
-            raise ImageNotFoundError()
+        async with self.uow:
+            image = await self.images_repository.find_one(
+                filter=(ImageModel.id == image_id)
+            )
+            if image is None:
+                raise ImageNotFoundError()
 
-        delete_uploaded_file_by_url(image.url)
+            deleted_image_id = await self.images_repository.delete_one(id=image_id)
+            if deleted_image_id is None:
+                raise ImageNotFoundError()
 
-        deleted_image_id = await self.images_repository.delete_one(id=image_id)
-        if deleted_image_id is None:
-            raise ImageNotFoundError()
+            await self._release_files(
+                [image.url, *(variant.url for variant in image.variants)]
+            )
+
+        await self._invalidate_excursion(image.excursion_id)
 
         return True
+
+    async def release_excursion_images(self, excursion_id: int) -> None:
+        """Drop references of all images of excursion to stored files.
+
+        Must be called in the transaction which deletes the excursion, its
+        images are deleted by cascade and do not release files themselves.
+
+        Args:
+            excursion_id: `int`
+        """
+        images = await self.images_repository.find_all(
+            filter_by=ImageModel.excursion_id == excursion_id, limit=None
+        )
+        await self._release_files(
+            [
+                file_url
+                for image in images
+                for file_url in [image.url, *(v.url for v in image.variants)]
+            ]
+        )
+
+    async def get_resized_image(self, filename: str, width: int, height: int) -> Path:
+        """Get resized copy of uploaded image, computed on first request.
+
+        Args:
+            filename: `str`
+            width: `int`
+            height: `int`
+
+        Return: `Path`
+
+        Raise:
+            `ImageSizeNotAllowedError` if size is not allowed
+            `ImageNotFoundError` if image does not exist
+            `ImageProcessingBusyError` if too many images are processed
+        """
+        logger.debug("Get image {} resized to {}x{}", filename, width, height)
+        return await image_resizer.get(filename, width, height)
+
+    async def _reuse_stored_image(
+        self, excursion_id: int, source_hash: str
+    ) -> ImageSchema | None:
+        """Add image with files saved from the same uploaded file.
+
+        Stored files are locked before their references are added, so a
+        concurrent delete can not drop them in between.
+
+        Return: `ImageSchema | None` `None` if there are no such files
+        """
+        stored_files = await self.files_repository.find_all(
+            filter_by=StoredFileModel.source_hash == source_hash, limit=1
+        )
+        if not stored_files:
+            return None
+
+        images = await self.images_repository.find_all(
+            filter_by=ImageModel.url == get_file_url(stored_files[0].filename),
+            limit=1,
+        )
+        if not images:
+            return None
+
+        stored_image = images[0].to_read_model()
+        file_urls = [stored_image.url, *(v.url for v in stored_image.variants)]
+        filenames = {
+            filename
+            for filename in map(extract_filename_from_url, file_urls)
+            if filename
+        }
+        # Порядок блокировок как в `_release_files`, чтобы не было дедлоков
+        locked_files = await self.files_repository.find_all(
+            filter_by=StoredFileModel.filename.in_(filenames),
+            order_by=StoredFileModel.filename,
+            limit=None,
+            options=QueryOptions(for_update=True),
+        )
+        if len(locked_files) != len(filenames):
+            # Файлы удалены, пока мы их искали: загрузка обрабатывается заново
+            return None
+
+        logger.debug("Reuse stored image {}", stored_image.url)
+        return await self._add_image(
+            excursion_id, stored_image.url, source_hash, stored_image.variants
+        )
+
+    async def _add_image(
+        self,
+        excursion_id: int,
+        url: str,
+        source_hash: str,
+        variants: list[ImageVariantSchema],
+    ) -> ImageSchema:
+        """Add image with its resized copies and references to their files."""
+        await self._add_file_references(url, source_hash, variants)
+        new_image = await self.images_repository.add_one(
+            {"excursion_id": excursion_id, "url": url}
+        )
+        if variants:
+            await self.variants_repository.add_many(
+                [
+                    {"image_id": new_image.id, **variant.model_dump()}
+                    for variant in variants
+                ]
+            )
+        await self._invalidate_excursion(excursion_id)
+
+        return ImageSchema(
+            id=new_image.id,
+            excursion_id=new_image.excursion_id,
+            url=new_image.url,
+            variants=variants,
+        )
+
+    async def _process_uploaded_file(
+        self, uploaded_file: UploadedFile
+    ) -> tuple[str, list[ImageVariantSchema]]:
+        """Compress uploaded file, store it and render its resized copies."""
+        if should_compress_file(uploaded_file.extension, uploaded_file.size):
+            await image_processor.compress(uploaded_file.path, uploaded_file.extension)
+        path, _ = await asyncio.to_thread(publish_uploaded_file, uploaded_file)
+
+        try:
+            variants = await image_processor.render_variants(
+                path, uploaded_file.extension
+            )
+        except Exception:
+            await self._discard_unreferenced_file(path.name)
+            raise
+        return get_file_url(path.name), [
+            ImageVariantSchema(
+                url=get_file_url(variant.filename),
+                format=variant.format,
+                width=variant.width,
+                height=variant.height,
+                size=variant.size,
+            )
+            for variant in variants
+        ]
+
+    async def _discard_unreferenced_file(self, filename: str) -> None:
+        """Delete published file which no image refers to.
+
+        File stored under the hash of its content may already be used by
+        another image, such a file is kept.
+        """
+        async with self.uow:
+            stored_file = await self.files_repository.find_one(
+                filter=StoredFileModel.filename == filename
+            )
+        if stored_file is None:
+            await asyncio.to_thread(delete_uploaded_file_by_url, get_file_url(filename))
+
+    async def _add_file_references(
+        self, url: str, source_hash: str, variants: list[ImageVariantSchema]
+    ) -> None:
+        """Count references of image and its copies to stored files."""
+        references = Counter(
+            extract_filename_from_url(file_url)
+            for file_url in [url, *(variant.url for variant in variants)]
+        )
+        main_filename = extract_filename_from_url(url)
+        await self.files_repository.upsert_many(
+            [
+                {
+                    "filename": filename,
+                    "content_hash": Path(filename).stem,
+                    "source_hash": source_hash if filename == main_filename else None,
+                    "ref_count": count,
+                }
+                for filename, count in references.items()
+                if filename
+            ],
+            index_elements=["filename"],
+            update_fields=[],
+            increment_fields=["ref_count"],
+        )
+
+    async def _release_files(self, urls: list[str]) -> None:
+        """Drop references to stored files, files without them are deleted.
+
+        Files and their resized copies of `/img` are deleted after commit.
+        Files saved before reference counting have no references and are
+        deleted too.
+        """
+        unused_urls = []
+        references = Counter(map(extract_filename_from_url, urls))
+        for filename, count in sorted(references.items(), key=lambda r: r[0] or ""):
+            if not filename:
+                continue
+            stored_file = await self.files_repository.update(
+                where=StoredFileModel.filename == filename,
+                data={"ref_count": StoredFileModel.ref_count - count},
+            )
+            if stored_file is not None and stored_file.ref_count > 0:
+                continue
+            if stored_file is not None:
+                await self.files_repository.delete_one(id=stored_file.id)
+            unused_urls.append(get_file_url(filename))
+
+        async def delete_files() -> None:
+            for file_url in unused_urls:
+                await asyncio.to_thread(delete_uploaded_file_by_url, file_url)
+                filename = extract_filename_from_url(file_url)
+                if filename:
+                    await image_resizer.purge(filename)
+
+        await self.uow.on_commit(delete_files)
+
+    async def _invalidate_excursion(self, excursion_id: int) -> None:
+        """Drop cached excursion with its images after commit."""
+
+        async def invalidate() -> None:
+            await invalidate_excursion(excursion_id)
+
+        await self.uow.on_commit(invalidate)
@@ -1,3 +1,4 @@
+import asyncio
 import locale
 import sys
 from contextlib import asynccontextmanager
@@ -13,42 +14,74 @@ from prometheus_fastapi_instrumentator import Instrumentator
 from app.auth.router import auth_router
 from app.booking.router import booking_router
 from app.config import settings
+from app.database import async_engine
 from app.details.router import details_router
+from app.excursions.id_index import excursion_id_index
+from app.excursions.inventory import seat_inventory
 from app.excursions.router import excursion_router
+from app.excursions.service import ExcursionService
+from app.images.processing import image_processor
 from app.images.router import image_router
 from app.middleware.logging_middleware import LoggingMiddleware
 from app.notifications.router import notifications_router
+from app.pagination import NEXT_CURSOR_HEADER
 from app.reviews.router import reviews_router
 from app.user.router import user_router
+from app.utils.cache import redis_cache
+from app.utils.cache_warmer import cache_warmer
 from app.utils.cron import (
     cron_manager,
     deactivate_past_bookings,
     deactivate_past_excurions_cron,
+    rebuild_excursion_id_index_cron,
 )
 from app.utils.logging import setup_new_logger
-from app.utils.redis_config import redis_client
+from app.utils.redis_config import close_redis_connection, redis_client
 
 locale.setlocale(locale.LC_ALL, "ru_RU.UTF-8")
 setup_new_logger()
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.info("Starting application...", mode=settings.mode)
     try:
-        redis_client.ping()
+        await redis_client.ping()
         logger.success("Redis connected successfully")
     except Exception as e:
         logger.error("Redis connection failed", error=str(e))
         sys.exit(1)
 
+    cache_listener = asyncio.create_task(redis_cache.listen_invalidations())
+    try:
+        await excursion_id_index.rebuild()
+    except Exception as e:
+        logger.error("Excursion id index rebuild failed", error=str(e))
+    # First reconciliation seeds seat counters of hot excursions
+    inventory_reconciler = asyncio.create_task(
+        seat_inventory.run_reconciler(
+            ExcursionService().reconcile_hot_inventory,
+            settings.hot_inventory_reconcile_interval,
+        )
+    )
+    image_processor.start()
+    cache_warmer.setup(app)
+    cache_warmer.schedule(delay=0)
+
     deactivate_past_excurions_cron()
     deactivate_past_bookings()
+    rebuild_excursion_id_index_cron()
 
     yield
 
-    redis_client.close()
+    await cache_warmer.stop()
+    await image_processor.stop()
+    cache_listener.cancel()
+    inventory_reconciler.cancel()
+    await asyncio.gather(cache_listener, inventory_reconciler, return_exceptions=True)
+    await close_redis_connection()
     cron_manager.stop_all()
+    await async_engine.dispose()
     logger.info("Shutting down application...")
 
 
@@ -70,6 +103,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 LOCAL_ONLY_PATHS = {"/health", "/metrics"}
@@ -9,8 +9,13 @@ from app.booking.models import BookingModel  # noqa: F401
 from app.config import settings
 from app.details.models import DetailsModel  # noqa: F401
 from app.excursions.models import ExcursionModel  # noqa: F401
-from app.images.models import ImageModel  # noqa: F401
+from app.images.models import (  # noqa: F401
+    ImageModel,
+    ImageVariantModel,
+    StoredFileModel,
+)
 from app.models import Base
+from app.notifications.model import NotificationModel  # noqa: F401
 from app.reviews.models import ReviewModel  # noqa: F401
 from app.user.models import UserModel  # noqa: F401
 
@@ -0,0 +1,33 @@
+"""add excursion hot inventory
+
+Revision ID: 3f8d2b6c1e4a
+Revises: 9c1e7f3b2a6d
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f8d2b6c1e4a"
+down_revision: Union[str, Sequence[str], None] = "9c1e7f3b2a6d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "excursions",
+        sa.Column(
+            "hot_inventory", sa.Boolean(), nullable=False, server_default=sa.false()
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("excursions", "hot_inventory")
@@ -0,0 +1,81 @@
+"""add indexes for hot queries
+
+Revision ID: 52db430f7927
+Revises: f3a5c8a2f5a5
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "52db430f7927"
+down_revision: Union[str, Sequence[str], None] = "f3a5c8a2f5a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Indexes are built CONCURRENTLY, which can not run inside a transaction.
+    """
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_excursions_is_active_type_date",
+            "excursions",
+            ["is_active", "type", "date", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_bookings_excursion_id_created_at",
+            "bookings",
+            ["excursion_id", "created_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_bookings_phone_number_created_at",
+            "bookings",
+            ["phone_number", "created_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_reviews_active_created_at",
+            "reviews",
+            ["created_at", "id"],
+            postgresql_where=sa.text("is_active"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_notifications_unread_user_id_created_at",
+            "notifications",
+            ["user_id", "created_at"],
+            postgresql_where=sa.text("NOT is_read"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for index_name, table_name in (
+            ("ix_notifications_unread_user_id_created_at", "notifications"),
+            ("ix_reviews_active_created_at", "reviews"),
+            ("ix_bookings_phone_number_created_at", "bookings"),
+            ("ix_bookings_excursion_id_created_at", "bookings"),
+            ("ix_excursions_is_active_type_date", "excursions"),
+        ):
+            op.drop_index(
+                index_name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,50 @@
+"""add excursion image variants
+
+Revision ID: 7a4e9c2d5b1f
+Revises: 3f8d2b6c1e4a
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7a4e9c2d5b1f"
+down_revision: Union[str, Sequence[str], None] = "3f8d2b6c1e4a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "excursion_image_variants",
+        sa.Column("image_id", sa.BigInteger(), nullable=False),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("format", sa.String(), nullable=False),
+        sa.Column("width", sa.Integer(), nullable=False),
+        sa.Column("height", sa.Integer(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["image_id"], ["excursion_images.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_excursion_image_variants_image_id"),
+        "excursion_image_variants",
+        ["image_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_excursion_image_variants_image_id"),
+        table_name="excursion_image_variants",
+    )
+    op.drop_table("excursion_image_variants")
@@ -0,0 +1,90 @@
+"""add excursions full text search
+
+Revision ID: 9c1e7f3b2a6d
+Revises: 52db430f7927
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "9c1e7f3b2a6d"
+down_revision: Union[str, Sequence[str], None] = "52db430f7927"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EXCURSION_SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(cities::text, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'C')"
+)
+DETAILS_SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', "
+    "coalesce(description, '') || ' ' || "
+    "coalesce(meeting_point, '') || ' ' || "
+    "coalesce(inclusions::text, '') || ' ' || "
+    "coalesce(itinerary::text, '')), 'D')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "excursions",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(EXCURSION_SEARCH_VECTOR, persisted=True),
+        ),
+    )
+    op.add_column(
+        "excursion_details",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(DETAILS_SEARCH_VECTOR, persisted=True),
+        ),
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_excursions_search_vector",
+            "excursions",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_excursion_details_search_vector",
+            "excursion_details",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_excursion_details_search_vector",
+            table_name="excursion_details",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_excursions_search_vector",
+            table_name="excursions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_column("excursion_details", "search_vector")
+    op.drop_column("excursions", "search_vector")
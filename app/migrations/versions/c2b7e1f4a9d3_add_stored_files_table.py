@@ -0,0 +1,41 @@
+"""add stored files table
+
+Revision ID: c2b7e1f4a9d3
+Revises: 7a4e9c2d5b1f
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c2b7e1f4a9d3"
+down_revision: Union[str, Sequence[str], None] = "7a4e9c2d5b1f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "stored_files",
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("content_hash", sa.String(), nullable=False),
+        sa.Column("source_hash", sa.String(), nullable=True),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("filename"),
+    )
+    op.create_index(op.f("ix_stored_files_source_hash"), "stored_files", ["source_hash"])
+    op.create_index(op.f("ix_excursion_images_url"), "excursion_images", ["url"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_excursion_images_url"), table_name="excursion_images")
+    op.drop_index(op.f("ix_stored_files_source_hash"), table_name="stored_files")
+    op.drop_table("stored_files")
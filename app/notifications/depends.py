@@ -1,5 +1,12 @@
+from typing import Annotated
+
+from fastapi import Depends
+
 from app.notifications.service import NotificationService
+from app.unit_of_work import UnitOfWork, get_unit_of_work
 
 
-def get_notification_service() -> NotificationService:
-    return NotificationService()
+def get_notification_service(
+    uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
+) -> NotificationService:
+    return NotificationService(uow)
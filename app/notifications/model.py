@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models import Base
@@ -10,11 +10,21 @@ from app.notifications.schemas import NotificationBaseSchema
 class NotificationModel(Base):
 
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index(
+            "ix_notifications_unread_user_id_created_at",
+            "user_id",
+            "created_at",
+            postgresql_where=text("NOT is_read"),
+        ),
+    )
 
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"), nullable=False, index=True
+    )
     type: Mapped[str] = mapped_column(nullable=False)
     message: Mapped[str] = mapped_column(nullable=False)
-    is_read: Mapped[bool] = mapped_column(nullable=False, default=False)
+    is_read: Mapped[bool] = mapped_column(nullable=False, default=False, index=True)
     created_at: Mapped[datetime] = mapped_column(nullable=False, default=datetime.now)
 
     def to_read_model(self) -> NotificationBaseSchema:
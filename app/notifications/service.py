@@ -4,7 +4,6 @@ from fastapi import WebSocket, WebSocketDisconnect
 from loguru import logger
 
 from app.booking.schemas import BookingSchema
-from app.database import async_session_maker
 from app.excursions.schemas import ExcursionScheme
 from app.excursions.service import ExcursionService
 from app.notifications.exceptions import NotificationNotFoundError
@@ -18,20 +17,22 @@ from app.notifications.schemas import (
     UpdateNotificationSchema,
 )
 from app.repository import SQLAlchemyRepository
+from app.unit_of_work import UnitOfWork
 from app.user.models import UserModel
 from app.user.schemas import UserSchema
 from app.utils.redis_config import redis_client
 
 
 class NotificationService:
-    def __init__(self) -> None:
+    def __init__(self, uow: UnitOfWork | None = None) -> None:
+        self.uow = uow or UnitOfWork()
         self.notifications_repository: SQLAlchemyRepository[NotificationModel] = (
-            SQLAlchemyRepository(async_session_maker, NotificationModel)
+            SQLAlchemyRepository(self.uow, NotificationModel)
         )
         self.users_repository: SQLAlchemyRepository[UserModel] = SQLAlchemyRepository(
-            async_session_maker, UserModel
+            self.uow, UserModel
         )
-        self.excursion_service: ExcursionService = ExcursionService()
+        self.excursion_service: ExcursionService = ExcursionService(self.uow)
 
     async def create_notification(
         self, notification: CreateNotificationSchema
@@ -40,17 +41,33 @@ class NotificationService:
             notification.model_dump()
         )
         parsed = new_notification.to_read_model()
-        self._cache_unread(parsed)
+        await self._cache_unread(parsed)
         await notifications_ws_manager.send_to_user(
             parsed.user_id,
             {"event": "notification", "data": parsed.model_dump(mode="json")},
         )
         return parsed
 
+    async def create_notifications(
+        self, notifications: list[CreateNotificationSchema]
+    ) -> list[NotificationBaseSchema]:
+        """Create many notifications with one insert and send them to users."""
+        created = await self.notifications_repository.add_many(
+            [notification.model_dump() for notification in notifications]
+        )
+        parsed = [notification.to_read_model() for notification in created]
+        await self._cache_unread_many(parsed)
+        for notification in parsed:
+            await notifications_ws_manager.send_to_user(
+                notification.user_id,
+                {"event": "notification", "data": notification.model_dump(mode="json")},
+            )
+        return parsed
+
     async def get_unread_notifications(
         self, user_id: int
     ) -> list[NotificationBaseSchema]:
-        cached = self._get_cached_unread(user_id)
+        cached = await self._get_cached_unread(user_id)
         if cached:
             return cached
 
@@ -60,8 +77,7 @@ class NotificationService:
             order_by=NotificationModel.created_at,
         )
         parsed = [n.to_read_model() for n in notifications]
-        for notification in parsed:
-            self._cache_unread(notification)
+        await self._cache_unread_many(parsed)
         return parsed
 
     async def mark_as_read(
@@ -75,7 +91,7 @@ class NotificationService:
         if updated is None:
             raise NotificationNotFoundError
 
-        self._remove_from_cache(user_id=data.user_id, notification_id=data.id)
+        await self._remove_from_cache(user_id=data.user_id, notification_id=data.id)
         parsed = updated.to_read_model()
         await notifications_ws_manager.send_to_user(
             parsed.user_id, {"event": "read", "id": parsed.id}
@@ -90,17 +106,16 @@ class NotificationService:
             logger.warning("No admin users found to notify about booking {}", booking.id)
             return []
 
-        notifications: list[NotificationBaseSchema] = []
         message = self._format_booking_message(booking, excursion)
-        for admin in admins:
-            payload = CreateNotificationSchema(
+        payloads = [
+            CreateNotificationSchema(
                 user_id=admin.id,
                 type="booking_create",
                 message=message,
             )
-            created = await self.create_notification(payload)
-            notifications.append(created)
-        return notifications
+            for admin in admins
+        ]
+        return await self.create_notifications(payloads)
 
     async def notify_users_by_phone(
         self, data: BulkNotificationSchema
@@ -113,12 +128,14 @@ class NotificationService:
             limit=len(data.phone_numbers) or 100,
         )
 
-        notifications: list[NotificationBaseSchema] = []
-        for user in users:
-            payload = CreateNotificationSchema(
-                user_id=user.id, type=data.type, message=data.message
-            )
-            notifications.append(await self.create_notification(payload))
+        notifications = await self.create_notifications(
+            [
+                CreateNotificationSchema(
+                    user_id=user.id, type=data.type, message=data.message
+                )
+                for user in users
+            ]
+        )
 
         if len(users) != len(set(data.phone_numbers)):
             logger.warning(
@@ -197,9 +214,9 @@ class NotificationService:
     def _redis_key(self, user_id: int) -> str:
         return f"notifications:user:{user_id}"
 
-    def _cache_unread(self, notification: NotificationBaseSchema) -> None:
+    async def _cache_unread(self, notification: NotificationBaseSchema) -> None:
         try:
-            redis_client.hset(
+            await redis_client.hset(
                 self._redis_key(notification.user_id),
                 str(notification.id),
                 notification.model_dump_json(),
@@ -207,19 +224,37 @@ class NotificationService:
         except Exception as exc:  # noqa: BLE001
             logger.error("Failed to cache notification {}: {}", notification.id, exc)
 
-    def _remove_from_cache(self, user_id: int, notification_id: int) -> None:
+    async def _cache_unread_many(
+        self, notifications: list[NotificationBaseSchema]
+    ) -> None:
+        if not notifications:
+            return
+
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for notification in notifications:
+                    pipe.hset(
+                        self._redis_key(notification.user_id),
+                        str(notification.id),
+                        notification.model_dump_json(),
+                    )
+                await pipe.execute()
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Failed to cache {} notifications: {}", len(notifications), exc)
+
+    async def _remove_from_cache(self, user_id: int, notification_id: int) -> None:
         try:
-            redis_client.hdel(self._redis_key(user_id), str(notification_id))
+            await redis_client.hdel(self._redis_key(user_id), str(notification_id))
         except Exception as exc:  # noqa: BLE001
             logger.error(
                 "Failed to remove notification {} from cache: {}", notification_id, exc
             )
 
-    def _get_cached_unread(self, user_id: int) -> list[NotificationBaseSchema]:
+    async def _get_cached_unread(self, user_id: int) -> list[NotificationBaseSchema]:
         try:
-            cached = redis_client.hgetall(self._redis_key(user_id))
+            cached = await redis_client.hgetall(self._redis_key(user_id))
             notifications: list[NotificationBaseSchema] = []
-            for value in cached.values():  # type: ignore
+            for value in cached.values():
                 notifications.append(NotificationBaseSchema.model_validate_json(value))
             return sorted(notifications, key=lambda n: n.created_at)
         except Exception as exc:  # noqa: BLE001
@@ -0,0 +1,158 @@
+"""File with cursor (keyset) pagination helpers.
+
+Cursor is an opaque url-safe string with values of the sort key of the last
+item on the page. Next page is selected with `WHERE (sort key) > cursor`,
+so it costs the same as the first one.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Sequence
+
+from fastapi import Response, status
+from pydantic import BaseModel
+
+from app.exceptions import ServiceError
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ServiceError):
+    """Invalid cursor."""
+
+    status_code = status.HTTP_400_BAD_REQUEST
+    message = "Invalid cursor"
+
+
+@dataclass
+class CursorParams:
+    """Query params of a page, used as `Annotated[CursorParams, Depends()]`.
+
+    Attributes:
+        limit: `int` max items on the page
+        cursor: `str | None` cursor of the previous page
+    """
+
+    limit: int = 100
+    cursor: str | None = None
+
+
+@dataclass
+class OffsetCursorParams(CursorParams):
+    """Query params of a page, which can also start at offset.
+
+    Attributes:
+        skip: `int` offset of the page, used only without cursor
+    """
+
+    skip: int = 0
+
+
+@dataclass(frozen=True)
+class KeysetPage:
+    """Position of a page for `SQLAlchemyRepository.find_page`.
+
+    Attributes:
+        limit: `int` max rows on the page
+        after: `tuple[Any, ...] | None` sort key values of the last row of the
+            previous page
+        offset: `int` used only without `after`
+    """
+
+    limit: int = 100
+    after: tuple[Any, ...] | None = None
+    offset: int = 0
+
+    @classmethod
+    def from_cursor(
+        cls,
+        cursor: str | None,
+        types: Sequence[type],
+        limit: int = 100,
+        offset: int = 0,
+    ) -> "KeysetPage":
+        """Make page from cursor of the previous page.
+
+        Raise: `InvalidCursorError` if cursor can not be decoded
+        """
+        after = decode_cursor(cursor, types) if cursor is not None else None
+        return cls(limit=limit, after=after, offset=offset)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode sort key values to cursor.
+
+    Args:
+        values: `Sequence[Any]`
+
+    Return: `str`
+    """
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> tuple[Any, ...]:
+    """Decode cursor to sort key values.
+
+    Args:
+        cursor: `str`
+        types: `Sequence[type]` types of sort key fields
+
+    Return: `tuple[Any, ...]`
+
+    Raise: `InvalidCursorError` if cursor can not be decoded
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("Cursor does not match sort key")
+        return tuple(
+            _decode_value(value, type_)
+            for value, type_ in zip(payload, types, strict=True)
+        )
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError() from e
+
+
+def _decode_value(value: Any, type_: type) -> Any:
+    """Decode one sort key value, checking it has the type of its field."""
+    if type_ is datetime:
+        if not isinstance(value, dict):
+            raise TypeError("Cursor value is not a datetime")
+        return datetime.fromisoformat(value["dt"])
+    # bool - подкласс int, но не подходит для числовых полей
+    if isinstance(value, bool) or not isinstance(value, type_):
+        raise TypeError(f"Cursor value is not {type_.__name__}")
+    return value
+
+
+def set_next_cursor(
+    response: Response,
+    items: Sequence[BaseModel],
+    limit: int,
+    fields: Sequence[str],
+) -> None:
+    """Set cursor of the next page to response headers.
+
+    Nothing is set when the page is not full, so there is no next page.
+
+    Args:
+        response: `Response`
+        items: `Sequence[BaseModel]`
+        limit: `int`
+        fields: `Sequence[str]` names of sort key fields
+    """
+    if not items or len(items) < limit:
+        return
+
+    last = items[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+        [getattr(last, field) for field in fields]
+    )
@@ -1,29 +1,50 @@
-from typing import Any, Generic, Type, TypeVar
+from dataclasses import dataclass
+from typing import Any, Generic, Sequence, Type, TypeVar
 
 from loguru import logger
 from sqlalchemy import (
     ColumnElement,
     ColumnExpressionArgument,
     delete,
+    func,
     insert,
+    literal,
     select,
+    tuple_,
     update,
 )
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import QueryableAttribute
 
 from app.models import Base
+from app.pagination import KeysetPage
+from app.unit_of_work import UnitOfWork
 
 T = TypeVar("T", bound=Base)
 
 
+@dataclass(frozen=True)
+class QueryOptions:
+    """Optional modifiers of `SQLAlchemyRepository.find_all` query.
+
+    Attributes:
+        join_by: `Any | None` model or relationship to join
+        outer_join: `bool` join with `LEFT OUTER JOIN`
+        for_update: `bool` lock found rows until the end of the transaction
+            (`SELECT ... FOR UPDATE`)
+    """
+
+    join_by: Any | None = None
+    outer_join: bool = False
+    for_update: bool = False
+
+
 class SQLAlchemyRepository(Generic[T]):
-    def __init__(
-        self, session: async_sessionmaker[AsyncSession], model: Type[T]
-    ) -> None:
-        self.session = session
+    def __init__(self, uow: UnitOfWork, model: Type[T]) -> None:
+        self.uow = uow
         self.model = model
         logger.debug(
-            "Setup repository with session: {} and model: {}", self.session, self.model
+            "Setup repository with unit of work: {} and model: {}", self.uow, self.model
         )
 
     async def find_one(self, filter: ColumnElement[bool]) -> T | None:
@@ -36,7 +57,7 @@ class SQLAlchemyRepository(Generic[T]):
             filter,
         )
 
-        async with self.session() as s:
+        async with self.uow.session() as s:
             stmt = select(self.model).filter(filter)
 
             logger.debug("Final statement: {}", stmt)
@@ -50,35 +71,45 @@ class SQLAlchemyRepository(Generic[T]):
 
     async def find_all(
         self,
-        join_by: Any | None = None,
         filter_by: ColumnElement[bool] | None = None,
         order_by: Any | None = None,
         offset: int = 0,
-        limit: int = 100,
+        limit: int | None = 100,
+        *,
+        options: QueryOptions | None = None,
     ) -> list[T]:
+        """Find rows, `limit=None` for all of them.
+
+        Joins and row locks are set with `options`.
+        """
+        options = options or QueryOptions()
         logger.debug(
             (
                 "Send select request from `find_all` to database for model: {}"
-                "with filter: {}, offset: {}, limit: {}, join: {}"
+                "with filter: {}, offset: {}, limit: {}, options: {}"
             ),
             self.model,
             filter_by,
             offset,
             limit,
-            join_by,
+            options,
         )
 
-        async with self.session() as s:
+        async with self.uow.session() as s:
             stmt = select(self.model)
-            if join_by is not None:
-                stmt = stmt.join(join_by)
+            if options.join_by is not None:
+                stmt = stmt.join(options.join_by, isouter=options.outer_join)
 
             if filter_by is not None:
                 stmt = stmt.where(filter_by)
 
-            if order_by is not None:
+            if isinstance(order_by, (list, tuple)):
+                stmt = stmt.order_by(*order_by)
+            elif order_by is not None:
                 stmt = stmt.order_by(order_by)
             stmt = stmt.offset(offset).limit(limit)
+            if options.for_update:
+                stmt = stmt.with_for_update()
 
             logger.debug("Final statement: {}", stmt)
 
@@ -89,25 +120,213 @@ class SQLAlchemyRepository(Generic[T]):
 
             return res
 
+    async def find_page(
+        self,
+        order_by: Sequence[Any],
+        page: KeysetPage,
+        filter_by: ColumnElement[bool] | None = None,
+        descending: bool = False,
+    ) -> list[T]:
+        """Find one page of rows with keyset pagination.
+
+        Rows are ordered by `order_by` columns, which must be unique together
+        (e.g. `(date, id)`). Page starts right after the row with `page.after`
+        values of these columns, so deep pages use the index as the first one.
+        `page.offset` is used only without `page.after`.
+        """
+        logger.debug(
+            (
+                "Send select request from `find_page` to database for model: {}"
+                "with filter: {}, order: {}, page: {}, descending: {}"
+            ),
+            self.model,
+            filter_by,
+            order_by,
+            page,
+            descending,
+        )
+
+        async with self.uow.session() as s:
+            stmt = select(self.model)
+
+            if filter_by is not None:
+                stmt = stmt.where(filter_by)
+
+            if page.after is not None:
+                key = tuple_(*order_by)
+                values = tuple_(
+                    *(
+                        literal(value, column.type)
+                        for column, value in zip(order_by, page.after, strict=True)
+                    )
+                )
+                stmt = stmt.where(key < values if descending else key > values)
+            elif page.offset:
+                stmt = stmt.offset(page.offset)
+
+            stmt = stmt.order_by(
+                *(column.desc() if descending else column.asc() for column in order_by)
+            ).limit(page.limit)
+
+            logger.debug("Final statement: {}", stmt)
+
+            result = await s.execute(stmt)
+            res = list(result.scalars().all())
+
+            logger.debug("Returning from `find_page`: {} rows", len(res))
+
+            return res
+
+    async def find_ids(self, filter_by: ColumnElement[bool] | None = None) -> list[int]:
+        """Find ids of all rows, without loading the rows."""
+        logger.debug(
+            "Send select request from `find_ids` to database for model: {}, filter: {}",
+            self.model,
+            filter_by,
+        )
+
+        async with self.uow.session() as s:
+            stmt = select(self.model.id)
+            if filter_by is not None:
+                stmt = stmt.where(filter_by)
+
+            logger.debug("Final statement: {}", stmt)
+
+            result = await s.execute(stmt)
+            res = list(result.scalars().all())
+
+            logger.debug("Returning from `find_ids`: {} ids", len(res))
+
+            return res
+
+    async def sum_by(
+        self,
+        column: ColumnExpressionArgument[Any],
+        group_by: QueryableAttribute[Any],
+        filter_by: ColumnElement[bool] | None = None,
+    ) -> dict[Any, int]:
+        """Sum column over rows grouped by another column."""
+        logger.debug(
+            "Send select request from `sum_by` to database for model: {}, filter: {}",
+            self.model,
+            filter_by,
+        )
+
+        async with self.uow.session() as s:
+            stmt = select(group_by, func.sum(column)).group_by(group_by)
+            if filter_by is not None:
+                stmt = stmt.where(filter_by)
+
+            logger.debug("Final statement: {}", stmt)
+
+            result = await s.execute(stmt)
+            res = {key: int(total or 0) for key, total in result.all()}
+
+            logger.debug("Returning from `sum_by`: {} groups", len(res))
+
+            return res
+
     async def add_one(self, data: dict[str, Any]) -> T:
         logger.debug(
             "Send create request form `add_one` to database for model: {} and data: {}",
             self.model,
             data,
         )
-        async with self.session() as s:
+        async with self.uow.session() as s:
             stmt = insert(self.model).values(**data).returning(self.model)
 
             logger.debug("Final statement: {}", stmt)
 
             res = await s.execute(stmt)
-            await s.commit()
             result = res.scalar_one()
 
             logger.debug("Returning from `add_one`: {}", result)
 
             return result
 
+    async def add_many(self, data: Sequence[dict[str, Any]]) -> list[T]:
+        """Insert many rows with one multi-row statement.
+
+        Return created rows in the order of `data`.
+        """
+        logger.debug(
+            "Send create request form `add_many` to database for model: {}, rows: {}",
+            self.model,
+            len(data),
+        )
+        if not data:
+            return []
+
+        async with self.uow.session() as s:
+            stmt = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+
+            logger.debug("Final statement: {}", stmt)
+
+            res = await s.scalars(stmt, list(data))
+            result = list(res.all())
+
+            logger.debug("Returning from `add_many`: {} rows", len(result))
+
+            return result
+
+    async def upsert_many(
+        self,
+        data: Sequence[dict[str, Any]],
+        index_elements: Sequence[str],
+        update_fields: Sequence[str] | None = None,
+        increment_fields: Sequence[str] = (),
+    ) -> list[T]:
+        """Insert many rows, updating rows which conflict by `index_elements`.
+
+        If `update_fields` is not set, all fields of `data` except
+        `index_elements` and `increment_fields` are updated. Fields of
+        `increment_fields` are increased by the inserted value (counters).
+        Return inserted and updated rows.
+        """
+        logger.debug(
+            (
+                "Send upsert request form `upsert_many` to database for model: {},"
+                " rows: {}, index_elements: {}"
+            ),
+            self.model,
+            len(data),
+            index_elements,
+        )
+        if not data:
+            return []
+
+        if update_fields is None:
+            update_fields = [
+                key
+                for key in data[0]
+                if key not in index_elements and key not in increment_fields
+            ]
+
+        async with self.uow.session() as s:
+            stmt = pg_insert(self.model).values(list(data))
+            set_ = {field: stmt.excluded[field] for field in update_fields}
+            for field in increment_fields:
+                set_[field] = getattr(self.model, field) + stmt.excluded[field]
+            if set_:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=index_elements,
+                    set_=set_,
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+
+            logger.debug("Final statement: {}", stmt)
+
+            res = await s.scalars(
+                stmt.returning(self.model),
+                execution_options={"populate_existing": True},
+            )
+            result = list(res.all())
+
+            logger.debug("Returning from `upsert_many`: {} rows", len(result))
+
+            return result
+
     async def update(
         self,
         where: ColumnExpressionArgument,
@@ -123,13 +342,12 @@ class SQLAlchemyRepository(Generic[T]):
             data,
         )
 
-        async with self.session() as s:
+        async with self.uow.session() as s:
             stmt = update(self.model).values(**data).where(where).returning(self.model)
 
             logger.debug("Final statement: {}", stmt)
 
             res = await s.execute(stmt)
-            await s.commit()
             result = res.scalars().one_or_none()
 
             logger.debug("Returning from `update_one`: {}", result)
@@ -151,13 +369,12 @@ class SQLAlchemyRepository(Generic[T]):
             data,
         )
 
-        async with self.session() as s:
+        async with self.uow.session() as s:
             stmt = update(self.model).values(**data).where(where).returning(self.model)
 
             logger.debug("Final statement: {}", stmt)
 
             res = await s.execute(stmt)
-            await s.commit()
             result = [row[0] for row in res.all()]
 
             logger.debug("Returning from `update_all`: {}", result)
@@ -170,13 +387,33 @@ class SQLAlchemyRepository(Generic[T]):
             self.model,
             id,
         )
-        async with self.session() as s:
+        async with self.uow.session() as s:
             stmt = delete(self.model).where(self.model.id == id).returning(self.model.id)
             logger.debug("Final statement: {}", stmt)
             res = await s.execute(stmt)
-            await s.commit()
             result = res.scalar_one_or_none()
 
             logger.debug("Returning from `delete_one`: {}", result)
 
             return result
+
+    async def delete_many(self, ids: Sequence[int]) -> list[int]:
+        logger.debug(
+            "Send delete request form `delete_many` to database for model: {}, ids: {}",
+            self.model,
+            ids,
+        )
+        if not ids:
+            return []
+
+        async with self.uow.session() as s:
+            stmt = (
+                delete(self.model).where(self.model.id.in_(ids)).returning(self.model.id)
+            )
+            logger.debug("Final statement: {}", stmt)
+            res = await s.execute(stmt)
+            result = list(res.scalars().all())
+
+            logger.debug("Returning from `delete_many`: {}", result)
+
+            return result
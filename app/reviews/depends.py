@@ -1,5 +1,12 @@
+from typing import Annotated
+
+from fastapi import Depends
+
 from app.reviews.service import ReviewService
+from app.unit_of_work import UnitOfWork, get_unit_of_work
 
 
-def get_review_service() -> ReviewService:
-    return ReviewService()
+def get_review_service(
+    uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
+) -> ReviewService:
+    return ReviewService(uow)
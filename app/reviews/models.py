@@ -3,12 +3,13 @@ from datetime import datetime
 from sqlalchemy import (
     Boolean,
     DateTime,
+    Index,
     Integer,
     String,
     Text,
 )
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from app.models import Base
 from app.reviews.schemas import ReviewSchema
@@ -16,6 +17,14 @@ from app.reviews.schemas import ReviewSchema
 
 class ReviewModel(Base):
     __tablename__ = "reviews"
+    __table_args__ = (
+        Index(
+            "ix_reviews_active_created_at",
+            "created_at",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+    )
 
     author_name: Mapped[str] = mapped_column(String(100), nullable=False)
     email: Mapped[str] = mapped_column(String(100), nullable=False)
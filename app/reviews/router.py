@@ -1,24 +1,49 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response
 
 from app.auth.depends import require_superuser
+from app.config import settings
+from app.pagination import CursorParams, InvalidCursorError, set_next_cursor
 from app.reviews.depends import get_review_service
 from app.reviews.schemas import ReviewCreate, ReviewSchema
-from app.reviews.service import ReviewService
+from app.reviews.service import REVIEW_CURSOR_FIELDS, ReviewService
 from app.user.schemas import UserSchema
+from app.utils.response_cache import CachedRoute, cache_response
 
-reviews_router = APIRouter(prefix="/review", tags=["Reviews"])
+reviews_router = APIRouter(prefix="/review", tags=["Reviews"], route_class=CachedRoute)
 
 
 @reviews_router.get("/")
+# Service layer caches it stale-while-revalidate, route only sets headers
+@cache_response(
+    ttl=0,
+    key_prefix="approved_reviews",
+    max_age=settings.http_cache_max_age,
+)
 async def get_approved_reviews(
+    response: Response,
     service: Annotated[ReviewService, Depends(get_review_service)],
+    page: Annotated[CursorParams, Depends()],
 ) -> list[ReviewSchema]:
-    return await service.get_approved_reviews()
+    try:
+        reviews = await service.get_approved_reviews(
+            limit=page.limit, cursor=page.cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message) from e
+
+    set_next_cursor(response, reviews, page.limit, REVIEW_CURSOR_FIELDS)
+    return reviews
 
 
 @reviews_router.get("/stats")
+# Service layer caches it stale-while-revalidate, route only sets headers
+@cache_response(
+    ttl=0,
+    key_prefix="review_stats",
+    max_age=settings.http_cache_max_age,
+)
 async def get_reviews_stats(
     service: Annotated[ReviewService, Depends(get_review_service)],
 ) -> dict:
@@ -36,18 +61,34 @@ async def create_review(
 # Admin endpoints
 @reviews_router.get("/admin/all")
 async def get_all_reviews(
+    response: Response,
     service: Annotated[ReviewService, Depends(get_review_service)],
     _: Annotated[UserSchema, Depends(require_superuser)],
+    page: Annotated[CursorParams, Depends()],
 ) -> list[ReviewSchema]:
-    return await service.get_all_reviews()
+    try:
+        reviews = await service.get_all_reviews(limit=page.limit, cursor=page.cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message) from e
+
+    set_next_cursor(response, reviews, page.limit, REVIEW_CURSOR_FIELDS)
+    return reviews
 
 
 @reviews_router.get("/admin/pending")
 async def get_pending_reviews(
+    response: Response,
     service: Annotated[ReviewService, Depends(get_review_service)],
     _: Annotated[UserSchema, Depends(require_superuser)],
+    page: Annotated[CursorParams, Depends()],
 ) -> list[ReviewSchema]:
-    return await service.get_pending_reviews()
+    try:
+        reviews = await service.get_pending_reviews(limit=page.limit, cursor=page.cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message) from e
+
+    set_next_cursor(response, reviews, page.limit, REVIEW_CURSOR_FIELDS)
+    return reviews
 
 
 @reviews_router.post("/admin/{review_id}/toggle")
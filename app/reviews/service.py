@@ -1,20 +1,26 @@
 import statistics
+from datetime import datetime
 
 from fastapi import HTTPException
-from sqlalchemy import and_
+from sqlalchemy import ColumnElement, and_
 
 from app.config import settings
-from app.database import async_session_maker
+from app.pagination import KeysetPage
 from app.repository import SQLAlchemyRepository
 from app.reviews.models import ReviewModel
 from app.reviews.schemas import ReviewCreate, ReviewSchema
+from app.unit_of_work import UnitOfWork
 from app.utils.cache import cached, invalidate_cache
 
+REVIEW_CURSOR_FIELDS = ("created_at", "id")
+REVIEW_CURSOR_TYPES = (datetime, int)
+
 
 class ReviewService:
-    def __init__(self) -> None:
+    def __init__(self, uow: UnitOfWork | None = None) -> None:
+        self.uow = uow or UnitOfWork()
         self.repository: SQLAlchemyRepository[ReviewModel] = SQLAlchemyRepository(
-            async_session_maker, ReviewModel
+            self.uow, ReviewModel
         )
 
     @cached(ttl=settings.ttl, key_prefix="one_review")
@@ -29,60 +35,77 @@ class ReviewService:
         created_review = await self.repository.add_one(review.model_dump())
         return created_review.to_read_model()
 
-    @cached(ttl=settings.ttl, key_prefix="approved_reviews")
-    async def get_approved_reviews(self) -> list[ReviewSchema]:
+    @cached(
+        ttl=settings.ttl, key_prefix="approved_reviews", stale_ttl=settings.stale_ttl
+    )
+    async def get_approved_reviews(
+        self, limit: int = 100, cursor: str | None = None
+    ) -> list[ReviewSchema]:
         filter = and_(ReviewModel.is_active)
-        reviews = await self.repository.find_all(filter_by=filter)
-
-        return [review.to_read_model() for review in reviews]
+        return await self._get_reviews_page(filter, limit, cursor)
 
     @cached(ttl=settings.ttl, key_prefix="pending_reviews")
-    async def get_pending_reviews(self) -> list[ReviewSchema]:
+    async def get_pending_reviews(
+        self, limit: int = 100, cursor: str | None = None
+    ) -> list[ReviewSchema]:
         filter = ReviewModel.is_active == False  # noqa: E712
-        reviews = await self.repository.find_all(filter_by=filter)
-
-        return [review.to_read_model() for review in reviews]
+        return await self._get_reviews_page(filter, limit, cursor)
 
     @cached(ttl=settings.ttl, key_prefix="all_reviews")
-    async def get_all_reviews(self) -> list[ReviewSchema]:
-        reviews = await self.repository.find_all()
+    async def get_all_reviews(
+        self, limit: int = 100, cursor: str | None = None
+    ) -> list[ReviewSchema]:
+        return await self._get_reviews_page(None, limit, cursor)
+
+    async def _get_reviews_page(
+        self, filter: ColumnElement[bool] | None, limit: int, cursor: str | None
+    ) -> list[ReviewSchema]:
+        """Get reviews page, newest first, ordered by `REVIEW_CURSOR_FIELDS`."""
+        reviews = await self.repository.find_page(
+            order_by=[ReviewModel.created_at, ReviewModel.id],
+            page=KeysetPage.from_cursor(cursor, REVIEW_CURSOR_TYPES, limit),
+            filter_by=filter,
+            descending=True,
+        )
         return [review.to_read_model() for review in reviews]
 
     @invalidate_cache(
-        "one_review*",
-        "approved_reviews*",
-        "pending_reviews*",
-        "all_reviews*",
-        "review_stats*",
+        "one_review",
+        "approved_reviews",
+        "pending_reviews",
+        "all_reviews",
+        "review_stats",
     )
     async def toggle_show_review(self, review_id: int) -> ReviewSchema:
-        review = await self.get_review(review_id)
+        async with self.uow:
+            review = await self.get_review(review_id)
 
-        data = {"is_active": not review.is_active}
+            data = {"is_active": not review.is_active}
 
-        where = ReviewModel.id == review_id
-        new_review = await self.repository.update(where=where, data=data)
-        if new_review is None:
-            raise HTTPException(
-                status_code=404,
-                detail="Can not find review.",
-            )
+            where = ReviewModel.id == review_id
+            new_review = await self.repository.update(where=where, data=data)
+            if new_review is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail="Can not find review.",
+                )
 
         return new_review.to_read_model()
 
     @invalidate_cache(
-        "one_review*",
-        "approved_reviews*",
-        "pending_reviews*",
-        "all_reviews*",
-        "review_stats*",
+        "one_review",
+        "approved_reviews",
+        "pending_reviews",
+        "all_reviews",
+        "review_stats",
     )
     async def delete_review(self, review_id: int) -> bool:
-        await self.get_review(review_id)
-        await self.repository.delete_one(id=review_id)
+        async with self.uow:
+            await self.get_review(review_id)
+            await self.repository.delete_one(id=review_id)
         return True
 
-    @cached(settings.ttl, "review_stats")
+    @cached(settings.ttl, "review_stats", stale_ttl=settings.stale_ttl)
     async def get_reviews_stats(self) -> dict:
         reviews = await self.get_approved_reviews()
 
@@ -90,10 +113,7 @@ class ReviewService:
         if total == 0:
             return {"total": 0, "average_rating": 0}
 
-        try:
-            avg = statistics.mean([review.rating for review in reviews])
-        except AttributeError:
-            avg = statistics.mean([review["rating"] for review in reviews])
+        avg = statistics.mean([review.rating for review in reviews])
 
         return {
             "total": total,
@@ -0,0 +1,130 @@
+"""File with unit of work."""
+
+from contextlib import asynccontextmanager
+from types import TracebackType
+from typing import AsyncIterator, Awaitable, Callable, Self
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import async_session_maker
+
+
+class UnitOfWork:
+    """Unit of work shared by the repositories of one request.
+
+    Outside of `async with uow:` every repository call runs in its own short
+    transaction. Inside of it all repository calls use one session and one
+    transaction, which is committed when the outermost block exits without
+    an error and rolled back otherwise. Blocks may be nested, inner blocks
+    join the outer transaction.
+
+    Side effects which must see committed data (e.g. cache invalidation)
+    are registered with `on_commit` and run after the commit. Compensations
+    of side effects done outside of the database (e.g. seats taken in Redis)
+    are registered with `on_rollback`.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+    ) -> None:
+        self._session_factory = session_factory
+        self._session: AsyncSession | None = None
+        self._depth = 0
+        self._on_commit: list[Callable[[], Awaitable[None]]] = []
+        self._on_rollback: list[Callable[[], Awaitable[None]]] = []
+
+    @property
+    def in_transaction(self) -> bool:
+        """Is there an open transaction."""
+        return self._session is not None
+
+    async def on_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Run callback after the open transaction is committed.
+
+        Callback runs immediately if there is no open transaction and is
+        dropped if the transaction is rolled back.
+        """
+        if self._session is None:
+            await callback()
+            return
+        self._on_commit.append(callback)
+
+    async def on_rollback(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Run callback if the open transaction is rolled back.
+
+        Callback is dropped if the transaction is committed or if there is
+        no open transaction.
+        """
+        if self._session is not None:
+            self._on_rollback.append(callback)
+
+    async def __aenter__(self) -> Self:
+        if self._session is None:
+            logger.debug("Begin unit of work")
+            self._session = self._session_factory()
+            await self._session.begin()
+        self._depth += 1
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None = None,
+        exc_val: BaseException | None = None,
+        exc_tb: TracebackType | None = None,
+    ) -> None:
+        self._depth -= 1
+        if self._depth > 0 or self._session is None:
+            return
+
+        session, self._session = self._session, None
+        callbacks, self._on_commit = self._on_commit, []
+        compensations, self._on_rollback = self._on_rollback, []
+        try:
+            if exc_type is None:
+                await session.commit()
+                logger.debug("Unit of work committed")
+            else:
+                await session.rollback()
+                logger.debug("Unit of work rolled back: {!r}", exc_val)
+        except BaseException:
+            await self._run_callbacks(compensations, "rollback")
+            raise
+        finally:
+            await session.close()
+
+        if exc_type is None:
+            await self._run_callbacks(callbacks, "commit")
+        else:
+            await self._run_callbacks(compensations, "rollback")
+
+    @staticmethod
+    async def _run_callbacks(
+        callbacks: list[Callable[[], Awaitable[None]]], event: str
+    ) -> None:
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as e:  # noqa: BLE001
+                logger.error("Unit of work on {} callback failed: {}", event, e)
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """Session for one repository call.
+
+        Return the session of the open transaction or a new session which
+        is committed after the call.
+        """
+        if self._session is not None:
+            yield self._session
+            return
+
+        async with self._session_factory() as session:
+            async with session.begin():
+                yield session
+
+
+def get_unit_of_work() -> UnitOfWork:
+    """Get unit of work for one request."""
+    return UnitOfWork()
@@ -1,5 +1,12 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from app.unit_of_work import UnitOfWork, get_unit_of_work
 from app.user.service import UserService
 
 
-async def get_user_service() -> UserService:
-    return UserService()
+async def get_user_service(
+    uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
+) -> UserService:
+    return UserService(uow)
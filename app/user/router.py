@@ -1,9 +1,11 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response
 
 from app.auth.depends import get_current_user, get_user_service
 from app.booking.schemas import BookingSchema
+from app.booking.service import BOOKING_CURSOR_FIELDS
+from app.pagination import CursorParams, InvalidCursorError, set_next_cursor
 from app.user.schemas import UserSchema
 from app.user.service import UserService
 
@@ -18,7 +20,17 @@ def read_users_me(user: Annotated[UserSchema, Depends(get_current_user)]) -> Use
 
 @user_router.get("/users/get_bookings", response_model=list[BookingSchema])
 async def get_user_bookings(
+    response: Response,
     user: Annotated[UserSchema, Depends(get_current_user)],
     service: Annotated[UserService, Depends(get_user_service)],
+    page: Annotated[CursorParams, Depends()],
 ) -> list[BookingSchema]:
-    return await service.get_user_bookings(user)
+    try:
+        bookings = await service.get_user_bookings(
+            user, limit=page.limit, cursor=page.cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message) from e
+
+    set_next_cursor(response, bookings, page.limit, BOOKING_CURSOR_FIELDS)
+    return bookings
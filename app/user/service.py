@@ -4,8 +4,8 @@ from passlib.context import CryptContext
 
 from app.booking.schemas import BookingSchema
 from app.booking.service import BookingService
-from app.database import async_session_maker
 from app.repository import SQLAlchemyRepository
+from app.unit_of_work import UnitOfWork
 from app.user.exceptions import UserNotFoundExceptionError
 from app.user.models import UserModel
 from app.user.schemas import UserCreate, UserSchema, UserUpdate
@@ -14,12 +14,13 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 class UserService:
-    def __init__(self) -> None:
+    def __init__(self, uow: UnitOfWork | None = None) -> None:
         """Create user repository."""
+        self.uow = uow or UnitOfWork()
         self.repository: SQLAlchemyRepository[UserModel] = SQLAlchemyRepository(
-            async_session_maker, UserModel
+            self.uow, UserModel
         )
-        self.booking_service: BookingService = BookingService()
+        self.booking_service: BookingService = BookingService(self.uow)
         logger.debug("Setup UserService with repository: {}", self.repository)
 
     async def create_user(self, user: UserCreate) -> UserSchema:
@@ -74,18 +75,23 @@ class UserService:
         return user
 
     async def update_user(self, user_update: UserUpdate) -> UserSchema:
-        user = await self.get_user_by_email(user_update.email)
+        async with self.uow:
+            user = await self.get_user_by_email(user_update.email)
 
-        updated_user = await self.repository.update(
-            where=UserModel.email == user.email, data=user_update.model_dump()
-        )
-        if updated_user is None:
-            raise UserNotFoundExceptionError()
+            updated_user = await self.repository.update(
+                where=UserModel.email == user.email, data=user_update.model_dump()
+            )
+            if updated_user is None:
+                raise UserNotFoundExceptionError()
 
         return updated_user.to_read_model()
 
-    async def get_user_bookings(self, user: UserSchema) -> list[BookingSchema]:
-        bookings = await self.booking_service.get_user_bookings(user)
+    async def get_user_bookings(
+        self, user: UserSchema, limit: int = 100, cursor: str | None = None
+    ) -> list[BookingSchema]:
+        bookings = await self.booking_service.get_user_bookings(
+            user, limit=limit, cursor=cursor
+        )
         return bookings
 
     @staticmethod
@@ -0,0 +1,41 @@
+"""File with Bloom filter."""
+
+import hashlib
+import math
+
+
+class BloomFilter:
+    """Set of integers with no false negatives and rare false positives.
+
+    Args:
+        capacity: `int` expected number of items
+        error_rate: `float` false positive rate at `capacity` items
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        capacity = max(1, capacity)
+        bits = -capacity * math.log(error_rate) / math.log(2) ** 2
+        self.size = max(8, math.ceil(bits))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def add(self, item: int) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: int) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def _positions(self, item: int) -> list[int]:
+        # Двойное хеширование: k позиций из двух половин одного дайджеста
+        raw = hashlib.blake2b(
+            item.to_bytes(8, "little", signed=True), digest_size=16
+        ).digest()
+        first = int.from_bytes(raw[:8], "little")
+        second = int.from_bytes(raw[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
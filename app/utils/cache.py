@@ -1,118 +1,589 @@
+import asyncio
 import hashlib
+import inspect
 import json
-from datetime import datetime
+import random
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from enum import Enum
 from functools import wraps
-from json.encoder import JSONEncoder
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable, Iterable, get_type_hints
 
 from loguru import logger
-from redis import Redis
-
+from pydantic import BaseModel, TypeAdapter
+from redis.asyncio import Redis
+from redis.client import NEVER_DECODE
+
+from app.config import settings
+from app.utils.cache_codec import CacheCodec, get_cache_codec
+from app.utils.cache_warmer import cache_warmer
+from app.utils.metrics import (
+    CACHE_HITS,
+    CACHE_INVALIDATED_KEYS,
+    CACHE_INVALIDATIONS,
+    CACHE_MISSES,
+    CACHE_OPERATION_SECONDS,
+    CACHE_PAYLOAD_BYTES,
+    CACHE_SETS,
+    CACHE_STALE_HITS,
+)
 from app.utils.redis_config import redis_client
 
 KEY_LEN = 200
+TAG_PREFIX = "cache_tag"
+INVALIDATION_CHANNEL = "cache_invalidation"
+INVALIDATION_RECONNECT_DELAY = 1
+LOCK_PREFIX = "cache_lock"
+LOCK_TTL_MS = 10_000
+LOCK_WAIT_TIMEOUT = 5
+LOCK_POLL_INTERVAL = 0.05
+TTL_JITTER = 0.1
+MAX_BACKGROUND_REFRESHES = 16
+STALE_KEY_SUFFIX = "swr"
+NONE_KEY_SUFFIX = "none"
+NONE_TTL = 1
+# Результат ведущего запроса, если он упал: ожидающие считают значение сами
+_RETRY = object()
+
+# Удаляет все ключи из множеств тегов и сами множества за один вызов.
+# Стоимость O(число ключей с тегом), а не O(размер keyspace), как у KEYS.
+INVALIDATE_TAGS_SCRIPT = """
+local deleted = 0
+for _, tag in ipairs(KEYS) do
+    local members = redis.call('SMEMBERS', tag)
+    for i = 1, #members, 500 do
+        local last = math.min(i + 499, #members)
+        deleted = deleted + redis.call('DEL', unpack(members, i, last))
+    end
+    redis.call('DEL', tag)
+end
+return deleted
+"""
+
+# Снимает блокировку, только если она всё ещё принадлежит этому воркеру.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass(frozen=True)
+class CacheFill:
+    """Key of `RedisCache.get_or_set` with all needed to compute its value."""
+
+    key: str
+    compute: Callable[[], Awaitable[Any]]
+    ttl: int
+    tags: tuple[str, ...] = ()
+    stale_ttl: int = 0
+
+
+@dataclass
+class LocalCacheEntry:
+    value: Any
+    size: int
+    expires_at: float
+    tags: tuple[str, ...] = field(default_factory=tuple)
+
+
+class LocalCache:
+    """In-process LRU cache with TTL, bounded by items and bytes.
+
+    Values are stored deserialized, so callers must not mutate them. Size
+    of an entry is the length of its serialized value.
+    """
+
+    def __init__(self, ttl: int, max_items: int, max_bytes: int) -> None:
+        self.ttl = ttl
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, LocalCacheEntry] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._size = 0
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def set(
+        self, key: str, value: Any, size: int, ttl: int, tags: Iterable[str] = ()
+    ) -> None:
+        ttl = min(ttl, self.ttl)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+
+        self.delete(key)
+        entry = LocalCacheEntry(
+            value=value,
+            size=size,
+            expires_at=time.monotonic() + ttl,
+            tags=tuple(tags),
+        )
+        self._entries[key] = entry
+        self._size += size
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.max_items or self._size > self.max_bytes:
+            self.delete(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._size -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate_tags(self, *tags: str) -> None:
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self.delete(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+        self._size = 0
 
 
 class RedisCache:
-    def __init__(self, redis_client: Redis):
-        self.redis = redis_client
+    """Redis cache with a local cache of the worker in front of it.
 
-    def get(self, key: str) -> Any | None:
+    Invalidation of tags is published to `INVALIDATION_CHANNEL`, so local
+    caches of all workers drop their copies (see `listen_invalidations`).
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        codec: CacheCodec,
+        local: LocalCache | None = None,
+    ):
+        self.redis = redis_client
+        self.codec = codec
+        self.local = local
+        self._invalidate_tags = self.redis.register_script(INVALIDATE_TAGS_SCRIPT)
+        self._release_lock = self.redis.register_script(RELEASE_LOCK_SCRIPT)
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+        self._refreshing: set[str] = set()
+        self._refresh_tasks: set[asyncio.Task] = set()
+        self._refresh_semaphore = asyncio.Semaphore(MAX_BACKGROUND_REFRESHES)
+
+    async def get(self, key: str, tags: Iterable[str] = ()) -> Any | None:
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not None:
+                CACHE_HITS.labels(_key_prefix(key), "local").inc()
+                return value
+        return await self._get_remote(key, tags)
+
+    async def _get_remote(self, key: str, tags: Iterable[str] = ()) -> Any | None:
+        prefix = _key_prefix(key)
         try:
-            data = self.redis.get(key)
+            with CACHE_OPERATION_SECONDS.labels(prefix, "get").time():
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    # Значения кэша бинарные, клиент декодирует ответы в str
+                    pipe.execute_command("GET", key, **{NEVER_DECODE: []})
+                    pipe.ttl(key)
+                    data, ttl = await pipe.execute()
             if data:
-                return json.loads(data)  # type: ignore
+                CACHE_HITS.labels(prefix, "redis").inc()
+                value = self.codec.decode(data)
+                if self.local is not None:
+                    self.local.set(key, value, len(data), ttl, tags)
+                return value
             return None
         except Exception as e:
             logger.error(f"Redis get error for key {key}: {e}")
             return None
 
-    def set(self, key: str, value: Any, ttl: int = 300) -> bool:
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int = 300,
+        tags: Iterable[str] = (),
+        nx: bool = False,
+    ) -> bool:
+        """Set value with ttl and add key to the sets of its tags.
+
+        With `nx` value is set only if the key does not exist, so a value
+        read before a concurrent write does not overwrite the written one.
+        """
+        tags = tuple(tags)
+        prefix = _key_prefix(key)
         try:
-            serialized_value = json.dumps(value, cls=JSONEncoder, ensure_ascii=False)
-            return bool(self.redis.setex(key, ttl, serialized_value))
+            serialized_value = self.codec.encode(value)
+            CACHE_SETS.labels(prefix).inc()
+            CACHE_PAYLOAD_BYTES.labels(prefix).observe(len(serialized_value))
+            if self.local is not None and not nx:
+                self.local.set(key, value, len(serialized_value), ttl, tags)
+            with CACHE_OPERATION_SECONDS.labels(prefix, "set").time():
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    pipe.set(key, serialized_value, ex=ttl, nx=nx)
+                    for tag in tags:
+                        # TTL множества только растёт: оно живёт не меньше
+                        # самого долгого ключа с тегом. NX задаёт TTL новому
+                        # множеству, GT не меняет TTL ключа без него.
+                        pipe.sadd(_tag_key(tag), key)
+                        pipe.expire(_tag_key(tag), ttl, nx=True)
+                        pipe.expire(_tag_key(tag), ttl, gt=True)
+                    result = await pipe.execute()
+            if self.local is not None and nx and result[0]:
+                self.local.set(key, value, len(serialized_value), ttl, tags)
+            return bool(result[0])
         except Exception as e:
             logger.error(f"Redis set error for key {key}: {e}")
             return False
 
-    def delete(self, key: str) -> bool:
+    async def get_or_set(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int = 300,
+        tags: Iterable[str] = (),
+        stale_ttl: int = 0,
+    ) -> Any:
+        """Get value or compute and cache it, once per key across workers.
+
+        Concurrent misses of one worker wait for the first one and get its
+        result. Workers compete for a Redis lock and the losers poll for the
+        value until the lock is released. `compute` returns the value to
+        cache, `None` is not cached, but is marked for `NONE_TTL` seconds,
+        so waiting workers return `None` at once instead of computing it
+        again. TTL is jittered, so keys set together expire apart.
+
+        With `stale_ttl` value is served stale-while-revalidate: for
+        `stale_ttl` seconds after `ttl` it is still returned at once, while
+        one background task per key computes a fresh one.
+        """
+        if stale_ttl:
+            # Значения с мягким ttl хранятся в обёртке, держим их отдельно
+            key = f"{key}:{STALE_KEY_SUFFIX}"
+        fill = CacheFill(key, compute, ttl, tuple(tags), stale_ttl)
+        while True:
+            entry = await self.get(key, fill.tags)
+            if entry is not None:
+                return self._unwrap(fill, entry)
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            # shield: отмена ожидающего не отменяет результат для остальных
+            entry = await asyncio.shield(inflight)
+            if entry is not _RETRY:
+                return _entry_value(entry, stale_ttl)
+
+        CACHE_MISSES.labels(_key_prefix(key)).inc()
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        entry = _RETRY
+        try:
+            entry = await self._compute_with_lock(fill)
+        finally:
+            del self._inflight[key]
+            future.set_result(entry)
+        return _entry_value(entry, stale_ttl)
+
+    async def _compute_with_lock(self, fill: CacheFill) -> Any:
+        lock_key = f"{LOCK_PREFIX}:{fill.key}"
+        token = secrets.token_hex(8)
+        acquired = await self._acquire_lock(lock_key, token)
+        if not acquired:
+            found, entry = await self._wait_for_value(fill.key, lock_key, fill.tags)
+            if found:
+                return entry
+
         try:
-            return bool(self.redis.delete(key))
+            return await self._compute_and_set(fill)
+        finally:
+            if acquired:
+                await self._unlock(lock_key, token)
+
+    async def _compute_and_set(self, fill: CacheFill) -> Any:
+        """Compute value and cache it, wrapped with its soft ttl if stale."""
+        value = await fill.compute()
+        if value is None:
+            await self._mark_none(fill.key)
+            return None
+
+        ttl = _jitter_ttl(fill.ttl)
+        entry = value
+        if fill.stale_ttl:
+            entry = {"value": value, "fresh_until": time.time() + ttl}
+        await self.set(fill.key, entry, ttl + fill.stale_ttl, fill.tags)
+        return entry
+
+    def _unwrap(self, fill: CacheFill, entry: Any) -> Any:
+        """Get value from cache entry, refresh it in background if stale."""
+        if not fill.stale_ttl:
+            return entry
+        if entry["fresh_until"] <= time.time():
+            CACHE_STALE_HITS.labels(_key_prefix(fill.key)).inc()
+            self._refresh_in_background(fill)
+        return entry["value"]
+
+    def _refresh_in_background(self, fill: CacheFill) -> None:
+        if fill.key in self._refreshing or self._refresh_semaphore.locked():
+            return
+
+        self._refreshing.add(fill.key)
+        task = asyncio.create_task(self._refresh(fill))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _refresh(self, fill: CacheFill) -> None:
+        lock_key = f"{LOCK_PREFIX}:{fill.key}"
+        token = secrets.token_hex(8)
+        try:
+            async with self._refresh_semaphore:
+                if not await self._acquire_lock(lock_key, token):
+                    return
+                try:
+                    # Другой воркер мог уже обновить значение
+                    entry = await self._get_remote(fill.key, fill.tags)
+                    if entry is not None and entry["fresh_until"] > time.time():
+                        return
+                    logger.debug(f"Refresh stale cache key {fill.key}")
+                    await self._compute_and_set(fill)
+                finally:
+                    await self._unlock(lock_key, token)
+        except Exception as e:
+            logger.error(f"Cache refresh error for key {fill.key}: {e}")
+        finally:
+            self._refreshing.discard(fill.key)
+
+    async def _acquire_lock(self, lock_key: str, token: str) -> bool:
+        try:
+            return bool(await self.redis.set(lock_key, token, nx=True, px=LOCK_TTL_MS))
+        except Exception as e:
+            logger.error(f"Redis lock error for key {lock_key}: {e}")
+            return True
+
+    async def _unlock(self, lock_key: str, token: str) -> None:
+        try:
+            await self._release_lock(keys=[lock_key], args=[token])
+        except Exception as e:
+            logger.error(f"Redis unlock error for key {lock_key}: {e}")
+
+    async def _mark_none(self, key: str) -> None:
+        """Tell waiting workers that value was computed as `None`."""
+        try:
+            await self.redis.set(_none_key(key), b"1", ex=NONE_TTL)
+        except Exception as e:
+            logger.error(f"Redis set error for key {_none_key(key)}: {e}")
+
+    async def _wait_for_value(
+        self, key: str, lock_key: str, tags: tuple[str, ...]
+    ) -> tuple[bool, Any]:
+        """Wait for value computed by the worker holding the lock.
+
+        Return: `tuple[bool, Any]` whether value was computed and the value,
+        not computed value must be computed by the caller
+        """
+        deadline = time.monotonic() + LOCK_WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            value = await self.get(key, tags)
+            if value is not None:
+                return True, value
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.exists(_none_key(key))
+                    pipe.exists(lock_key)
+                    computed_none, locked = await pipe.execute()
+            except Exception as e:
+                logger.error(f"Redis exists error for key {lock_key}: {e}")
+                return False, None
+            if computed_none:
+                return True, None
+            if not locked:
+                return False, None
+        logger.warning(f"Timeout waiting for cache key {key}")
+        return False, None
+
+    async def delete(self, key: str) -> bool:
+        if self.local is not None:
+            self.local.delete(key)
+        try:
+            return bool(await self.redis.delete(key))
         except Exception as e:
             logger.error(f"Redis delete error for key {key}: {e}")
             return False
 
-    def delete_pattern(self, pattern: str) -> int:
-        try:
-            keys = self.redis.keys(pattern)
-            if keys:
-                return self.redis.delete(*keys)  # type: ignore
+    async def invalidate_tags(self, *tags: str) -> int:
+        """Delete all keys with any of tags and notify other workers."""
+        if not tags:
             return 0
+        if self.local is not None:
+            self.local.invalidate_tags(*tags)
+        try:
+            for tag in tags:
+                CACHE_INVALIDATIONS.labels(_key_prefix(tag)).inc()
+            deleted = int(await self._invalidate_tags(keys=[_tag_key(t) for t in tags]))
+            CACHE_INVALIDATED_KEYS.inc(deleted)
         except Exception as e:
-            logger.error(f"Redis delete pattern error for {pattern}: {e}")
+            logger.error(f"Redis invalidate tags error for {tags}: {e}")
             return 0
+        await self.publish_invalidation(*tags)
+        return deleted
 
-    def exists(self, key: str) -> bool:
+    async def publish_invalidation(self, *tags: str) -> None:
+        """Drop tags from local caches of other workers, Redis is not changed."""
+        try:
+            await self.redis.publish(INVALIDATION_CHANNEL, json.dumps(tags))
+        except Exception as e:
+            logger.error(f"Redis publish invalidation error for {tags}: {e}")
+
+    async def listen_invalidations(self) -> None:
+        """Drop invalidated tags from the local cache until cancelled.
+
+        Local cache is cleared after every (re)subscribe, because messages
+        published while the worker was not subscribed are lost.
+        """
+        if self.local is None:
+            return
+
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                self.local.clear()
+                logger.debug("Subscribed to {}", INVALIDATION_CHANNEL)
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.local.invalidate_tags(*json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Redis invalidation listener error: {e}")
+                await asyncio.sleep(INVALIDATION_RECONNECT_DELAY)
+            finally:
+                await pubsub.aclose()
+
+    async def exists(self, key: str) -> bool:
         try:
-            return bool(self.redis.exists(key))
+            return bool(await self.redis.exists(key))
         except Exception as e:
             logger.error(f"Redis exists error for key {key}: {e}")
             return False
 
 
 # Глобальный экземпляр кеша
-redis_cache = RedisCache(redis_client)
+redis_cache = RedisCache(
+    redis_client,
+    get_cache_codec(settings.cache_serializer, settings.cache_compress_min_bytes),
+    LocalCache(
+        ttl=settings.local_cache_ttl,
+        max_items=settings.local_cache_max_items,
+        max_bytes=settings.local_cache_max_bytes,
+    ),
+)
 
 
 def cached(
-    ttl: int = 300, key_prefix: str = "", unless: Callable | None = None
+    ttl: int = 300,
+    key_prefix: str = "",
+    unless: Callable | None = None,
+    stale_ttl: int = 0,
+    key_params: Iterable[str] | None = None,
 ) -> Callable:
     """
     Декоратор для кеширования результатов функций в Redis
+
+    Ключ строится из параметров `key_params` (по умолчанию из всех, кроме
+    `self` и `cls`) с учётом значений по умолчанию.
+
+    С `stale_ttl` устаревшее значение отдаётся ещё `stale_ttl` секунд после
+    `ttl`, пока оно обновляется в фоне (stale-while-revalidate).
+    Результат сериализуется и восстанавливается по аннотации возвращаемого
+    типа функции, поэтому из кеша возвращаются те же типы, что и без него.
     """
 
     def decorator(func: Callable) -> Callable:
+        return_type = get_type_hints(func).get("return")
+        adapter = TypeAdapter(return_type) if return_type is not None else None
+        build_key = _cache_key_builder(func, key_prefix, key_params)
+
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
             # Пропускаем кеширование если unless возвращает True
             if unless and unless(*args, **kwargs):
-                return func(*args, **kwargs)
+                return await func(*args, **kwargs)
 
             # Создаем ключ кеша
-            cache_key = _generate_cache_key(func.__name__, key_prefix, args, kwargs)
-
-            # Пробуем получить из кеша
-            cached_result = redis_cache.get(cache_key)
-            if cached_result is not None:
-                logger.debug(f"Cache hit for {cache_key}")
+            cache_key = build_key(args, kwargs)
+
+            # Выполняем функцию только при промахе, один раз на ключ
+            computed: list[Any] = []
+
+            async def compute() -> Any:
+                logger.debug(f"Cache miss for {cache_key}")
+                result = await func(*args, **kwargs)
+                computed.append(result)
+                # Сериализуем результат перед сохранением в кеш
+                if adapter is None:
+                    return _convert_to_serializable(result)
+                return adapter.dump_python(result, mode="json")
+
+            cached_result = await redis_cache.get_or_set(
+                cache_key,
+                compute,
+                ttl,
+                tags=(key_prefix,) if key_prefix else (),
+                stale_ttl=stale_ttl,
+            )
+            if computed:
+                return computed[0]
+
+            logger.debug(f"Cache hit for {cache_key}")
+            if adapter is None:
                 return cached_result
-
-            # Выполняем функцию и кешируем результат
-            logger.debug(f"Cache miss for {cache_key}")
-            result = await func(*args, **kwargs)
-
-            # Сериализуем результат перед сохранением в кеш
-            serializable_result = _convert_to_serializable(result)
-            redis_cache.set(cache_key, serializable_result, ttl)
-
-            return result
+            return adapter.validate_python(cached_result)
 
         return wrapper
 
     return decorator
 
 
-def invalidate_cache(*patterns: str) -> Callable:
+def invalidate_cache(*tags: str) -> Callable:
     """
-    Декоратор для инвалидации кеша после выполнения функции
+    Декоратор для инвалидации кеша по тегам (`key_prefix` в `cached`)
+    после выполнения функции.
+
+    Если у сервиса (`args[0].uow`) открыта транзакция, инвалидация
+    откладывается до её коммита. После инвалидации кеш прогревается в фоне.
     """
 
     def decorator(func: Callable) -> Callable:
         @wraps(func)
-        def wrapper(*args: Any, **kwargs: Any) -> Any:
-            result = func(*args, **kwargs)
-            for pattern in patterns:
-                redis_cache.delete_pattern(pattern)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            result = await func(*args, **kwargs)
+
+            async def invalidate() -> None:
+                await redis_cache.invalidate_tags(*tags)
+                cache_warmer.schedule()
+
+            uow = getattr(args[0], "uow", None) if args else None
+            if uow is not None:
+                await uow.on_commit(invalidate)
+            else:
+                await invalidate()
             return result
 
         return wrapper
@@ -120,25 +591,70 @@ def invalidate_cache(*patterns: str) -> Callable:
     return decorator
 
 
-def _generate_cache_key(func_name: str, prefix: str, args: tuple, kwargs: dict) -> str:
-    """Генерация уникального ключа кеша"""
-    key_parts = [prefix, func_name] if prefix else [func_name]
+def _tag_key(tag: str) -> str:
+    return f"{TAG_PREFIX}:{tag}"
+
+
+def _none_key(key: str) -> str:
+    return f"{key}:{NONE_KEY_SUFFIX}"
+
+
+def _entry_value(entry: Any, stale_ttl: int) -> Any:
+    """Value of cache entry, wrapped with its soft ttl if stale."""
+    return entry["value"] if stale_ttl and entry is not None else entry
+
+
+def _key_prefix(key: str) -> str:
+    """Prefix of key for metrics: `key_prefix` of `cached` or function name."""
+    return key.split(":", 1)[0]
 
-    # Добавляем аргументы
-    if args:
-        key_parts.append(str(args))
-    if kwargs:
-        key_parts.append(str(sorted(kwargs.items())))
 
-    # Создаем хеш для длинных ключей
-    key_string = ":".join(key_parts)
-    if len(key_string) > KEY_LEN:
-        key_hash = hashlib.md5(key_string.encode()).hexdigest()
-        return (
-            f"{prefix}:{func_name}:{key_hash}" if prefix else f"{func_name}:{key_hash}"
+def _jitter_ttl(ttl: int) -> int:
+    """Add up to `TTL_JITTER` of ttl, so keys set together expire apart."""
+    return ttl + random.randint(0, int(ttl * TTL_JITTER))
+
+
+def _cache_key_builder(
+    func: Callable, prefix: str, key_params: Iterable[str] | None
+) -> Callable[[tuple, dict], str]:
+    """Построение функции генерации ключа кеша по сигнатуре функции"""
+    signature = inspect.signature(func)
+    if key_params is None:
+        key_params = [
+            name for name in signature.parameters if name not in ("self", "cls")
+        ]
+    names = tuple(key_params)
+    base = f"{prefix}:{func.__name__}" if prefix else func.__name__
+
+    def build(args: tuple, kwargs: dict) -> str:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        params = json.dumps(
+            [bound.arguments[name] for name in names],
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=_canonical,
         )
 
-    return key_string.replace(" ", "")
+        # Создаем хеш для длинных ключей
+        if len(base) + len(params) >= KEY_LEN:
+            params = hashlib.blake2b(params.encode(), digest_size=16).hexdigest()
+        return f"{base}:{params}"
+
+    return build
+
+
+def _canonical(obj: Any) -> Any:
+    """Приводит параметр ключа кеша к стабильному JSON-представлению"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=str)
+    raise TypeError(f"Unsupported cache key parameter type: {type(obj).__name__}")
 
 
 def _convert_to_serializable(obj: Any) -> Any:  # noqa: PLR0911
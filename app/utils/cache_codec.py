@@ -0,0 +1,130 @@
+"""Codecs of cached values.
+
+Values are JSON-compatible structures (see `cached`). Codec turns them to
+bytes with json, orjson or msgpack and compresses big payloads with zstd.
+orjson, msgpack and zstandard are dependencies of the project, but codec
+falls back to json without compression if they are not installed. First
+byte of every payload marks whether it is compressed.
+"""
+
+import importlib
+import json
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Protocol
+
+from loguru import logger
+
+
+def _import_optional(name: str) -> ModuleType | None:
+    try:
+        return importlib.import_module(name)
+    except ImportError:  # pragma: no cover - not installed
+        return None
+
+
+if TYPE_CHECKING:
+    import msgpack
+    import orjson
+    import zstandard
+else:
+    orjson = _import_optional("orjson")
+    msgpack = _import_optional("msgpack")
+    zstandard = _import_optional("zstandard")
+
+RAW_MARKER = b"r"
+ZSTD_MARKER = b"z"
+
+
+class Serializer(Protocol):
+    name: str
+
+    def dumps(self, value: Any) -> bytes: ...
+
+    def loads(self, data: bytes) -> Any: ...
+
+
+class JsonSerializer:
+    name = "json"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    name = "orjson"
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackSerializer:
+    name = "msgpack"
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+SERIALIZERS: dict[str, tuple[Callable[[], Serializer], bool]] = {
+    "json": (JsonSerializer, True),
+    "orjson": (OrjsonSerializer, orjson is not None),
+    "msgpack": (MsgpackSerializer, msgpack is not None),
+}
+
+
+class CacheCodec:
+    """Serializer with optional zstd compression of big payloads.
+
+    Args:
+        serializer: `Serializer`
+        compress_min_bytes: `int` compress payloads from this size, 0 disables
+    """
+
+    def __init__(self, serializer: Serializer, compress_min_bytes: int = 0) -> None:
+        self.serializer = serializer
+        self.compress_min_bytes = compress_min_bytes if zstandard is not None else 0
+        if zstandard is not None:
+            self._compressor = zstandard.ZstdCompressor(level=3)
+            self._decompressor = zstandard.ZstdDecompressor()
+
+    def encode(self, value: Any) -> bytes:
+        data = self.serializer.dumps(value)
+        if self.compress_min_bytes and len(data) >= self.compress_min_bytes:
+            return ZSTD_MARKER + self._compressor.compress(data)
+        return RAW_MARKER + data
+
+    def decode(self, payload: bytes) -> Any:
+        marker, data = payload[:1], payload[1:]
+        if marker == ZSTD_MARKER:
+            if zstandard is None:
+                raise ValueError("Cached value is compressed, but zstandard is missing")
+            data = self._decompressor.decompress(data)
+        elif marker != RAW_MARKER:
+            raise ValueError(f"Unknown cached value marker: {marker!r}")
+        return self.serializer.loads(data)
+
+
+def get_cache_codec(name: str, compress_min_bytes: int = 0) -> CacheCodec:
+    """Get codec by serializer name, fall back to json if it is not installed.
+
+    Args:
+        name: `str` one of `SERIALIZERS`
+        compress_min_bytes: `int`
+
+    Return: `CacheCodec`
+    """
+    factory, available = SERIALIZERS.get(name, SERIALIZERS["json"])
+    if not available:
+        logger.warning("Cache serializer {} is not installed, use json", name)
+        factory = JsonSerializer
+    if compress_min_bytes and zstandard is None:
+        logger.warning("zstandard is not installed, cache compression is disabled")
+    return CacheCodec(factory(), compress_min_bytes)
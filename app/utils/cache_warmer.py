@@ -0,0 +1,128 @@
+"""Cache warmer of public GET routes.
+
+Warmer sends internal GET requests to the application, so responses are
+computed and cached by the same code which serves visitors. Paths are
+taken from `settings.cache_warm_paths` and from the most requested paths
+of cached routes observed by this worker.
+"""
+
+import asyncio
+from collections import Counter
+
+import httpx
+from loguru import logger
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+
+WARM_HOST = "cache-warmer"
+WARM_BASE_URL = f"http://{WARM_HOST}"
+# Ключ ASGI scope запросов прогрева, клиент не может его задать
+WARM_SCOPE_KEY = "cache_warm"
+WARM_DELAY = 1.0
+WARM_TIMEOUT = 30.0
+WARMED_STATUS_CODE = 200
+MAX_TRACKED_PATHS = 1000
+
+
+def is_warm_request(scope: Scope) -> bool:
+    """Check if request was sent by the cache warmer."""
+    return bool(scope.get(WARM_SCOPE_KEY))
+
+
+class CacheWarmer:
+    """Warm cache of the application in background.
+
+    Args:
+        paths: `list[str]` paths to warm always
+        concurrency: `int` max number of simultaneous warm requests
+        top_paths: `int` number of most requested paths to warm
+    """
+
+    def __init__(self, paths: list[str], concurrency: int, top_paths: int) -> None:
+        self.paths = paths
+        self.top_paths = top_paths
+        self._app: ASGIApp | None = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._hits: Counter[str] = Counter()
+        self._scheduled: asyncio.Task | None = None
+
+    def setup(self, app: ASGIApp) -> None:
+        """Set application to warm, warmer does nothing without it."""
+        self._app = app
+
+    def record(self, path: str) -> None:
+        """Count request of cached path."""
+        self._hits[path] += 1
+        if len(self._hits) > MAX_TRACKED_PATHS:
+            self._hits = Counter(dict(self._hits.most_common(MAX_TRACKED_PATHS // 2)))
+
+    def schedule(self, delay: float = WARM_DELAY) -> None:
+        """Warm cache in background after delay.
+
+        Calls during the delay are merged into one warm-up, so a burst of
+        writes warms cache once.
+        """
+        if self._app is None:
+            return
+        if self._scheduled is not None and not self._scheduled.done():
+            return
+        self._scheduled = asyncio.create_task(self._warm_later(delay))
+
+    async def stop(self) -> None:
+        """Cancel scheduled warm-up."""
+        if self._scheduled is not None:
+            self._scheduled.cancel()
+            await asyncio.gather(self._scheduled, return_exceptions=True)
+
+    async def warm(self) -> int:
+        """Request configured and most requested paths.
+
+        Return: `int` number of successfully warmed paths
+        """
+        if self._app is None:
+            return 0
+
+        top = [path for path, _ in self._hits.most_common(self.top_paths)]
+        paths = list(dict.fromkeys([*self.paths, *top]))
+        transport = httpx.ASGITransport(app=self._mark_warm)
+        async with httpx.AsyncClient(
+            transport=transport, base_url=WARM_BASE_URL, timeout=WARM_TIMEOUT
+        ) as client:
+            results = await asyncio.gather(
+                *(self._warm_path(client, path) for path in paths)
+            )
+
+        warmed = sum(results)
+        logger.info("Cache warmed: {} of {} paths", warmed, len(paths))
+        return warmed
+
+    async def _mark_warm(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Pass request to the application marked as a warm-up one."""
+        if self._app is None:
+            return
+        await self._app({**scope, WARM_SCOPE_KEY: True}, receive, send)
+
+    async def _warm_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self.warm()
+
+    async def _warm_path(self, client: httpx.AsyncClient, path: str) -> bool:
+        async with self._semaphore:
+            try:
+                response = await client.get(path)
+            except Exception as e:
+                logger.error("Cache warm error for {}: {}", path, e)
+                return False
+
+        if response.status_code != WARMED_STATUS_CODE:
+            logger.warning("Cache warm of {} returned {}", path, response.status_code)
+            return False
+        return True
+
+
+cache_warmer = CacheWarmer(
+    paths=settings.cache_warm_paths,
+    concurrency=settings.cache_warm_concurrency,
+    top_paths=settings.cache_warm_top_paths,
+)
@@ -4,6 +4,7 @@ import aiocron
 from loguru import logger
 
 from app.booking.service import BookingService
+from app.excursions.id_index import excursion_id_index
 from app.excursions.service import ExcursionService
 
 
@@ -36,3 +37,8 @@ def deactivate_past_excurions_cron() -> None:
 def deactivate_past_bookings() -> None:
     service = BookingService()
     cron_manager.add_job("15 0 * * *", service.deactivate_past_bookings)
+
+
+def rebuild_excursion_id_index_cron() -> None:
+    # Фильтр Блума не умеет удалять, поэтому раз в сутки строим его заново
+    cron_manager.add_job("30 0 * * *", excursion_id_index.rebuild)
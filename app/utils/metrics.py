@@ -0,0 +1,103 @@
+"""Prometheus metrics of the application.
+
+All metrics are registered in the default registry, so they are exposed
+by `Instrumentator` on `/metrics` together with the http metrics.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Configured size of the database connection pool",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Database connections currently checked out from the pool",
+)
+DB_POOL_IDLE = Gauge(
+    "db_pool_idle_connections",
+    "Idle database connections kept in the pool",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Database connections opened above the pool size",
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a database connection from the pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+CACHE_HITS = Counter(
+    "cache_hits_total",
+    "Cache hits by key prefix and cache layer (local or redis)",
+    ["prefix", "layer"],
+)
+CACHE_STALE_HITS = Counter(
+    "cache_stale_hits_total",
+    "Stale cache values served while they are refreshed in background",
+    ["prefix"],
+)
+CACHE_MISSES = Counter(
+    "cache_misses_total",
+    "Cache misses which computed the value, by key prefix",
+    ["prefix"],
+)
+CACHE_SETS = Counter(
+    "cache_sets_total",
+    "Values written to cache by key prefix",
+    ["prefix"],
+)
+CACHE_INVALIDATIONS = Counter(
+    "cache_invalidations_total",
+    "Cache tag invalidations by tag (key prefix)",
+    ["prefix"],
+)
+CACHE_INVALIDATED_KEYS = Counter(
+    "cache_invalidated_keys_total",
+    "Cache keys deleted by tag invalidations",
+)
+CACHE_PAYLOAD_BYTES = Histogram(
+    "cache_payload_bytes",
+    "Size of encoded values written to cache by key prefix",
+    ["prefix"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+CACHE_OPERATION_SECONDS = Histogram(
+    "cache_operation_seconds",
+    "Latency of Redis cache operations by key prefix and operation",
+    ["prefix", "operation"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
+SEAT_INVENTORY_RESEEDS = Counter(
+    "seat_inventory_reseeds_total",
+    "Redis seat counters seeded from database, by reason (missing or drift)",
+    ["reason"],
+)
+
+IMAGE_PROCESSING_SECONDS = Histogram(
+    "image_processing_seconds",
+    "Time of image processing task including wait for a free worker process",
+    ["task"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+IMAGE_PROCESSING_QUEUE = Gauge(
+    "image_processing_queue",
+    "Images waiting or being processed by the worker",
+)
+IMAGE_PROCESSING_REJECTED = Counter(
+    "image_processing_rejected_total",
+    "Images rejected because the processing queue was full",
+)
+IMAGE_PROCESSING_BYTES = Counter(
+    "image_processing_bytes_total",
+    "Size of images before (original) and after (processed) compression"
+    " and total size of their resized copies (variants)",
+    ["stage"],
+)
+IMAGE_RESIZE_CACHE = Counter(
+    "image_resize_cache_total",
+    "Requests of resized images by result: hit, miss or wait for computation",
+    ["result"],
+)
@@ -1,31 +1,38 @@
-import os
-
-import redis
+import redis.asyncio as redis
 from loguru import logger
 
-logger.debug("Setup Redis config")
-
+from app.config import settings
 
-class RedisConfig:
-    def __init__(self) -> None:
-        self.host = os.getenv("REDIS_HOST", "localhost")
-        self.port = int(os.getenv("REDIS_PORT", "6379"))
-        self.db = int(os.getenv("REDIS_DB", "0"))
-        self.password = os.getenv("REDIS_PASSWORD", None)
-        self.decode_responses = True
+logger.debug("Setup Redis config")
 
 
 def get_redis_connection() -> redis.Redis:
-    config = RedisConfig()
-    return redis.Redis(
-        host=config.host,
-        port=config.port,
-        db=config.db,
-        password=config.password,
-        decode_responses=config.decode_responses,
-        socket_connect_timeout=5,
+    """Create async Redis client with a connection pool of the worker.
+
+    The pool blocks for `redis_pool_timeout` when all connections are busy
+    instead of opening new ones, so one worker never exceeds
+    `redis_max_connections`. Responses are decoded to `str`, binary values
+    (e.g. cache) are read with the `NEVER_DECODE` option of the command.
+    """
+    pool = redis.BlockingConnectionPool(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        db=settings.redis_db,
+        password=settings.redis_password,
+        decode_responses=True,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout,
+        socket_timeout=settings.redis_socket_timeout,
+        socket_connect_timeout=settings.redis_socket_connect_timeout,
         retry_on_timeout=True,
     )
+    return redis.Redis(connection_pool=pool)
+
+
+async def close_redis_connection() -> None:
+    """Close Redis client and disconnect all connections of its pool."""
+    await redis_client.aclose()
+    await redis_client.connection_pool.disconnect()
 
 
 redis_client = get_redis_connection()
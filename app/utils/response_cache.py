@@ -0,0 +1,287 @@
+"""Response cache of FastAPI routes.
+
+Endpoints marked with `cache_response` and registered on a router with
+`route_class=CachedRoute` are cached as final responses (status, headers and
+body). Cache is checked before FastAPI resolves dependencies, so a hit runs
+neither dependencies nor the service layer. Mark only public endpoints:
+dependencies, including auth checks, are skipped on a hit.
+
+Cached responses get a strong `ETag` (hash of the body) and
+`Cache-Control`. `If-None-Match` with the current `ETag` is answered with
+304 straight from the cache.
+
+Endpoints whose service is cached stale-while-revalidate are marked with
+`ttl=0`: a stale service value cached here would outlive `stale_ttl`.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Coroutine, TypeVar
+from urllib.parse import urlencode
+
+from fastapi import Request, Response, status
+from fastapi.dependencies.models import Dependant
+from fastapi.dependencies.utils import get_flat_dependant
+from fastapi.routing import APIRoute
+from loguru import logger
+
+from app.utils.cache import redis_cache
+from app.utils.cache_warmer import cache_warmer, is_warm_request
+
+F = TypeVar("F", bound=Callable[..., Any])
+Handler = Callable[[Request], Coroutine[Any, Any, Response]]
+
+CACHE_POLICY_ATTR = "__cache_policy__"
+CACHE_STATUS_HEADER = "X-Cache"
+ETAG_HEADER = "ETag"
+CACHE_CONTROL_HEADER = "Cache-Control"
+NOT_CACHED_HEADERS = {"content-length", "set-cookie"}
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Cache policy of one route.
+
+    Attributes:
+        ttl: `int` seconds to keep response in cache, 0 to only set headers
+        key_prefix: `str` prefix of cache keys, used for invalidation
+        max_age: `int` seconds clients and proxies may reuse response
+    """
+
+    ttl: int
+    key_prefix: str
+    max_age: int = 0
+
+    @property
+    def cache_control(self) -> str:
+        if self.max_age <= 0:
+            return "public, no-cache"
+        return f"public, max-age={self.max_age}"
+
+
+def cache_response(ttl: int, key_prefix: str, max_age: int = 0) -> Callable[[F], F]:
+    """Mark endpoint to be cached by `CachedRoute`.
+
+    Must be placed under the router decorator, so the router registers the
+    marked function.
+    """
+
+    def decorator(func: F) -> F:
+        policy = CachePolicy(ttl=ttl, key_prefix=key_prefix, max_age=max_age)
+        setattr(func, CACHE_POLICY_ATTR, policy)
+        return func
+
+    return decorator
+
+
+def make_etag(body: str) -> str:
+    """Make strong ETag from response body."""
+    return f'"{hashlib.sha256(body.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check if `If-None-Match` header of request matches ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def build_response_cache_key(
+    key_prefix: str, request: Request, query_params: dict[str, list[str]]
+) -> str:
+    """Build cache key from method, path and declared query params.
+
+    Unknown query params are ignored, missing ones get their defaults and
+    known ones are sorted, so the same request always gets the same key.
+    """
+    raw = f"{request.method} {build_request_path(request, query_params)}"
+    return f"{key_prefix}:route:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+def build_request_path(request: Request, query_params: dict[str, list[str]]) -> str:
+    """Build path with declared query params of request.
+
+    Args:
+        request: `Request`
+        query_params: `dict[str, list[str]]` declared query params with their
+            default values, see `query_param_defaults`
+    """
+    query = urlencode(
+        [
+            (name, value)
+            for name, default in query_params.items()
+            for value in request.query_params.getlist(name) or default
+        ]
+    )
+    return f"{request.url.path}?{query}" if query else request.url.path
+
+
+def query_param_defaults(dependant: Dependant) -> dict[str, list[str]]:
+    """Get declared query params of route sorted by name with their defaults.
+
+    Default values are converted to strings the way clients send them, so
+    `/excursions/active` and `/excursions/active?excursion_type=excursion`
+    get the same key.
+    """
+    params = {
+        param.alias: [] if param.required else _query_values(param.default)
+        for param in get_flat_dependant(dependant).query_params
+    }
+    return dict(sorted(params.items()))
+
+
+def _query_values(value: Any) -> list[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple, set)):
+        return [item for v in value for item in _query_values(v)]
+    if isinstance(value, Enum):
+        return _query_values(value.value)
+    if isinstance(value, bool):
+        return ["true" if value else "false"]
+    return [str(value)]
+
+
+class CachedRoute(APIRoute):
+    """Route which serves cached responses of endpoints marked for caching."""
+
+    def get_route_handler(self) -> Handler:
+        handler = super().get_route_handler()
+        policy: CachePolicy | None = getattr(self.endpoint, CACHE_POLICY_ATTR, None)
+        if policy is None:
+            return handler
+
+        query_params = query_param_defaults(self.dependant)
+
+        async def cached_handler(request: Request) -> Response:
+            if request.method != "GET":
+                return await handler(request)
+
+            # Запросы прогрева не считаются, иначе список частых путей
+            # подкрепляет сам себя
+            if not is_warm_request(request.scope):
+                cache_warmer.record(build_request_path(request, query_params))
+            if policy.ttl <= 0:
+                response = await handler(request)
+                entry = self._to_entry(request.url.path, response)
+                return self._conditional(request, response, entry, policy)
+
+            key = build_response_cache_key(policy.key_prefix, request, query_params)
+            return await self._serve_cached(request, handler, key, policy)
+
+        return cached_handler
+
+    @classmethod
+    async def _serve_cached(
+        cls, request: Request, handler: Handler, key: str, policy: CachePolicy
+    ) -> Response:
+        """Serve response from cache, computing and storing it on a miss."""
+        computed: list[Response] = []
+
+        async def compute() -> dict[str, Any] | None:
+            logger.debug("Response cache miss for {}", key)
+            response = await handler(request)
+            computed.append(response)
+            return cls._to_entry(key, response)
+
+        entry = await redis_cache.get_or_set(
+            key, compute, policy.ttl, tags=(policy.key_prefix,)
+        )
+        if computed or entry is None:
+            # Ответ, который не кешируется (например 404), ожидающие
+            # запросы строят сами
+            response = computed[0] if computed else await handler(request)
+            return cls._miss(request, response, entry, policy)
+
+        logger.debug("Response cache hit for {}", key)
+        return cls._hit(request, entry, policy)
+
+    @classmethod
+    def _miss(
+        cls,
+        request: Request,
+        response: Response,
+        entry: dict[str, Any] | None,
+        policy: CachePolicy,
+    ) -> Response:
+        """Answer with the response computed on a cache miss."""
+        response.headers[CACHE_STATUS_HEADER] = "MISS"
+        return cls._conditional(request, response, entry, policy)
+
+    @classmethod
+    def _hit(
+        cls, request: Request, entry: dict[str, Any], policy: CachePolicy
+    ) -> Response:
+        """Build response from cache entry, or answer 304 if ETag matches."""
+        etag = entry.get("etag") or make_etag(entry["body"])
+        if etag_matches(request, etag):
+            return cls._not_modified(etag, policy)
+        return Response(
+            content=entry["body"],
+            status_code=entry["status"],
+            headers={
+                **entry["headers"],
+                ETAG_HEADER: etag,
+                CACHE_CONTROL_HEADER: policy.cache_control,
+                CACHE_STATUS_HEADER: "HIT",
+            },
+            media_type=entry["media_type"],
+        )
+
+    @classmethod
+    def _conditional(
+        cls,
+        request: Request,
+        response: Response,
+        entry: dict[str, Any] | None,
+        policy: CachePolicy,
+    ) -> Response:
+        """Set cache headers to response, or answer 304 if ETag matches.
+
+        Response which can not be cached (`entry` is `None`) is returned as is.
+        """
+        if entry is None:
+            return response
+        etag = entry["etag"]
+        if etag_matches(request, etag):
+            return cls._not_modified(etag, policy)
+        response.headers[ETAG_HEADER] = etag
+        response.headers[CACHE_CONTROL_HEADER] = policy.cache_control
+        return response
+
+    @staticmethod
+    def _not_modified(etag: str, policy: CachePolicy) -> Response:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={
+                ETAG_HEADER: etag,
+                CACHE_CONTROL_HEADER: policy.cache_control,
+            },
+        )
+
+    @staticmethod
+    def _to_entry(key: str, response: Response) -> dict[str, Any] | None:
+        """Convert response to cache entry, `None` if it must not be cached."""
+        if response.status_code != status.HTTP_200_OK or response.background is not None:
+            return None
+        try:
+            body = bytes(response.body).decode()
+        except UnicodeDecodeError:
+            logger.warning("Response for {} is not text, skip caching", key)
+            return None
+
+        return {
+            "status": response.status_code,
+            "media_type": response.media_type,
+            "headers": {
+                name: value
+                for name, value in response.headers.items()
+                if name not in NOT_CACHED_HEADERS and name != "content-type"
+            },
+            "body": body,
+            "etag": make_etag(body),
+        }
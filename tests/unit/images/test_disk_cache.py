@@ -0,0 +1,97 @@
+"""Tests of the disk cache of resized images."""
+
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("loguru")
+pytest.importorskip("pydantic")
+pytest.importorskip("PIL")
+pytest.importorskip("prometheus_client")
+
+from app.images.resizer import DiskCache  # noqa: E402
+
+CONTENT = b"x" * 100
+PUT_FILES = 10
+SHARED_MAX_BYTES = 350
+# Only files which fit in the shared limit are kept
+EVICTED_FILES = PUT_FILES - SHARED_MAX_BYTES // len(CONTENT)
+
+
+def _age(path: Path, seconds: int) -> None:
+    """Make file look used `seconds` ago."""
+    used_at = path.stat().st_mtime - seconds
+    os.utime(path, (used_at, used_at))
+
+
+def test_put_and_get(tmp_path: Path) -> None:
+    async def run() -> None:
+        cache = DiskCache(tmp_path, max_bytes=1000)
+        path = await cache.put("160x160/a.jpg", CONTENT)
+
+        assert path.read_bytes() == CONTENT
+        assert await cache.get("160x160/a.jpg") == path
+        assert await cache.get("160x160/b.jpg") is None
+
+    asyncio.run(run())
+
+
+def test_least_recently_used_files_are_evicted(tmp_path: Path) -> None:
+    async def run() -> None:
+        cache = DiskCache(tmp_path, max_bytes=250, scan_interval=0)
+        first = await cache.put("a.jpg", CONTENT)
+        second = await cache.put("b.jpg", CONTENT)
+        _age(first, 20)
+        _age(second, 10)
+        # Reading the oldest file makes it recently used
+        await cache.get("a.jpg")
+
+        await cache.put("c.jpg", CONTENT)
+
+        assert first.exists()
+        assert not second.exists()
+        assert (tmp_path / "c.jpg").exists()
+
+    asyncio.run(run())
+
+
+def test_new_file_is_kept_even_above_limit(tmp_path: Path) -> None:
+    async def run() -> None:
+        cache = DiskCache(tmp_path, max_bytes=50, scan_interval=0)
+        path = await cache.put("a.jpg", CONTENT)
+
+        assert path.exists()
+
+    asyncio.run(run())
+
+
+def test_size_is_bounded_across_workers(tmp_path: Path) -> None:
+    async def run() -> None:
+        workers = [
+            DiskCache(tmp_path, max_bytes=SHARED_MAX_BYTES, scan_interval=0)
+            for _ in "ab"
+        ]
+        for i in range(PUT_FILES):
+            path = await workers[i % 2].put(f"{i}.jpg", CONTENT)
+            _age(path, 100 - i)
+
+        files = [path for path in tmp_path.iterdir() if path.suffix == ".jpg"]
+        assert PUT_FILES - len(files) == EVICTED_FILES
+        assert sum(path.stat().st_size for path in files) <= SHARED_MAX_BYTES
+        assert (tmp_path / f"{PUT_FILES - 1}.jpg").exists()
+
+    asyncio.run(run())
+
+
+def test_delete(tmp_path: Path) -> None:
+    async def run() -> None:
+        cache = DiskCache(tmp_path, max_bytes=1000)
+        path = await cache.put("160x160/a.jpg", CONTENT)
+
+        await cache.delete(["160x160/a.jpg", "320x240/a.jpg"])
+
+        assert not path.exists()
+
+    asyncio.run(run())
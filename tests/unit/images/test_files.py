@@ -0,0 +1,45 @@
+"""Tests of image file helpers."""
+
+import io
+
+import pytest
+
+pytest.importorskip("loguru")
+pytest.importorskip("pydantic")
+pytest.importorskip("fastapi")
+Image = pytest.importorskip("PIL.Image")
+
+from app.images.files import sniff_image_extension  # noqa: E402
+
+
+def _encode(format: str) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), "red").save(buffer, format=format)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    ("format", "extension"),
+    [("JPEG", ".jpg"), ("PNG", ".png"), ("WEBP", ".webp")],
+)
+def test_allowed_formats_are_detected(format: str, extension: str) -> None:
+    assert sniff_image_extension(_encode(format)[:12]) == extension
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        b"",
+        b"GIF89a\x01\x00\x01\x00\x00\x00",
+        b"RIFF\x00\x00\x00\x00WAVE",
+        b"<svg xmlns=",
+        b"%PDF-1.7\n%\xe2\xe3",
+        b"\x89PNX\r\n\x1a\n\x00\x00\x00\x00",
+    ],
+)
+def test_other_content_is_rejected(header: bytes) -> None:
+    assert sniff_image_extension(header) is None
+
+
+def test_not_allowed_image_format_is_rejected() -> None:
+    assert sniff_image_extension(_encode("GIF")[:12]) is None
@@ -0,0 +1,69 @@
+"""Tests of cursor encoding and decoding."""
+
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("pydantic")
+
+from app.pagination import (  # noqa: E402
+    InvalidCursorError,
+    KeysetPage,
+    decode_cursor,
+    encode_cursor,
+)
+
+TYPES = (datetime, int)
+
+
+def _raw_cursor(payload: object) -> str:
+    raw = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def test_cursor_round_trip() -> None:
+    values = (datetime(2025, 6, 1, 12, 30, 15, 123456), 42)
+
+    assert decode_cursor(encode_cursor(values), TYPES) == values
+
+
+def test_cursor_is_url_safe() -> None:
+    cursor = encode_cursor((datetime(2025, 6, 1), 2**40))
+
+    assert "=" not in cursor
+    assert set(cursor) <= set(
+        "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_"
+    )
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor!",
+        _raw_cursor({"dt": "2025-06-01T00:00:00"}),
+        _raw_cursor([{"dt": "2025-06-01T00:00:00"}]),
+        _raw_cursor([{"dt": "2025-06-01T00:00:00"}, 1, 2]),
+        _raw_cursor([{"dt": "2025-06-01T00:00:00"}, "1"]),
+        _raw_cursor([{"dt": "2025-06-01T00:00:00"}, True]),
+        _raw_cursor([{"dt": "2025-06-01T00:00:00"}, 1.5]),
+        _raw_cursor(["2025-06-01T00:00:00", 1]),
+        _raw_cursor([{"dt": "yesterday"}, 1]),
+        _raw_cursor([{"dt": 1}, 1]),
+        _raw_cursor([{}, 1]),
+    ],
+)
+def test_invalid_cursor_is_rejected(cursor: str) -> None:
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, TYPES)
+
+
+def test_keyset_page_from_cursor() -> None:
+    values = (datetime(2025, 6, 1), 7)
+
+    assert KeysetPage.from_cursor(None, TYPES) == KeysetPage()
+    assert KeysetPage.from_cursor(encode_cursor(values), TYPES, 10) == KeysetPage(
+        limit=10, after=values
+    )
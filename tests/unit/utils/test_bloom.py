@@ -0,0 +1,45 @@
+"""Tests of the Bloom filter."""
+
+from app.utils.bloom import BloomFilter
+
+CAPACITY = 10_000
+ERROR_RATE = 0.01
+# Items which are never added to the filter
+CHECKED_ITEMS = range(100_000, 120_000)
+# Twice the expected number, leave room for deviation
+MAX_FALSE_POSITIVES = int(len(CHECKED_ITEMS) * ERROR_RATE * 2)
+NEGATIVE_ID = -5
+
+
+def test_added_items_are_always_found() -> None:
+    bloom = BloomFilter(capacity=CAPACITY, error_rate=ERROR_RATE)
+    items = range(1, CAPACITY + 1)
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    assert bloom.count == len(items)
+
+
+def test_false_positive_rate_is_near_error_rate() -> None:
+    bloom = BloomFilter(capacity=CAPACITY, error_rate=ERROR_RATE)
+    for item in range(CAPACITY):
+        bloom.add(item)
+
+    false_positives = sum(item in bloom for item in CHECKED_ITEMS)
+
+    assert false_positives < MAX_FALSE_POSITIVES
+
+
+def test_empty_filter_contains_nothing() -> None:
+    bloom = BloomFilter(capacity=0)
+
+    assert 1 not in bloom
+    assert -1 not in bloom
+
+
+def test_negative_ids_are_supported() -> None:
+    bloom = BloomFilter(capacity=10)
+    bloom.add(NEGATIVE_ID)
+
+    assert NEGATIVE_ID in bloom
@@ -0,0 +1,58 @@
+"""Tests of codecs of cached values."""
+
+import pytest
+
+pytest.importorskip("loguru")
+
+from app.utils import cache_codec  # noqa: E402
+from app.utils.cache_codec import SERIALIZERS, CacheCodec, get_cache_codec  # noqa: E402
+
+VALUE = {
+    "id": 1,
+    "title": "Экскурсия",
+    "price": 1000.5,
+    "is_active": True,
+    "cities": ["Симферополь", "Ялта"],
+    "bus_number": None,
+}
+
+
+@pytest.mark.parametrize("name", sorted(SERIALIZERS))
+def test_round_trip(name: str) -> None:
+    factory, available = SERIALIZERS[name]
+    if not available:
+        pytest.skip(f"{name} is not installed")
+    codec = CacheCodec(factory())
+
+    assert codec.decode(codec.encode(VALUE)) == VALUE
+
+
+def test_big_payload_is_compressed() -> None:
+    if cache_codec.zstandard is None:
+        pytest.skip("zstandard is not installed")
+    codec = get_cache_codec("json", compress_min_bytes=100)
+    value = {"items": [VALUE] * 50}
+
+    payload = codec.encode(value)
+
+    assert payload[:1] == cache_codec.ZSTD_MARKER
+    assert codec.decode(payload) == value
+
+
+def test_small_payload_is_not_compressed() -> None:
+    codec = get_cache_codec("json", compress_min_bytes=4096)
+
+    assert codec.encode(VALUE)[:1] == cache_codec.RAW_MARKER
+
+
+def test_unknown_marker_is_rejected() -> None:
+    codec = get_cache_codec("json")
+
+    with pytest.raises(ValueError):
+        codec.decode(b"x{}")
+
+
+def test_unknown_serializer_falls_back_to_json() -> None:
+    codec = get_cache_codec("pickle")
+
+    assert codec.serializer.name == "json"
@@ -0,0 +1,64 @@
+"""Tests of cache keys built from function parameters."""
+
+from datetime import datetime
+from enum import Enum
+
+import pytest
+
+pytest.importorskip("loguru")
+pytest.importorskip("pydantic")
+pytest.importorskip("redis")
+
+from app.utils.cache import KEY_LEN, _cache_key_builder  # noqa: E402
+
+
+class Kind(Enum):
+    TOUR = "tour"
+
+
+class Service:
+    async def get_page(
+        self, limit: int = 100, kind: Kind = Kind.TOUR, cursor: str | None = None
+    ) -> list:
+        return []
+
+    async def search(self, term: str, since: datetime) -> list:
+        return []
+
+
+def test_defaults_are_part_of_key() -> None:
+    build = _cache_key_builder(Service.get_page, "pages", None)
+    service = Service()
+
+    assert build((service,), {}) == build((service, 100), {"kind": Kind.TOUR})
+    assert build((service,), {}) == 'pages:get_page:[100,"tour",null]'
+
+
+def test_positional_and_keyword_arguments_give_same_key() -> None:
+    build = _cache_key_builder(Service.get_page, "pages", None)
+    service = Service()
+
+    assert build((service, 10), {}) == build((service,), {"limit": 10})
+    assert build((service, 10), {}) != build((service, 20), {})
+
+
+def test_key_params_limit_key_to_declared_params() -> None:
+    build = _cache_key_builder(Service.get_page, "pages", ["limit"])
+    service = Service()
+
+    assert build((service, 10), {"cursor": "a"}) == build((service, 10), {})
+
+
+def test_long_key_is_hashed() -> None:
+    build = _cache_key_builder(Service.search, "search", None)
+    key = build((Service(), "x" * 500, datetime(2025, 6, 1)), {})
+
+    assert key.startswith("search:search:")
+    assert len(key) < KEY_LEN
+
+
+def test_unsupported_parameter_is_rejected() -> None:
+    build = _cache_key_builder(Service.search, "search", None)
+
+    with pytest.raises(TypeError):
+        build((Service(), "term", object()), {})
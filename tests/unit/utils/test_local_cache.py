@@ -0,0 +1,85 @@
+"""Tests of the local LRU cache of the worker."""
+
+import pytest
+
+pytest.importorskip("loguru")
+pytest.importorskip("pydantic")
+pytest.importorskip("redis")
+
+from app.utils import cache as cache_module  # noqa: E402
+from app.utils.cache import LocalCache  # noqa: E402
+
+TTL = 60
+MAX_ITEMS = 10
+MAX_BYTES = 1000
+SMALL_MAX_BYTES = 100
+VALUES = {"a": 1, "b": 2, "c": 3}
+
+
+def _cache(max_items: int = MAX_ITEMS, max_bytes: int = MAX_BYTES) -> LocalCache:
+    return LocalCache(ttl=TTL, max_items=max_items, max_bytes=max_bytes)
+
+
+def test_get_returns_set_value() -> None:
+    cache = _cache()
+    cache.set("a", {"value": 1}, size=10, ttl=TTL)
+
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("b") is None
+
+
+def test_least_recently_used_item_is_evicted() -> None:
+    cache = _cache(max_items=2)
+    cache.set("a", VALUES["a"], size=1, ttl=TTL)
+    cache.set("b", VALUES["b"], size=1, ttl=TTL)
+    cache.get("a")
+    cache.set("c", VALUES["c"], size=1, ttl=TTL)
+
+    assert cache.get("a") == VALUES["a"]
+    assert cache.get("b") is None
+    assert cache.get("c") == VALUES["c"]
+
+
+def test_cache_is_bounded_by_bytes() -> None:
+    cache = _cache(max_bytes=SMALL_MAX_BYTES)
+    cache.set("a", VALUES["a"], size=SMALL_MAX_BYTES // 2 + 1, ttl=TTL)
+    cache.set("b", VALUES["b"], size=SMALL_MAX_BYTES // 2 + 1, ttl=TTL)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == VALUES["b"]
+
+
+def test_entry_larger_than_cache_is_not_stored() -> None:
+    cache = _cache(max_bytes=SMALL_MAX_BYTES)
+    cache.set("a", VALUES["a"], size=SMALL_MAX_BYTES + 1, ttl=TTL)
+
+    assert cache.get("a") is None
+
+
+def test_entry_expires_after_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 1000.0
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+    cache = _cache()
+    cache.set("short", VALUES["a"], size=1, ttl=5)
+    # ttl of entry is capped by ttl of local cache
+    cache.set("long", VALUES["b"], size=1, ttl=TTL * 10)
+
+    now += 10
+    assert cache.get("short") is None
+    assert cache.get("long") == VALUES["b"]
+
+    now += TTL
+    assert cache.get("long") is None
+
+
+def test_invalidate_tags_drops_tagged_entries() -> None:
+    cache = _cache()
+    cache.set("a", VALUES["a"], size=1, ttl=TTL, tags=("reviews",))
+    cache.set("b", VALUES["b"], size=1, ttl=TTL, tags=("reviews", "stats"))
+    cache.set("c", VALUES["c"], size=1, ttl=TTL, tags=("excursions",))
+
+    cache.invalidate_tags("reviews")
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.get("c") == VALUES["c"]